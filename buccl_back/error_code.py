@@ -5,3 +5,10 @@ class ErrorCode:
     MISSING_REQUIRED_FIELD = {"code": "1004", "message": "Missing required field"}
     ALREADY_REGISTERED = {"code": "1005", "message": "이미 등록되어 있습니다."}
     GENERAL_ERROR = {"code": "1006", "message": "An error occurred"}
+    REQUEST_IN_PROGRESS = {"code": "1007", "message": "동일한 요청을 처리 중입니다. 잠시 후 다시 시도해주세요."}
+    PRODUCT_NOT_AVAILABLE = {"code": "1008", "message": "판매 중인 상품이 아닙니다."}
+    PRICE_CHANGED = {"code": "1009", "message": "상품 가격이 변경되었습니다. 다시 확인해주세요."}
+    SOLD_OUT = {"code": "1010", "message": "남은 자리가 부족합니다."}
+    INVALID_PRICE_QUOTE = {"code": "1011", "message": "결제 정보가 만료되었거나 올바르지 않습니다. 다시 시도해주세요."}
+    TOO_MANY_REQUESTS = {"code": "1012", "message": "요청이 너무 많습니다. 잠시 후 다시 시도해주세요."}
+    IDEMPOTENCY_KEY_REUSED = {"code": "1013", "message": "같은 요청 키로 다른 내용의 요청을 보낼 수 없습니다."}
@@ -0,0 +1,135 @@
+"""
+외부 API(PG, SMS 등) 대역용 in-process HTTP 서버
+
+테스트/부하 테스트에서 실제 외부 서비스 대신 띄워 사용한다. 별도 스레드에서 동작하며 HTTP/1.1 keep-alive 를 지원한다.
+
+    server = FakeHTTPServer()
+    server.route('POST', '/approve', handler)   # handler(request) -> (status, dict)
+    with server:
+        requests.post(server.url('/approve'), data={...})
+"""
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FakeRequest:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    @property
+    def form(self):
+        return dict(parse_qsl(self.body.decode('utf-8'), keep_blank_values=True))
+
+    def json(self):
+        return json.loads(self.body or b'{}')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 헤더/본문이 따로 전송되므로 Nagle 을 끄지 않으면 keep-alive 요청마다 수십 ms 지연이 생긴다
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.owner._connection_opened()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self):
+        owner = self.server.owner
+        parsed = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        request = FakeRequest(self.command, parsed.path, dict(parse_qsl(parsed.query)), dict(self.headers), self.rfile.read(length))
+        owner._request_received(request)
+
+        delay = owner.delays.get(parsed.path, 0)
+        if delay:
+            time.sleep(delay)
+
+        handler = owner.routes.get((self.command, parsed.path))
+        if handler is None:
+            status, payload = 404, {'message': 'not found'}
+        else:
+            status, payload = handler(request)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 timeout 으로 먼저 끊은 경우는 정상 시나리오이므로 무시
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeHTTPServer:
+    """
+    routes: {(method, path): handler}, delays: {path: 초} (응답 지연 주입)
+    connections 는 지금까지 수락한 TCP 연결 수로, 커넥션 재사용 여부 확인에 쓴다.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.routes = {}
+        self.delays = {}
+        self.requests = deque(maxlen=1000)  # 최근 요청 (부하 테스트 시 메모리 제한)
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._httpd = _ThreadingServer((host, port), _Handler)
+        self._httpd.owner = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def route(self, method, path, handler):
+        self.routes[(method.upper(), path)] = handler
+
+    def _connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def _request_received(self, request):
+        with self._lock:
+            self.requests.append(request)
+
+    def start(self):
+        # poll_interval 은 stop() 대기 시간이므로 짧게
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,92 @@
+"""
+API 용 keyset(seek) 페이지네이션
+
+DRF CursorPagination 은 첫 번째 정렬 필드로만 위치를 잡고 같은 값은 OFFSET 으로 건너뛴다.
+KeysetPagination 은 정렬 필드 전체(예: created_at, id)를 커서에 담아 WHERE 조건으로 다음 페이지를 찾으므로,
+(필터 컬럼, 정렬 컬럼...) 복합 인덱스가 있으면 페이지 위치와 상관없이 인덱스 범위 스캔 한 번으로 끝난다.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    keyset 의 필드는 모두 같은 방향이어야 하고, 마지막 필드는 유일해야 한다. (보통 id)
+    응답: {"next": 다음 페이지 URL 또는 null, "results": [...]}
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    keyset = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, values):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, model, encoded):
+        fields = [model._meta.get_field(name.lstrip('-')) for name in self.keyset]
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def seek_condition(self, values):
+        """(a, b) < (va, vb) 를 a < va OR (a = va AND b < vb) 로 풀어 쓴 조건"""
+        lookup = 'lt' if self.keyset[0].startswith('-') else 'gt'
+        condition, equal = Q(), {}
+        for name, value in zip((name.lstrip('-') for name in self.keyset), values):
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.seek_condition(self.decode_cursor(queryset.model, encoded)))
+
+        rows = list(queryset.order_by(*self.keyset)[:page_size + 1])
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor([getattr(last, name.lstrip('-')) for name in self.keyset])
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
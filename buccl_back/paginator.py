@@ -0,0 +1,50 @@
+"""
+Admin changelist 용 Paginator
+
+필터/검색이 없는 changelist 는 전체 COUNT(*) 대신 DB 통계의 추정 행 수를 사용한다.
+추정치가 ADMIN_ESTIMATED_COUNT_THRESHOLD 미만이거나 추정이 불가능한 DB 에서는 정확한 COUNT(*) 를 사용한다.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+DEFAULT_THRESHOLD = 100000
+
+
+def estimated_row_count(model, using='default'):
+    """테이블 통계 기반 추정 행 수. 지원하지 않는 DB 면 None"""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    ModelAdmin.paginator 로 지정해서 사용한다.
+    추정치는 InnoDB 통계라 실제 행 수와 다를 수 있으므로, 필터가 걸린 목록에는 사용하지 않는다.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and not queryset.query.distinct:
+            threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', DEFAULT_THRESHOLD)
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
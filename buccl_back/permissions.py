@@ -0,0 +1,12 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsAdministrator(BasePermission):
+    """
+    운영자(is_admin 또는 슈퍼유저)만 허용.
+    이 프로젝트에서 is_staff 는 강사 구분에 쓰이므로 DRF 의 IsAdminUser 를 사용하지 않는다.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_superuser or getattr(user, 'is_admin', False)))
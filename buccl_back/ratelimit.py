@@ -0,0 +1,135 @@
+"""
+캐시 기반 요청 횟수 제한 (sliding window counter)
+
+@ratelimit('scope') 를 APIView 메소드에 붙이면 settings.RATELIMITS[scope] 규칙으로 요청 횟수를 센다.
+뷰 본문(DB 조회, 비밀번호 해시, 문자 발송 등)보다 먼저 실행되고, 초과하면 429 + Retry-After 헤더를 돌려준다.
+
+    RATELIMITS = {
+        'sms_send': [('data:hp', '5/h'), ('ip', '30/h')],
+    }
+
+- 키: 'ip'(클라이언트 IP), 'user'(인증된 사용자 pk), 'data:<필드>'(요청 본문 값, 예: data:hp). 값이 없는 키는 건너뛴다.
+  data 키는 본문에 값이 없으면 쿼리 파라미터를 본다. (GET 요청)
+- 횟수: '<횟수>/<기간>' 기간은 s, m, h, d 와 배수(예: '10/15m')
+- 저장소: CACHES['default'] (운영 Redis, 개발 locmem). 고정 창 카운터 2개(이번/이전 창)를 이전 창의 남은 비율로 가중해
+  sliding window 를 근사한다. 규칙마다 캐시 호출 3회(add, incr, get), DB 조회 없음.
+"""
+import functools
+import hashlib
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from buccl_back.error_code import ErrorCode
+
+PERIOD_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_PATTERN = re.compile(r'^(\d+)/(\d*)([smhd])$')
+
+
+def parse_rate(rate):
+    """'5/10m' -> (5, 600)"""
+    match = RATE_PATTERN.match(rate.replace(' ', ''))
+    if not match:
+        raise ValueError(f"잘못된 rate 형식: {rate}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIOD_SECONDS[unit]
+
+
+def client_ip(request):
+    """
+    RATELIMIT_IP_HEADER(예: X-Forwarded-For, 프록시 뒤) 가 있으면 신뢰하는 프록시가 붙인 값, 없으면 REMOTE_ADDR.
+    왼쪽 값은 클라이언트가 마음대로 넣을 수 있으므로, 오른쪽에서 RATELIMIT_TRUSTED_PROXY_COUNT 번째 값을 쓴다.
+    """
+    header = getattr(settings, 'RATELIMIT_IP_HEADER', None)
+    if header:
+        hops = [hop.strip() for hop in request.headers.get(header, '').split(',') if hop.strip()]
+        proxy_count = getattr(settings, 'RATELIMIT_TRUSTED_PROXY_COUNT', 1)
+        if proxy_count > 0 and len(hops) >= proxy_count:
+            return hops[-proxy_count]
+    return request.META.get('REMOTE_ADDR')
+
+
+def key_value(request, key):
+    if key == 'ip':
+        return client_ip(request)
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        return str(user.pk) if user and user.is_authenticated else None
+    if key.startswith('data:'):
+        data = request.data
+        value = data.get(key[5:]) if hasattr(data, 'get') else None
+        if value is None:
+            value = request.query_params.get(key[5:])
+        if value is None:
+            return None
+        return str(value).strip() or None
+    raise ValueError(f"알 수 없는 ratelimit 키: {key}")
+
+
+def hit(scope, key, value, limit, window, now=None):
+    """요청 1회를 기록하고 (허용 여부, 재시도까지 남은 초) 를 돌려준다."""
+    now = time.time() if now is None else now
+    index = int(now // window)
+    digest = hashlib.sha256(f"{key}:{value}".encode('utf-8')).hexdigest()[:32]
+    current_key = f"ratelimit:{scope}:{digest}:{index}"
+    previous_key = f"ratelimit:{scope}:{digest}:{index - 1}"
+
+    # 창이 바뀐 뒤에도 이전 창 값을 읽을 수 있도록 두 창 길이만큼 보관
+    cache.add(current_key, 0, window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:  # add 와 incr 사이에 만료/축출
+        cache.set(current_key, 1, window * 2)
+        current = 1
+    previous = cache.get(previous_key) or 0
+
+    elapsed = now - index * window
+    weight = 1 - elapsed / window
+    if previous * weight + current <= limit:
+        return True, 0
+    if current > limit:
+        # 이번 창만으로 초과: 다음 창이 시작되고 이전 창(=지금 창)의 가중치가 충분히 줄어들 때까지
+        retry_after = window - elapsed + window * (1 - limit / current)
+    else:
+        # 이전 창의 가중치가 (limit - current) / previous 까지 줄어들 때까지
+        retry_after = window * (1 - (limit - current) / previous) - elapsed
+    return False, max(1, math.ceil(retry_after))
+
+
+def check(scope, request, now=None):
+    """scope 의 모든 규칙에 요청을 기록한다. 초과한 규칙이 있으면 가장 긴 재시도 대기 초, 없으면 None"""
+    if not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return None
+    retry_after = None
+    for key, rate in settings.RATELIMITS.get(scope, ()):
+        value = key_value(request, key)
+        if value is None:
+            continue
+        limit, window = parse_rate(rate)
+        allowed, wait = hit(scope, key, value, limit, window, now=now)
+        if not allowed:
+            retry_after = max(retry_after or 0, wait)
+    return retry_after
+
+
+def ratelimit(scope):
+    """APIView 의 post 등에 사용. scope 는 settings.RATELIMITS 의 키"""
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            retry_after = check(scope, request)
+            if retry_after is not None:
+                response = Response(ErrorCode.TOO_MANY_REQUESTS, status=status.HTTP_429_TOO_MANY_REQUESTS)
+                response['Retry-After'] = str(retry_after)
+                return response
+            return view_method(view, request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
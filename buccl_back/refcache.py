@@ -0,0 +1,145 @@
+"""
+기준 데이터(Sport, Location, ProductType, UserLevel) 프로세스 내 캐시
+
+한 달에 몇 번 바뀌지 않지만 거의 모든 요청에서 조인/조회되는 테이블을 워커 메모리에 {id: 행 dict} 로 들고 있는다.
+- 무효화: post_save/post_delete 시그널이 커밋 후 공유 캐시(CACHES['default'])의 버전 카운터를 올린다.
+- 각 워커는 REFERENCE_CACHE_CHECK_SECONDS 마다 버전을 확인하고, 바뀌었으면 테이블 전체를 다시 읽는다.
+  (다른 워커의 변경은 최대 이 시간만큼 늦게 보인다)
+- QuerySet.update()/bulk_update() 처럼 시그널이 발생하지 않는 변경 뒤에는 invalidate(label) 을 직접 호출한다.
+- 이 스레드의 트랜잭션에서 바꾼 테이블은 커밋 전까지 캐시하지 않는다. (커밋되지 않은 행이 롤백 후에도 남지 않도록)
+
+행 dict 의 키는 컬럼 속성명(attname)이다. 예: {'id': 1, 'name': '서핑', ...}, UserLevel 은 'sport_id'
+돌려준 dict 는 모든 요청이 공유하므로 수정하지 않는다.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import serializers
+
+REFERENCE_MODELS = ('buccl_main.Sport', 'buccl_main.Location', 'buccl_main.ProductType', 'buccl_user.UserLevel')
+
+_lock = threading.Lock()
+# label -> {'version', 'checked_at', 'rows'(정렬 순서 list), 'by_id'}
+_tables = {}
+# 이 스레드의 열린 트랜잭션에서 바뀐 label (커밋 후 invalidate 에서 뺀다)
+_local = threading.local()
+
+
+def _pending():
+    if not hasattr(_local, 'labels'):
+        _local.labels = set()
+    return _local.labels
+
+
+def version_key(label):
+    return f"refcache:version:{label.lower()}"
+
+
+def current_version(label):
+    version = cache.get(version_key(label))
+    if version is None:
+        cache.add(version_key(label), 1, None)
+        version = cache.get(version_key(label), 1)
+    return version
+
+
+def _load(label, version):
+    model = apps.get_model(label)
+    # 기본 매니저의 정렬(Meta.ordering)을 그대로 따른다
+    rows = list(model._default_manager.values(*[field.attname for field in model._meta.concrete_fields]))
+    return {
+        'version': version,
+        'checked_at': time.monotonic(),
+        'rows': rows,
+        'by_id': {row[model._meta.pk.attname]: row for row in rows},
+    }
+
+
+def table(label):
+    """label 의 캐시된 테이블. 버전 확인 주기가 지났으면 공유 캐시의 버전과 비교해 필요 시 다시 읽는다."""
+    pending = _pending()
+    if label in pending:
+        if connection.in_atomic_block:
+            # 커밋 전: 바뀐 행을 읽되 캐시하지 않는다
+            return _load(label, None)
+        # 커밋 훅 없이 트랜잭션이 끝났다 (롤백). 그 사이 읽힌 값이 있을 수 있으므로 버린다
+        pending.discard(label)
+        _tables.pop(label, None)
+    entry = _tables.get(label)
+    interval = getattr(settings, 'REFERENCE_CACHE_CHECK_SECONDS', 5)
+    if entry is not None and time.monotonic() - entry['checked_at'] < interval:
+        return entry
+    with _lock:
+        entry = _tables.get(label)
+        if entry is not None and time.monotonic() - entry['checked_at'] < interval:
+            return entry
+        version = current_version(label)
+        if entry is not None and entry['version'] == version:
+            entry['checked_at'] = time.monotonic()
+            return entry
+        # 버전을 먼저 읽고 행을 읽으므로, 그 사이 변경이 있으면 다음 확인에서 다시 읽게 된다
+        entry = _tables[label] = _load(label, version)
+        return entry
+
+
+def get(label, pk):
+    """id 로 행 dict 조회. 없으면 None"""
+    return table(label)['by_id'].get(pk)
+
+
+def rows(label):
+    return table(label)['rows']
+
+
+def value(label, pk, field, default=None):
+    row = get(label, pk)
+    return default if row is None else row[field]
+
+
+def invalidate(label):
+    """버전을 올려 모든 워커의 캐시를 무효화하고, 이 워커의 캐시는 바로 버린다."""
+    try:
+        cache.incr(version_key(label))
+    except ValueError:  # 버전 키가 없어진 경우 (캐시 재시작/축출). 어떤 워커의 버전과도 겹치지 않는 값으로
+        cache.set(version_key(label), time.time_ns(), None)
+    _tables.pop(label, None)
+
+
+def _on_change(sender, raw=False, **kwargs):
+    label = sender._meta.label
+    # 이 워커는 바로 다시 읽고, 다른 워커용 버전은 커밋 후에 올린다
+    # (커밋 전에 올리면 다른 워커가 예전 행을 새 버전으로 캐시할 수 있다)
+    _tables.pop(label, None)
+    _pending().add(label)
+    transaction.on_commit(lambda: _committed(label))
+
+
+def _committed(label):
+    _pending().discard(label)
+    invalidate(label)
+
+
+for _label in REFERENCE_MODELS:
+    post_save.connect(_on_change, sender=_label, dispatch_uid=f"refcache_save_{_label}")
+    post_delete.connect(_on_change, sender=_label, dispatch_uid=f"refcache_delete_{_label}")
+
+
+class ReferenceField(serializers.Field):
+    """
+    FK id 로 기준 데이터 캐시에서 값을 꺼내는 읽기 전용 필드. 관계 객체 조인/조회 없이 이름 등을 채울 때 사용한다.
+    예: sport_name = ReferenceField('buccl_main.Sport', 'name', source='sport_id')
+    """
+
+    def __init__(self, label, field, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.label = label
+        self.field = field
+
+    def to_representation(self, pk):
+        return value(self.label, pk, self.field)
@@ -25,6 +25,12 @@ SECRET_KEY = secretkey.get_secret("SECRET_KEY", secrets_key)
 # 결제 관련 NICEPAY 키 설정
 NICEPAY_MERCHANT_KEY = secretkey.get_secret("NICEPAY_MERCHANT_KEY", secrets_key)
 NICEPAY_MERCHANT_ID = secretkey.get_secret("NICEPAY_MERCHANT_ID", secrets_key)
+# NicePay API 호출 설정 (buccl_main.nicepay)
+NICEPAY_CONNECT_TIMEOUT = float(os.getenv('NICEPAY_CONNECT_TIMEOUT', '3'))
+NICEPAY_READ_TIMEOUT = float(os.getenv('NICEPAY_READ_TIMEOUT', '15'))
+NICEPAY_POOL_MAXSIZE = int(os.getenv('NICEPAY_POOL_MAXSIZE', '20'))
+NICEPAY_BREAKER_THRESHOLD = int(os.getenv('NICEPAY_BREAKER_THRESHOLD', '5'))
+NICEPAY_BREAKER_RESET_SECONDS = int(os.getenv('NICEPAY_BREAKER_RESET_SECONDS', '30'))
 
 # SMS인증 관련 NICEPAY 키 설정
 NAVER_SENS_ACCESS_KEY = secretkey.get_secret("NAVER_SENS_ACCESS_KEY", secrets_key)
@@ -111,6 +117,86 @@ DATABASES = {
     }
 }
 
+# 캐시 설정: REDIS_URL 이 있으면 Redis(프로세스 간 공유), 없으면 프로세스 로컬 메모리
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# 요청 횟수 제한 (buccl_back.ratelimit): scope -> [(키, '횟수/기간'), ...]
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True') == 'True'
+# 프록시 뒤에서 클라이언트 IP 를 읽을 헤더 (예: X-Forwarded-For). 비우면 REMOTE_ADDR
+RATELIMIT_IP_HEADER = os.getenv('RATELIMIT_IP_HEADER', '')
+# 헤더 값을 붙이는 신뢰하는 프록시 수. 오른쪽에서 이 번째 값을 클라이언트 IP 로 쓴다 (왼쪽 값은 위조 가능)
+RATELIMIT_TRUSTED_PROXY_COUNT = int(os.getenv('RATELIMIT_TRUSTED_PROXY_COUNT', '1'))
+RATELIMITS = {
+    'sms_send': [('data:hp', '5/h'), ('ip', '30/h')],
+    'sms_check': [('data:hp', '10/10m'), ('ip', '60/h')],
+    'login': [('data:user_id', '10/10m'), ('ip', '60/10m')],
+    'availability': [('ip', '300/10m')],
+}
+
+# 결제 콜백 멱등 처리 (buccl_main.idempotency)
+IDEMPOTENCY_CACHE_TTL = int(os.getenv('IDEMPOTENCY_CACHE_TTL', str(60 * 60 * 24)))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', '30'))
+IDEMPOTENCY_RETENTION_DAYS = int(os.getenv('IDEMPOTENCY_RETENTION_DAYS', '30'))
+
+# 일별 매출/예약 집계 (buccl_main.rollups): 늦게 커밋된 행을 놓치지 않도록 워터마크보다 이만큼 앞에서부터 다시 확인
+ROLLUP_SAFETY_LAG_SECONDS = int(os.getenv('ROLLUP_SAFETY_LAG_SECONDS', '300'))
+# 리포트 API 한 번에 조회 가능한 최대 일수
+REPORT_MAX_DAYS = int(os.getenv('REPORT_MAX_DAYS', '366'))
+
+# 결제 전 검증 (buccl_main.checkout): 카탈로그 가격 캐시 TTL, 서명된 가격 견적 유효 시간
+CATALOG_PRICE_CACHE_TTL = int(os.getenv('CATALOG_PRICE_CACHE_TTL', '30'))
+CHECKOUT_QUOTE_TTL_SECONDS = int(os.getenv('CHECKOUT_QUOTE_TTL_SECONDS', '900'))
+
+# 기준 데이터(Sport, Location, ProductType, UserLevel) 캐시 (buccl_back.refcache): 워커가 공유 캐시의 버전을 확인하는 주기(초)
+REFERENCE_CACHE_CHECK_SECONDS = int(os.getenv('REFERENCE_CACHE_CHECK_SECONDS', '5'))
+
+# 가까운 장소 검색 (buccl_main.geo): 처음 찾는 반경, 최대 반경(km), 최대 결과 수
+NEARBY_INITIAL_RADIUS_KM = float(os.getenv('NEARBY_INITIAL_RADIUS_KM', '5'))
+NEARBY_MAX_RADIUS_KM = float(os.getenv('NEARBY_MAX_RADIUS_KM', '500'))
+NEARBY_MAX_RESULTS = int(os.getenv('NEARBY_MAX_RESULTS', '50'))
+
+# 결제 미완료 주문 정리 (buccl_main.sweeper, sweep_stale_orders 명령어)
+STALE_ORDER_TTL_MINUTES = int(os.getenv('STALE_ORDER_TTL_MINUTES', '60'))
+STALE_ORDER_BATCH_SIZE = int(os.getenv('STALE_ORDER_BATCH_SIZE', '500'))
+STALE_ORDER_NET_CANCEL_GATEWAY = os.getenv('STALE_ORDER_NET_CANCEL_GATEWAY', 'buccl_main.sweeper.NicePayNetCancelGateway')
+
+# 가입 중복 확인 필터 (buccl_user.availability): 오탐률, 다른 워커 변경 확인 주기(초), 전체 재구축 주기(초)
+AVAILABILITY_FILTER_ERROR_RATE = 0.01
+AVAILABILITY_FILTER_CHECK_SECONDS = 5
+AVAILABILITY_FILTER_REBUILD_SECONDS = 600
+AVAILABILITY_MAX_CANDIDATES = 20  # 한 요청에서 확인할 수 있는 값 개수
+
+# 자격증 업로드 (buccl_user.certificates): 최대 크기, 허용 형식(파일 내용으로 판별), 검증 스레드 수
+CERTIFICATE_MAX_BYTES = 10 * 1024 * 1024
+CERTIFICATE_ALLOWED_TYPES = ('image/jpeg', 'image/png', 'application/pdf')
+CERTIFICATE_VALIDATION_WORKERS = 1
+
+# 문자 인증번호 유효 시간(분), 허용하는 틀린 횟수 (buccl_user.models.AuthSMS)
+AUTH_SMS_TTL_MINUTES = int(os.getenv('AUTH_SMS_TTL_MINUTES', '5'))
+AUTH_SMS_MAX_ATTEMPTS = int(os.getenv('AUTH_SMS_MAX_ATTEMPTS', '5'))
+
+# 문자 발송 (buccl_user.sms): 커밋 후 프로세스 내 큐에 넣고 백그라운드 스레드가 묶어서 발송
+NAVER_SENS_SERVICE_ID = os.getenv('NAVER_SENS_SERVICE_ID', 'ncp:sms:kr:328805329142:nuseum')
+NAVER_SENS_SENDER = os.getenv('NAVER_SENS_SENDER', '01091161927')
+SMS_CONNECT_TIMEOUT = float(os.getenv('SMS_CONNECT_TIMEOUT', '3'))
+SMS_READ_TIMEOUT = float(os.getenv('SMS_READ_TIMEOUT', '10'))
+SMS_MAX_RETRIES = int(os.getenv('SMS_MAX_RETRIES', '3'))
+SMS_BATCH_SIZE = int(os.getenv('SMS_BATCH_SIZE', '100'))  # SENS 1회 호출 최대 100건
+SMS_BATCH_LINGER_SECONDS = float(os.getenv('SMS_BATCH_LINGER_SECONDS', '0.05'))
+
 # 비밀번호 검증 설정
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -134,6 +220,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # URL 설정
 APPEND_SLASH = True
 
+# Admin changelist: 필터 없는 목록에서 이 행 수 이상이면 COUNT(*) 대신 DB 추정치 사용 (buccl_back.paginator)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
 # 사용자 모델 설정
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -203,9 +292,8 @@ LOGGING = {
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.SessionAuthentication',  # 세션 인증
-        'rest_framework.authentication.TokenAuthentication',  # Token 인증
+        # access 토큰(Bearer 헤더 또는 access 쿠키)을 요청당 한 번 검증. Basic(요청마다 PBKDF2)/세션 인증은 사용하지 않는다
+        'buccl_user.authentication.JWTCookieAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
@@ -235,6 +323,9 @@ SESSION_COOKIE_SECURE = True
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://moddy.net')
 
 # JWT 설정
+# 인증 사용자 캐시 TTL(초) (buccl_user.authentication)
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '60'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=int(os.getenv('ACCESS_TOKEN_DAYS', '1'))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('REFRESH_TOKEN_DAYS', '1'))),
@@ -3,6 +3,8 @@ from django.utils.html import format_html
 from django.db.models import Count
 from django.utils import timezone
 
+from buccl_back.paginator import EstimatedCountPaginator
+
 from .models import (
     LessonProduct, InstructorSchedule, Ticket, 
     SessionReservation, PracticeSession, PracticeReservation
@@ -14,6 +16,8 @@ class LessonProductAdmin(admin.ModelAdmin):
     list_display = ('title', 'sport', 'sessions_count', 'price', 'created_at')
     list_filter = ('sport', 'created_at')
     search_fields = ('title', 'description', 'sport__name')
+    list_select_related = ('sport',)
+    autocomplete_fields = ('sport',)
     readonly_fields = ('created_at', 'updated_at')
     
     fieldsets = (
@@ -33,14 +37,19 @@ class SessionReservationInline(admin.TabularInline):
     model = SessionReservation
     extra = 0
     fields = ('ticket', 'status', 'day_order', 'is_theory', 'is_waiting', 'queue_position')
+    autocomplete_fields = ('ticket',)
     readonly_fields = ('created_at', 'cancelled_at')
 
 # InstructorSchedule Admin
 @admin.register(InstructorSchedule)
 class InstructorScheduleAdmin(admin.ModelAdmin):
     list_display = ('lesson_product', 'instructor', 'date', 'time_display', 'location', 'capacity', 'current_bookings', 'status')
-    list_filter = ('status', 'date', 'lesson_product', 'instructor')
+    list_filter = ('status', 'date', 'lesson_product', ('instructor', admin.RelatedOnlyFieldListFilter))
     search_fields = ('lesson_product__title', 'instructor__user_id', 'instructor__name', 'location__name')
+    list_select_related = ('lesson_product', 'instructor', 'location')
+    autocomplete_fields = ('lesson_product', 'instructor', 'location')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = ('created_at', 'updated_at', 'current_bookings')
     inlines = [SessionReservationInline]
     
@@ -70,6 +79,10 @@ class TicketAdmin(admin.ModelAdmin):
     list_display = ('user', 'lesson_product', 'sessions_total', 'sessions_used', 'status', 'valid_until')
     list_filter = ('status', 'created_at')
     search_fields = ('user__user_id', 'user__name', 'lesson_product__title')
+    list_select_related = ('user', 'lesson_product')
+    autocomplete_fields = ('user', 'lesson_product', 'order')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = ('sessions_used', 'created_at', 'updated_at')
     
     fieldsets = (
@@ -93,6 +106,11 @@ class SessionReservationAdmin(admin.ModelAdmin):
     list_display = ('ticket', 'schedule', 'status', 'day_order', 'is_theory', 'is_waiting', 'created_at')
     list_filter = ('status', 'is_theory', 'is_waiting', 'created_at')
     search_fields = ('ticket__user__user_id', 'ticket__user__name', 'schedule__lesson_product__title')
+    # Ticket.__str__, InstructorSchedule.__str__ 에서 참조하는 관계까지 함께 조회
+    list_select_related = ('ticket__user', 'ticket__lesson_product', 'schedule__lesson_product', 'schedule__instructor')
+    autocomplete_fields = ('ticket', 'schedule')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = ('created_at', 'cancelled_at')
     
     fieldsets = (
@@ -122,14 +140,17 @@ class PracticeReservationInline(admin.TabularInline):
     model = PracticeReservation
     extra = 0
     fields = ('user', 'status', 'is_waiting', 'queue_position')
+    autocomplete_fields = ('user',)
     readonly_fields = ('created_at',)
 
 # PracticeSession Admin
 @admin.register(PracticeSession)
 class PracticeSessionAdmin(admin.ModelAdmin):
     list_display = ('title', 'sport', 'instructor', 'date', 'time_display', 'location', 'capacity', 'current_bookings', 'status')
-    list_filter = ('status', 'date', 'sport', 'instructor', 'location')
+    list_filter = ('status', 'date', 'sport', ('instructor', admin.RelatedOnlyFieldListFilter), 'location')
     search_fields = ('title', 'sport__name', 'instructor__user_id', 'instructor__name')
+    list_select_related = ('sport', 'instructor', 'location')
+    autocomplete_fields = ('sport', 'instructor', 'location', 'base_schedule')
     readonly_fields = ('created_at', 'updated_at', 'current_bookings', 'waiting_count_display')
     inlines = [PracticeReservationInline]
     
@@ -163,6 +184,11 @@ class PracticeReservationAdmin(admin.ModelAdmin):
     list_display = ('user', 'practice_session', 'status', 'waiting_status', 'created_at')
     list_filter = ('status', 'is_waiting', 'created_at')
     search_fields = ('user__user_id', 'user__name', 'practice_session__title', 'practice_session__sport__name')
+    # PracticeSession.__str__ 는 title 이 없으면 sport.name 을 사용
+    list_select_related = ('user', 'practice_session__sport')
+    autocomplete_fields = ('user', 'practice_session')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = ('created_at', 'cancelled_at')
     
     fieldsets = (
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_lessons', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='instructorschedule',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='sessionreservation',
+            name='cancelled_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -57,7 +57,7 @@ class InstructorSchedule(models.Model):
     version = models.PositiveIntegerField(default=0) # 낙관적 잠금을 위한 버전 필드
 
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True) # 예약 집계(DailyBookings) 증분 갱신 기준
 
     class Meta:
         verbose_name = '강사 스케줄'
@@ -189,7 +189,7 @@ class SessionReservation(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='RESERVED', db_index=True)
 
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    cancelled_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True, db_index=True) # 예약 집계(DailyBookings) 증분 갱신 기준
 
     class Meta:
         verbose_name = '레슨 세션 예약'
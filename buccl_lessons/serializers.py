@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from buccl_back.refcache import ReferenceField
 from .models import LessonProduct, InstructorSchedule, Ticket, SessionReservation, PracticeSession, PracticeReservation
 
 
@@ -13,8 +14,8 @@ class InstructorScheduleSerializer(serializers.ModelSerializer):
     lesson_product_title = serializers.CharField(source='lesson_product.title', read_only=True)
     instructor_name = serializers.CharField(source='instructor.user_id', read_only=True)
     available_spots = serializers.IntegerField(read_only=True)
-    sport_name = serializers.CharField(source='lesson_product.sport.name', read_only=True)
-    location_name = serializers.CharField(source='location.name', read_only=True)
+    sport_name = ReferenceField('buccl_main.Sport', 'name', source='lesson_product.sport_id')
+    location_name = ReferenceField('buccl_main.Location', 'name', source='location_id')
     waiting_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -65,8 +66,8 @@ class SessionReservationSerializer(serializers.ModelSerializer):
 class PracticeSessionSerializer(serializers.ModelSerializer):
     instructor_name = serializers.CharField(source='instructor.user_id', read_only=True)
     waiting_count = serializers.IntegerField(read_only=True)
-    sport_name = serializers.CharField(source='sport.name', read_only=True)
-    location_name = serializers.CharField(source='location.name', read_only=True)
+    sport_name = ReferenceField('buccl_main.Sport', 'name', source='sport_id')
+    location_name = ReferenceField('buccl_main.Location', 'name', source='location_id')
 
     class Meta:
         model = PracticeSession
@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.db.models import Q, F
+from django.utils import timezone
 
 from .models import (
     LessonProduct, InstructorSchedule, Ticket, SessionReservation,
@@ -30,9 +31,8 @@ class InstructorScheduleViewSet(viewsets.ModelViewSet):
         # ✅ 최적화: 관련된 모든 데이터를 한 번에 가져오기
         queryset = InstructorSchedule.objects.select_related(
             'lesson_product',           # 레슨 상품 정보
-            'lesson_product__sport',    # 스포츠 정보  
             'instructor',               # 강사 정보
-            'location'                  # 장소 정보
+            # 스포츠/장소 이름은 기준 데이터 캐시(buccl_back.refcache)에서 채운다
         ).prefetch_related(
             # 예약 정보도 미리 가져오기 (대기자 수 계산용)
             'reservations'
@@ -317,7 +317,8 @@ class CancelSessionView(APIView):
             with transaction.atomic():
                 # Update reservation status
                 reservation.status = 'CANCELLED'
-                reservation.save(update_fields=['status'])
+                reservation.cancelled_at = timezone.now()
+                reservation.save(update_fields=['status', 'cancelled_at'])
                 
                 if not reservation.is_waiting:
                     # Update current bookings for regular reservation
@@ -361,7 +362,8 @@ class CancelSessionView(APIView):
             with transaction.atomic():
                 # Update reservation status
                 reservation.status = 'CANCELLED'
-                reservation.save(update_fields=['status'])
+                reservation.cancelled_at = timezone.now()
+                reservation.save(update_fields=['status', 'cancelled_at'])
                 
                 # Update current bookings
                 schedule.current_bookings = F('current_bookings') - 1
@@ -378,8 +380,7 @@ class PracticeSessionViewSet(viewsets.ModelViewSet):
         # ✅ 최적화: 관련된 모든 데이터를 한 번에 가져오기
         queryset = PracticeSession.objects.select_related(
             'instructor',                    # 강사 정보
-            'sport',                        # 스포츠 정보
-            'location',                     # 장소 정보
+            # 스포츠/장소 이름은 기준 데이터 캐시(buccl_back.refcache)에서 채운다
             'base_schedule',                # 기본 스케줄 정보 (있다면)
             'base_schedule__lesson_product' # 레슨 상품 정보 (brand_name용)
         ).prefetch_related(
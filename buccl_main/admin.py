@@ -5,11 +5,12 @@ from .models import (
     Sport, Location, 
     ClassProduct, ProductImage, ClassReview, ReviewImage,
     TravelProduct,
-    Product, ProductType, Order, Payment
+    Product, ProductType, Order, Payment, PaymentEvent
 )
 from django import forms
 from django.utils.html import format_html
 from django.db.models import Count
+from buccl_back.paginator import EstimatedCountPaginator
 
 # 기본 등록 모델들은 유지
 @admin.register(Sport)
@@ -54,6 +55,8 @@ class ProductTypeAdmin(admin.ModelAdmin):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'product_type', 'base_price', 'is_active', 'created_at')
     list_filter = ('product_type', 'is_active')
+    list_select_related = ('product_type',)
+    autocomplete_fields = ('class_product', 'travel_product', 'lesson_product')
     search_fields = ('name', 'description')
     fieldsets = (
         ('기본 정보', {
@@ -72,23 +75,44 @@ class ProductAdmin(admin.ModelAdmin):
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('user', 'product', 'quantity', 'total_amount', 'status', 'created_at')
     list_filter = ('status', 'created_at')
+    # Product.__str__ 가 product_type.name 을 사용
+    list_select_related = ('user', 'product', 'product__product_type')
+    autocomplete_fields = ('user', 'product')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     search_fields = ('user__user_id', 'user__name', 'product__name')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'payment_attempt_count', 'last_payment_attempt_at')
     fieldsets = (
         ('주문 정보', {
             'fields': ('user', 'product', 'quantity', 'total_amount', 'status')
         }),
         ('추가 정보', {
-            'fields': ('order_details', 'created_at', 'updated_at')
+            'fields': ('order_details', 'payment_attempt_count', 'last_payment_attempt_at', 'created_at', 'updated_at')
         }),
     )
 
+class PaymentEventInline(admin.TabularInline):
+    model = PaymentEvent
+    extra = 0
+    fields = ('type', 'at', 'code', 'payload')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ('order', 'amount', 'status', 'payment_method_type', 'created_at', 'capture_completed_at')
     list_filter = ('status', 'created_at')
     search_fields = ('order__user__user_id', 'order__user__name', 'tid')
-    readonly_fields = ('created_at', 'updated_at', 'auth_completed_at', 'capture_completed_at')
+    # Order.__str__ 가 user.user_id, product.name 을 사용
+    list_select_related = ('order__user', 'order__product')
+    autocomplete_fields = ('order',)
+    inlines = [PaymentEventInline]
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    readonly_fields = ('created_at', 'updated_at', 'auth_completed_at', 'capture_completed_at', 'raw_data')
     fieldsets = (
         ('결제 정보', {
             'fields': ('order', 'amount', 'status', 'payment_method_type', 'payment_method_detail', 'tid')
@@ -97,12 +121,9 @@ class PaymentAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at', 'auth_completed_at', 'capture_completed_at')
         }),
         ('추가 정보', {
-            'fields': ('payment_method_details', 'error_data')
+            'fields': ('payment_method_details', 'error_data', 'raw_data')
         }),
     )
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('order', 'order__user', 'order__product')
 
 
 # 나머지 모델 어드민 유지
@@ -113,6 +134,7 @@ class TravelProductAdmin(admin.ModelAdmin):
     search_fields = ('name', 'location', 'guide', 'requirements', 'detailed_content')
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'start_date'
+    autocomplete_fields = ('creator',)
     
     fieldsets = (
         ('기본 정보', {
@@ -182,8 +204,11 @@ class ClassProductAdmin(admin.ModelAdmin):
             return f'{obj.discount_price:,}원 (원가: {obj.original_price:,}원)'
         return f'{obj.original_price:,}원'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_review_count=Count('reviews'))
+
     def review_count(self, obj):
-        return obj.reviews.count()
+        return obj._review_count
     
     def main_image_preview(self, obj):
         if obj.main_image:
@@ -192,6 +217,7 @@ class ClassProductAdmin(admin.ModelAdmin):
     
     price_display.short_description = '판매가'
     review_count.short_description = '리뷰 수'
+    review_count.admin_order_field = '_review_count'
     main_image_preview.short_description = '메인 이미지 미리보기'
 
 # ReviewImageInline 및 ClassReview, ProductImage 어드민 유지
@@ -211,10 +237,14 @@ class ReviewImageInline(admin.TabularInline):
 @admin.register(ClassReview)
 class ClassReviewAdmin(admin.ModelAdmin):
     list_display = ('user', 'product', 'rating_stars', 'content_preview', 'image_count', 'created_at')
-    list_filter = ('rating', 'created_at', 'product')
+    list_filter = ('rating', 'created_at', ('product', admin.RelatedOnlyFieldListFilter))
     search_fields = ('user__user_id', 'user__name', 'product__title', 'content')
     readonly_fields = ('created_at', 'updated_at', 'rating_stars')
     inlines = [ReviewImageInline]
+    list_select_related = ('user', 'product')
+    autocomplete_fields = ('user', 'product')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     fieldsets = (
         ('리뷰 정보', {
@@ -237,19 +267,25 @@ class ClassReviewAdmin(admin.ModelAdmin):
             return f"{obj.content[:100]}..."
         return obj.content
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_image_count=Count('images'))
+
     def image_count(self, obj):
-        return obj.images.count()
+        return obj._image_count
     
     rating_stars.short_description = '평점'
     content_preview.short_description = '리뷰 내용'
     image_count.short_description = '이미지 수'
+    image_count.admin_order_field = '_image_count'
 
 # ClassOrder 관련 어드민 제거하고 ProductImage 어드민은 유지
 @admin.register(ProductImage)
 class ProductImageAdmin(admin.ModelAdmin):
     list_display = ('product', 'is_detail', 'image_preview')
-    list_filter = ('is_detail', 'product')
+    list_filter = ('is_detail', ('product', admin.RelatedOnlyFieldListFilter))
     search_fields = ('product__title',)
+    list_select_related = ('product',)
+    autocomplete_fields = ('product',)
     
     def image_preview(self, obj):
         if obj.image:
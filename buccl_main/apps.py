@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class BucclMainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'buccl_main'
+
+    def ready(self):
+        from . import signals
+        from buccl_back import refcache  # 기준 데이터 캐시 무효화 시그널 등록
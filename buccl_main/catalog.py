@@ -0,0 +1,223 @@
+"""
+상품 카탈로그(CatalogEntry) 동기화 로직
+
+Product 와 유형별 상품(ClassProduct, TravelProduct, LessonProduct)이 저장/삭제될 때
+signals.py 에서 refresh_products() 를 호출해 해당 상품의 스냅샷만 다시 계산한다.
+전체 재구축은 `python manage.py rebuild_catalog` 를 사용한다.
+
+결제 전 검증(buccl_main.checkout)은 cached_price_snapshot() 으로 가격/판매 가능 여부를 캐시에서 읽고,
+없으면 price_snapshot_queryset() 으로 조회해 cache_price_snapshot() 으로 캐시한다.
+카탈로그가 갱신되면 해당 상품의 캐시를 지운다. (invalidate_price_snapshots)
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogEntry, Product
+
+logger = logging.getLogger('django')
+
+CATALOG_FIELDS = (
+    'product_type_code', 'product_type_name', 'source_id', 'name', 'price',
+    'display_price', 'discount_rate', 'main_image', 'sport_id', 'is_available', 'available_until',
+)
+
+_sync_state = threading.local()
+
+# 유형 코드 -> Product 의 유형별 상품 FK 필드명
+SOURCE_FIELDS = {
+    'CLASS': 'class_product',
+    'TRAVEL': 'travel_product',
+    'LESSON': 'lesson_product',
+}
+
+
+def sync_enabled():
+    return not getattr(_sync_state, 'suspended', False)
+
+
+@contextmanager
+def suspend_sync():
+    """
+    블록 안에서는 시그널에 의한 카탈로그 갱신을 건너뛴다. (현재 스레드 한정)
+    대량 import 처럼 행마다 갱신할 필요가 없는 작업에서 사용하고, 끝난 뒤 refresh_changed_since() 로 한 번에 반영한다.
+    """
+    previous = getattr(_sync_state, 'suspended', False)
+    _sync_state.suspended = True
+    try:
+        yield
+    finally:
+        _sync_state.suspended = previous
+
+
+def catalog_queryset():
+    """스냅샷 계산에 필요한 테이블을 한 번에 join 한 Product 쿼리셋"""
+    return Product.objects.select_related(
+        'product_type', 'class_product', 'travel_product', 'lesson_product',
+    )
+
+
+def build_entry_values(product):
+    """Product 1건의 카탈로그 필드 값을 계산한다. (추가 쿼리 없음, catalog_queryset() 기준)"""
+    type_code = product.product_type.code.upper()
+    values = {
+        'product_type_code': type_code,
+        'product_type_name': product.product_type.name,
+        'source_id': None,
+        'name': product.name,
+        'price': product.base_price,
+        'display_price': product.base_price,
+        'discount_rate': 0,
+        'main_image': '',
+        'sport_id': None,
+        'is_available': product.is_active,
+        'available_until': None,
+    }
+
+    if type_code == 'CLASS' and product.class_product:
+        class_product = product.class_product
+        values.update(
+            source_id=class_product.pk,
+            price=class_product.original_price,
+            display_price=class_product.display_price,
+            discount_rate=class_product.discount_rate,
+            main_image=class_product.main_image.name or '',
+        )
+    elif type_code == 'TRAVEL' and product.travel_product:
+        travel_product = product.travel_product
+        values.update(
+            source_id=travel_product.pk,
+            price=travel_product.price,
+            display_price=travel_product.price,
+            available_until=travel_product.start_date,
+        )
+    elif type_code == 'LESSON' and product.lesson_product:
+        lesson_product = product.lesson_product
+        values.update(
+            source_id=lesson_product.pk,
+            price=lesson_product.price,
+            display_price=lesson_product.price,
+            sport_id=lesson_product.sport_id,
+        )
+    return values
+
+
+def refresh_products(product_ids):
+    """
+    주어진 Product 들의 카탈로그 행을 다시 계산한다.
+    상품 조회 1회 + 기존 행 조회 1회 + bulk insert/update 로 처리하며,
+    더 이상 존재하지 않는 상품의 행은 삭제한다.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+
+    with transaction.atomic():
+        existing = {
+            entry.product_id: entry
+            for entry in CatalogEntry.objects.filter(product_id__in=product_ids)
+        }
+        to_create, to_update = [], []
+        for product in catalog_queryset().filter(pk__in=product_ids):
+            values = build_entry_values(product)
+            entry = existing.pop(product.pk, None)
+            if entry is None:
+                to_create.append(CatalogEntry(product=product, **values))
+                continue
+            if any(getattr(entry, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(entry, field, value)
+                to_update.append(entry)
+
+        if to_create:
+            CatalogEntry.objects.bulk_create(to_create)
+        if to_update:
+            # bulk_update 는 auto_now 를 채우지 않으므로 updated_at 을 직접 포함
+            now = timezone.now()
+            for entry in to_update:
+                entry.updated_at = now
+            CatalogEntry.objects.bulk_update(to_update, CATALOG_FIELDS + ('updated_at',))
+        if existing:
+            CatalogEntry.objects.filter(pk__in=[entry.pk for entry in existing.values()]).delete()
+
+    transaction.on_commit(lambda: invalidate_price_snapshots(product_ids))
+    return len(to_create) + len(to_update)
+
+
+def refresh_source(type_code, source_id):
+    """유형별 상품(ClassProduct 등) 1건이 바뀌었을 때 이를 참조하는 Product 들을 갱신한다."""
+    field = SOURCE_FIELDS[type_code]
+    product_ids = set(Product.objects.filter(**{f'{field}_id': source_id}).values_list('pk', flat=True))
+    # 삭제된 경우 Product 의 FK 는 이미 NULL 이므로 기존 스냅샷 기준으로도 찾는다.
+    product_ids.update(
+        CatalogEntry.objects.filter(product_type_code=type_code, source_id=source_id).values_list('product_id', flat=True)
+    )
+    return refresh_products(product_ids)
+
+
+def _refresh_in_chunks(product_ids, chunk_size):
+    total = 0
+    chunk = []
+    for product_id in product_ids.iterator(chunk_size=chunk_size):
+        chunk.append(product_id)
+        if len(chunk) >= chunk_size:
+            total += refresh_products(chunk)
+            chunk = []
+    if chunk:
+        total += refresh_products(chunk)
+    return total
+
+
+def refresh_changed_since(since, chunk_size=500):
+    """since 이후 수정된 Product 들만 갱신한다. (bulk_create/bulk_update 처럼 시그널이 발생하지 않는 작업 이후 사용)"""
+    product_ids = Product.objects.filter(updated_at__gte=since).order_by('pk').values_list('pk', flat=True)
+    return _refresh_in_chunks(product_ids, chunk_size)
+
+
+def rebuild_catalog(chunk_size=500):
+    """전체 카탈로그 재구축 (rebuild_catalog 관리 명령어에서 사용)"""
+    product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+    total = _refresh_in_chunks(product_ids, chunk_size)
+
+    deleted, _ = CatalogEntry.objects.exclude(product_id__in=Product.objects.values('pk')).delete()
+    logger.info(f"rebuild_catalog: refreshed={total}, deleted={deleted}")
+    return total
+
+
+# 가격 스냅샷 캐시 (결제 전 검증용)
+PRICE_SNAPSHOT_FIELDS = ('product_id', 'product_type_code', 'name', 'display_price', 'is_available', 'available_until')
+
+
+def price_cache_key(product_id):
+    return f"catalog-price:{product_id}"
+
+
+def price_snapshot_queryset():
+    """CatalogEntry + 상품 활성 여부 + 여행 정원을 join 한 values 쿼리셋"""
+    return CatalogEntry.objects.values(
+        *PRICE_SNAPSHOT_FIELDS,
+        product_active=F('product__is_active'),
+        max_participants=F('product__travel_product__max_participants'),
+    )
+
+
+def cached_price_snapshot(product_id):
+    """캐시된 가격 스냅샷 (dict). 없으면 None"""
+    return cache.get(price_cache_key(product_id))
+
+
+def cache_price_snapshot(row):
+    """price_snapshot_queryset() 의 행을 CATALOG_PRICE_CACHE_TTL 동안 캐시하고 스냅샷을 돌려준다."""
+    snapshot = {field: row[field] for field in PRICE_SNAPSHOT_FIELDS + ('product_active', 'max_participants')}
+    cache.set(price_cache_key(row['product_id']), snapshot, getattr(settings, 'CATALOG_PRICE_CACHE_TTL', 30))
+    return snapshot
+
+
+def invalidate_price_snapshots(product_ids):
+    cache.delete_many([price_cache_key(product_id) for product_id in product_ids])
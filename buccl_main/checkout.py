@@ -0,0 +1,140 @@
+"""
+결제 전 검증 (PrePaymentCheckView / PrePaymentCheckTravelView)
+
+- 가격/판매 가능 여부는 카탈로그 가격 스냅샷 캐시(catalog.cached_price_snapshot)에서 읽는다.
+- 캐시가 없으면 CatalogEntry + Product + TravelProduct + 확정 주문 수량(서브쿼리)을 한 번의 join 쿼리로 읽는다.
+- 캐시가 있으면 여행 상품만 남은 정원 집계 쿼리 1회, 나머지 상품은 쿼리 없이 끝난다.
+- 검증에 성공하면 서명된 가격 견적(quote)을 발급한다. 승인 단계에서는 verify_quote() 로 DB 조회 없이 금액을 확인한다.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import status
+
+from buccl_back.error_code import ErrorCode
+from . import catalog
+from .models import Order
+
+QUOTE_SALT = 'buccl_main.checkout.quote'
+# 정원을 차지하는 주문 상태 (결제 진행 중 포함)
+SEAT_HOLDING_STATUSES = ('PAYMENT_PROCESSING', 'CONFIRMED', 'COMPLETED')
+
+
+class CheckoutError(Exception):
+    def __init__(self, error, http_status=status.HTTP_400_BAD_REQUEST, **extra):
+        super().__init__(error['message'])
+        self.error = error
+        self.http_status = http_status
+        self.extra = extra
+
+    def as_response_data(self):
+        return {"valid": False, **self.error, **self.extra}
+
+
+def reserved_quantity(product_ref):
+    """상품별 정원을 차지한 주문 수량 합계 (product_ref: 상품 id 또는 OuterRef)"""
+    return Coalesce(
+        Subquery(
+            Order.objects.filter(product_id=product_ref, status__in=SEAT_HOLDING_STATUSES)
+            .order_by().values('product_id').annotate(total=Sum('quantity')).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def load_product(product_id):
+    """(가격 스냅샷, 정원을 차지한 수량 또는 None). 쿼리 0~1회"""
+    snapshot = catalog.cached_price_snapshot(product_id)
+    if snapshot is None:
+        row = catalog.price_snapshot_queryset().filter(product_id=product_id).annotate(
+            reserved=reserved_quantity(OuterRef('product_id')),
+        ).first()
+        if row is None:
+            return None, None
+        return catalog.cache_price_snapshot(row), row['reserved']
+    if snapshot['max_participants'] is None:
+        return snapshot, None
+    # 정원은 주문마다 바뀌므로 캐시하지 않는다
+    reserved = Order.objects.filter(product_id=product_id, status__in=SEAT_HOLDING_STATUSES).aggregate(total=Sum('quantity'))['total']
+    return snapshot, reserved or 0
+
+
+def _parse_positive_int(value, default=None):
+    if value in (None, ''):
+        return default
+    number = int(value)
+    if number < 1:
+        raise ValueError
+    return number
+
+
+def validate_checkout(user, data, product_type=None):
+    """
+    결제 전 검증. data: product_id, quantity(기본 1), amount(클라이언트가 결제할 금액, 선택)
+    성공 시 견적 dict, 실패 시 CheckoutError
+    """
+    if not (user and user.is_authenticated and user.is_active):
+        raise CheckoutError(ErrorCode.AUTHORIZATION_HEADER_MISSING, status.HTTP_401_UNAUTHORIZED)
+    try:
+        product_id = _parse_positive_int(data.get('product_id'))
+        quantity = _parse_positive_int(data.get('quantity'), default=1)
+        expected_amount = Decimal(str(data['amount'])) if data.get('amount') not in (None, '') else None
+    except (ValueError, TypeError, InvalidOperation):
+        raise CheckoutError(ErrorCode.MISSING_REQUIRED_FIELD)
+    if product_id is None:
+        raise CheckoutError(ErrorCode.MISSING_REQUIRED_FIELD)
+
+    snapshot, reserved = load_product(product_id)
+    if snapshot is None or (product_type and snapshot['product_type_code'] != product_type):
+        raise CheckoutError(ErrorCode.PRODUCT_NOT_AVAILABLE, status.HTTP_404_NOT_FOUND)
+    available_until = snapshot['available_until']
+    if not (snapshot['is_available'] and snapshot['product_active']) or (available_until and available_until < timezone.now().date()):
+        raise CheckoutError(ErrorCode.PRODUCT_NOT_AVAILABLE, status.HTTP_409_CONFLICT)
+
+    remaining = None
+    if snapshot['max_participants'] is not None:
+        remaining = max(snapshot['max_participants'] - reserved, 0)
+        if quantity > remaining:
+            raise CheckoutError(ErrorCode.SOLD_OUT, status.HTTP_409_CONFLICT, remaining=remaining)
+
+    unit_price = snapshot['display_price']
+    amount = unit_price * quantity
+    if expected_amount is not None and expected_amount != amount:
+        raise CheckoutError(ErrorCode.PRICE_CHANGED, status.HTTP_409_CONFLICT, unit_price=unit_price, amount=amount)
+
+    return {
+        "valid": True,
+        "product_id": product_id,
+        "product_type": snapshot['product_type_code'],
+        "name": snapshot['name'],
+        "unit_price": unit_price,
+        "quantity": quantity,
+        "amount": amount,
+        "remaining": remaining,
+        "quote": issue_quote(user, product_id, quantity, amount),
+        "quote_expires_in": settings.CHECKOUT_QUOTE_TTL_SECONDS,
+    }
+
+
+def issue_quote(user, product_id, quantity, amount):
+    return signing.dumps({'u': user.pk, 'p': product_id, 'q': quantity, 'a': str(amount)}, salt=QUOTE_SALT)
+
+
+def verify_quote(token, user, amount=None):
+    """
+    견적 서명/만료/사용자(와 금액)를 확인하고 {'product_id', 'quantity', 'amount'} 를 돌려준다.
+    승인 단계에서 PG 승인 금액(Amt)과 비교하는 용도로, DB 를 조회하지 않는다.
+    """
+    try:
+        payload = signing.loads(token, salt=QUOTE_SALT, max_age=settings.CHECKOUT_QUOTE_TTL_SECONDS)
+    except signing.BadSignature:  # SignatureExpired 포함
+        raise CheckoutError(ErrorCode.INVALID_PRICE_QUOTE)
+    quoted_amount = Decimal(payload['a'])
+    if payload['u'] != user.pk or (amount is not None and Decimal(str(amount)) != quoted_amount):
+        raise CheckoutError(ErrorCode.INVALID_PRICE_QUOTE)
+    return {'product_id': payload['p'], 'quantity': payload['q'], 'amount': quoted_amount}
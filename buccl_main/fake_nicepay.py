@@ -0,0 +1,129 @@
+"""
+NicePay 대역 서버 (테스트/부하 테스트용)
+
+인증(결제창) → 승인 → 취소/망취소 흐름을 메모리 상에서 흉내 낸다. SignData 는 실제와 같은 규칙으로 검증한다.
+
+    with FakeNicePay(merchant_id, merchant_key) as fake:
+        client = fake.client()
+        auth = fake.authorize(moid='ORDER-1', amt=10000)     # returnURL 로 전달되는 값
+        client.capture(auth['TxTid'], auth['AuthToken'], 10000, auth['NextAppURL'], auth['NetCancelURL'])
+"""
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+from buccl_back.fakeserver import FakeHTTPServer
+
+from .nicepay import NicePayClient
+
+
+class FakeNicePay(FakeHTTPServer):
+    def __init__(self, merchant_id='nicepay00m', merchant_key='fake-merchant-key', **kwargs):
+        super().__init__(**kwargs)
+        self.merchant_id = merchant_id
+        self.merchant_key = merchant_key
+        self.transactions = {}
+        self._tx_lock = threading.Lock()
+        self.route('POST', '/approve', self._approve)
+        self.route('POST', '/netcancel', self._net_cancel)
+        self.route('POST', '/cancel', self._cancel)
+
+    def client(self, **kwargs):
+        """이 서버를 바라보는 NicePayClient"""
+        kwargs.setdefault('cancel_url', self.url('/cancel'))
+        kwargs.setdefault('allowed_hosts', (urlsplit(self.base_url).hostname,))
+        return NicePayClient(self.merchant_id, self.merchant_key, **kwargs)
+
+    def _sign(self, *parts):
+        return NicePayClient.sign(*parts)
+
+    def authorize(self, moid, amt, pay_method='CARD'):
+        """결제창 인증 성공 시 returnURL 로 POST 되는 값"""
+        tid = f"{self.merchant_id}01{uuid.uuid4().hex[:16]}"
+        auth_token = uuid.uuid4().hex
+        with self._tx_lock:
+            self.transactions[tid] = {
+                'moid': moid, 'amt': int(amt), 'pay_method': pay_method, 'auth_token': auth_token,
+                'status': 'AUTHORIZED', 'remain': int(amt),
+            }
+        return {
+            'AuthResultCode': '0000',
+            'AuthResultMsg': '인증 성공',
+            'AuthToken': auth_token,
+            'PayMethod': pay_method,
+            'MID': self.merchant_id,
+            'Moid': moid,
+            'Amt': str(amt),
+            'TxTid': tid,
+            'NextAppURL': self.url('/approve'),
+            'NetCancelURL': self.url('/netcancel'),
+            'Signature': self._sign(auth_token, self.merchant_id, amt, self.merchant_key),
+        }
+
+    def _approve(self, request):
+        form = request.form
+        expected = self._sign(form.get('AuthToken'), form.get('MID'), form.get('Amt'), form.get('EdiDate'), self.merchant_key)
+        with self._tx_lock:
+            tx = self.transactions.get(form.get('TID'))
+            if form.get('SignData') != expected:
+                return 200, {'ResultCode': 'A123', 'ResultMsg': '위변조 데이터 검증 오류'}
+            if tx is None or tx['auth_token'] != form.get('AuthToken') or tx['status'] != 'AUTHORIZED':
+                return 200, {'ResultCode': '3011', 'ResultMsg': '승인 불가 거래'}
+            if int(form.get('Amt')) != tx['amt']:
+                return 200, {'ResultCode': '3041', 'ResultMsg': '금액 불일치'}
+            tx['status'] = 'APPROVED'
+        tid, amt = form['TID'], form['Amt']
+        return 200, {
+            'ResultCode': '3001',
+            'ResultMsg': '카드 결제 성공',
+            'Amt': amt,
+            'MID': self.merchant_id,
+            'Moid': tx['moid'],
+            'TID': tid,
+            'AuthCode': uuid.uuid4().hex[:8],
+            'AuthDate': form.get('EdiDate', '')[2:],
+            'PayMethod': tx['pay_method'],
+            'Signature': self._sign(tid, self.merchant_id, amt, self.merchant_key),
+            'MallReserved': form.get('MallReserved', ''),
+        }
+
+    def _net_cancel(self, request):
+        form = request.form
+        expected = self._sign(form.get('AuthToken'), form.get('MID'), form.get('Amt'), form.get('EdiDate'), self.merchant_key)
+        if form.get('NetCancel') != '1' or form.get('SignData') != expected:
+            return 200, {'ResultCode': '2003', 'ResultMsg': '망취소 요청 오류'}
+        with self._tx_lock:
+            tx = self.transactions.get(form.get('TID'))
+            if tx is None:
+                return 200, {'ResultCode': '2012', 'ResultMsg': '거래 없음'}
+            tx['status'] = 'NET_CANCELLED'
+            tx['remain'] = 0
+        return 200, {'ResultCode': '2001', 'ResultMsg': '취소 성공', 'TID': form['TID'], 'CancelAmt': form.get('Amt'), 'RemainAmt': '0'}
+
+    def _cancel(self, request):
+        form = request.form
+        expected = self._sign(form.get('MID'), form.get('CancelAmt'), form.get('EdiDate'), self.merchant_key)
+        if form.get('SignData') != expected:
+            return 200, {'ResultCode': '2003', 'ResultMsg': '위변조 데이터 검증 오류'}
+        with self._tx_lock:
+            tx = self.transactions.get(form.get('TID'))
+            if tx is None or tx['status'] != 'APPROVED':
+                return 200, {'ResultCode': '2012', 'ResultMsg': '취소 불가 거래'}
+            cancel_amt = int(form.get('CancelAmt'))
+            partial = form.get('PartialCancelCode') == '1'
+            if cancel_amt > tx['remain'] or (not partial and cancel_amt != tx['remain']):
+                return 200, {'ResultCode': '2032', 'ResultMsg': '취소 금액 오류'}
+            tx['remain'] -= cancel_amt
+            if tx['remain'] == 0:
+                tx['status'] = 'CANCELLED'
+            remain = tx['remain']
+        return 200, {
+            'ResultCode': '2001',
+            'ResultMsg': '취소 성공',
+            'TID': form['TID'],
+            'MID': self.merchant_id,
+            'Moid': form.get('Moid'),
+            'CancelAmt': str(cancel_amt),
+            'RemainAmt': str(remain),
+            'Signature': self._sign(form['TID'], self.merchant_id, cancel_amt, self.merchant_key),
+        }
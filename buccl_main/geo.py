@@ -0,0 +1,150 @@
+"""
+가까운 장소 검색 (geohash 버킷 인덱스)
+
+Location.geohash 에 좌표의 geohash(GEOHASH_PRECISION 자리)를 저장하고 인덱스를 건다.
+검색은 반경에 맞는 자릿수의 geohash 셀(중심 + 주변 8칸)을 prefix(LIKE 'xxx%') 조건으로 골라
+인덱스 범위 스캔으로 후보를 줄이고, 위경도 bounding box 로 한 번 더 거른 뒤
+하버사인 거리를 SQL 식으로 계산해 DB 에서 정렬/LIMIT 한다. (후보를 파이썬으로 가져와 한 건씩 계산하지 않는다)
+반경 안의 결과가 k 개보다 적으면 반경을 두 배씩 늘려 다시 찾는다.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_LAT_DEGREE = 111.32
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+# geohash 자릿수별 셀 크기 (경도 방향 폭(적도 기준), 위도 방향 높이) km
+CELL_SIZE_KM = {
+    1: (5009.4, 4992.6), 2: (1252.3, 624.1), 3: (156.5, 156.0), 4: (39.1, 19.5),
+    5: (4.89, 4.89), 6: (1.22, 0.61), 7: (0.153, 0.153),
+}
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def decode_bounds(geohash):
+    """(min_lat, max_lat, min_lng, max_lng)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        index = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if index >> shift & 1:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def fill_geohash(queryset, batch_size=500):
+    """좌표가 있는 장소의 geohash 를 다시 계산해 저장한다. (loaddata 등 save() 를 거치지 않은 행 보정용)"""
+    locations = list(queryset.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude'))
+    for location in locations:
+        location.geohash = encode(location.latitude, location.longitude)
+    queryset.model.objects.bulk_update(locations, ['geohash'], batch_size=batch_size)
+    return len(locations)
+
+
+def neighbour_cells(latitude, longitude, precision):
+    """좌표가 속한 셀과 주변 8칸의 geohash (경계 밖은 제외)"""
+    min_lat, max_lat, min_lng, max_lng = decode_bounds(encode(latitude, longitude, precision))
+    lat_step, lng_step = max_lat - min_lat, max_lng - min_lng
+    center_lat, center_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    cells = set()
+    for dlat in (-1, 0, 1):
+        for dlng in (-1, 0, 1):
+            lat = center_lat + dlat * lat_step
+            if -90 <= lat <= 90:
+                lng = (center_lng + dlng * lng_step + 180) % 360 - 180
+                cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def precision_for_radius(radius_km, latitude):
+    """주변 8칸까지 보면 반경 전체가 덮이는 가장 긴 자릿수 (반경이 셀의 짧은 변보다 작아야 한다)"""
+    shrink = math.cos(math.radians(latitude))  # 고위도일수록 경도 방향 폭이 줄어든다
+    for precision in sorted(CELL_SIZE_KM, reverse=True):
+        width, height = CELL_SIZE_KM[precision]
+        if min(width * shrink, height) >= radius_km:
+            return precision
+    return None  # 대륙 단위 반경: geohash 조건 없이 bounding box 만 사용
+
+
+def bounding_box(latitude, longitude, radius_km):
+    lat_delta = radius_km / KM_PER_LAT_DEGREE
+    lng_delta = radius_km / (KM_PER_LAT_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return {
+        'latitude__gte': latitude - lat_delta, 'latitude__lte': latitude + lat_delta,
+        'longitude__gte': longitude - lng_delta, 'longitude__lte': longitude + lng_delta,
+    }
+
+
+def distance_expression(latitude, longitude):
+    """하버사인 거리(km) SQL 식"""
+    half_dlat = Radians(F('latitude') - Value(latitude)) / 2
+    half_dlng = Radians(F('longitude') - Value(longitude)) / 2
+    a = Power(Sin(half_dlat), 2) + Value(math.cos(math.radians(latitude))) * Cos(Radians(F('latitude'))) * Power(Sin(half_dlng), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+
+
+def candidate_queryset(queryset, latitude, longitude, radius_km, sport_ids=None, category=None):
+    """queryset: Location 쿼리셋"""
+    queryset = queryset.filter(geohash__isnull=False, **bounding_box(latitude, longitude, radius_km))
+    precision = precision_for_radius(radius_km, latitude)
+    if precision is not None:
+        cells = Q()
+        for cell in neighbour_cells(latitude, longitude, precision):
+            cells |= Q(geohash__startswith=cell)
+        queryset = queryset.filter(cells)
+    if category:
+        queryset = queryset.filter(category=category)
+    if sport_ids:
+        # M2M join 대신 EXISTS 로 걸러 중복 행이 생기지 않게 한다
+        queryset = queryset.filter(Exists(
+            queryset.model.sports.through.objects.filter(location_id=OuterRef('pk'), sport_id__in=sport_ids)
+        ))
+    return queryset
+
+
+def nearest_locations(queryset, latitude, longitude, k=10, radius_km=None, sport_ids=None, category=None):
+    """
+    queryset(Location) 중 (latitude, longitude) 에서 가까운 장소 k 개를 거리순으로. 각 장소에 distance_km 가 붙는다.
+    radius_km 를 주면 그 반경 안에서만 찾고, 없으면 NEARBY_INITIAL_RADIUS_KM 부터 NEARBY_MAX_RADIUS_KM 까지 넓힌다.
+    """
+    radius = radius_km or settings.NEARBY_INITIAL_RADIUS_KM
+    max_radius = radius_km or settings.NEARBY_MAX_RADIUS_KM
+    while True:
+        locations = list(
+            candidate_queryset(queryset, latitude, longitude, radius, sport_ids, category)
+            .annotate(distance_km=distance_expression(latitude, longitude))
+            .filter(distance_km__lte=radius)
+            .order_by('distance_km', 'pk')[:k]
+        )
+        if len(locations) >= k or radius >= max_radius:
+            return locations
+        radius = min(radius * 2, max_radius)
@@ -0,0 +1,137 @@
+"""
+결제 콜백 멱등 처리
+
+NicePay 는 returnURL/노티 콜백을 재전송하고, 사용자도 같은 요청을 중복 제출한다.
+@idempotent 를 붙인 APIView 메소드는 같은 멱등키의 요청에 대해 처음 처리한 응답을 그대로 돌려준다.
+
+- 멱등키: Idempotency-Key 헤더(요청한 사용자별), 없으면 콜백 본문의 (Moid, TID, 결과코드)
+- 조회 순서: 캐시 -> DB(IdempotencyRecord). 재전송은 대부분 캐시 조회 1회로 끝난다.
+- 같은 키가 처리 중이면 409, 같은 키로 본문이 다른 요청이 오면 422 를 돌려준다. (요청 본문 해시를 함께 저장)
+- 2xx 응답만 저장한다. 검증에 실패한(위조) 요청이 키를 선점해 실제 콜백이 처리되지 않는 일이 없도록 한다.
+"""
+import functools
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.response import Response
+
+from buccl_back.error_code import ErrorCode
+from .models import IdempotencyRecord
+
+logger = logging.getLogger('django')
+
+# 콜백 종류별로 이름이 다른 필드들
+MOID_FIELDS = ('Moid', 'MOID', 'moid')
+TID_FIELDS = ('TxTid', 'TID', 'Tid', 'tid')
+RESULT_CODE_FIELDS = ('AuthResultCode', 'ResultCode', 'ResultCd')
+
+
+def _first(data, names):
+    for name in names:
+        value = data.get(name)
+        if value:
+            return str(value)
+    return None
+
+
+def request_idempotency_key(request):
+    """요청의 멱등키. 헤더가 없고 콜백 필드도 없으면 None (멱등 처리 안 함)"""
+    header = request.headers.get('Idempotency-Key')
+    if header:
+        # 다른 사용자의 키로 그 사용자의 응답을 받아 가지 못하도록 사용자별로 나눈다
+        user = getattr(request, 'user', None)
+        owner = user.pk if user is not None and user.is_authenticated else 'anonymous'
+        return f"header:{owner}:{header}"
+    data = request.data
+    if not hasattr(data, 'get'):
+        return None
+    moid, tid = _first(data, MOID_FIELDS), _first(data, TID_FIELDS)
+    if not (moid and tid):
+        return None
+    return f"callback:{moid}:{tid}:{_first(data, RESULT_CODE_FIELDS) or ''}"
+
+
+def make_digest(scope, key):
+    return hashlib.sha256(f"{scope}:{key}".encode('utf-8')).hexdigest()
+
+
+def request_hash(request):
+    """요청 본문의 sha256. (form/JSON 모두 키 순서와 관계없이 같은 값)"""
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def lookup(digest):
+    """저장된 (status_code, body, request_hash). 캐시 우선, 없으면 DB 조회 후 캐시에 채운다."""
+    cache_key = f"idempotency:v2:{digest}"
+    stored = cache.get(cache_key)
+    if stored is not None:
+        return stored
+    record = (
+        IdempotencyRecord.objects.filter(key=digest)
+        .values_list('status_code', 'response_body', 'request_hash').first()
+    )
+    if record is not None:
+        cache.set(cache_key, record, getattr(settings, 'IDEMPOTENCY_CACHE_TTL', 86400))
+    return record
+
+
+def store(digest, scope, status_code, body, body_hash):
+    try:
+        record, _ = IdempotencyRecord.objects.get_or_create(
+            key=digest,
+            defaults={'scope': scope, 'status_code': status_code, 'response_body': body, 'request_hash': body_hash},
+        )
+    except IntegrityError:
+        # 동시에 같은 키가 저장된 경우. 먼저 저장된 응답을 유지한다.
+        return
+    cache.set(
+        f"idempotency:v2:{digest}", (record.status_code, record.response_body, record.request_hash),
+        getattr(settings, 'IDEMPOTENCY_CACHE_TTL', 86400),
+    )
+
+
+def idempotent(scope):
+    """APIView 의 post 등에 사용. scope 는 엔드포인트 구분용 이름"""
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            key = request_idempotency_key(request)
+            if key is None:
+                return view_method(view, request, *args, **kwargs)
+
+            digest = make_digest(scope, key)
+            body_hash = request_hash(request)
+            stored = lookup(digest)
+            if stored is not None:
+                if stored[2] and stored[2] != body_hash:
+                    logger.warning(f"idempotency key reused with a different body: scope={scope}, key={key}")
+                    return Response(ErrorCode.IDEMPOTENCY_KEY_REUSED, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                logger.info(f"idempotent replay: scope={scope}, key={key}")
+                response = Response(stored[1], status=stored[0])
+                response['Idempotent-Replayed'] = 'true'
+                return response
+
+            lock_key = f"idempotency-lock:{digest}"
+            if not cache.add(lock_key, 1, getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 30)):
+                return Response(ErrorCode.REQUEST_IN_PROGRESS, status=status.HTTP_409_CONFLICT)
+            try:
+                response = view_method(view, request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    store(digest, scope, response.status_code, response.data, body_hash)
+                return response
+            finally:
+                cache.delete(lock_key)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,307 @@
+import csv
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from buccl_lessons.models import LessonProduct
+from buccl_main import catalog
+from buccl_main.models import Product, ProductType, ClassProduct, TravelProduct, Sport
+
+# 유형 코드 -> (유형별 상품 모델, Product FK 필드명, 입력 컬럼 -> 모델 필드)
+SPECIFIC_SPECS = {
+    'CLASS': (ClassProduct, 'class_product', {
+        'name': 'title', 'brand': 'brand',
+        'original_price': 'original_price', 'discount_price': 'discount_price',
+    }),
+    'TRAVEL': (TravelProduct, 'travel_product', {
+        'name': 'name', 'start_date': 'start_date', 'end_date': 'end_date', 'location': 'location',
+        'guide': 'guide', 'requirements': 'requirements', 'max_participants': 'max_participants',
+        'detailed_content': 'detailed_content', 'price': 'price',
+    }),
+    'LESSON': (LessonProduct, 'lesson_product', {
+        'name': 'title', 'description': 'description', 'sessions_count': 'sessions_count', 'price': 'price',
+    }),
+}
+PRODUCT_COLUMNS = {'name': 'name', 'description': 'description', 'base_price': 'base_price'}
+TRUE_VALUES = {'1', 'true', 't', 'y', 'yes'}
+FALSE_VALUES = {'0', 'false', 'f', 'n', 'no'}
+
+
+class RowError(Exception):
+    pass
+
+
+def is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def collect_values(model, columns, row):
+    """
+    입력 컬럼 -> 모델 필드 값 dict.
+    빈 값은 nullable 필드면 NULL 로, 필수 필드면 '입력 안 함'으로 보고 제외한다. (수정 시 기존 값 유지)
+    """
+    values = {}
+    for column, field_name in columns.items():
+        value = row.get(column)
+        field = model._meta.get_field(field_name)
+        if is_empty(value) and not (field.null or field.has_default()):
+            continue
+        values[field_name] = clean_value(model, field_name, value)
+    return values
+
+
+def clean_value(model, field_name, value):
+    """모델 필드 정의(to_python + validators)로 값 하나를 검증/변환한다. (DB 조회 없음)"""
+    field = model._meta.get_field(field_name)
+    if isinstance(value, str):
+        value = value.strip()
+    if is_empty(value) and (field.null or field.has_default()):
+        return None if field.null else field.get_default()
+    try:
+        return field.clean(value, None)
+    except ValidationError as e:
+        raise RowError(f"{field_name}: {' '.join(e.messages)}")
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV/JSONL 파일로 상품(Product + 클래스/여행/레슨 상품)을 일괄 등록/수정합니다.\n"
+        "공통 컬럼: product_id(수정 시), product_type, name, description, base_price, is_active\n"
+        "CLASS: brand, original_price, discount_price / "
+        "TRAVEL: start_date, end_date, location, guide, requirements, max_participants, detailed_content, price / "
+        "LESSON: sport(이름 또는 id), sessions_count, price"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV 또는 JSONL 파일 경로')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='파일 형식 (기본: 확장자로 판단)')
+        parser.add_argument('--batch-size', type=int, default=500, help='한 번에 검증/저장할 행 수')
+        parser.add_argument('--report', help='행별 오류 리포트를 저장할 CSV 경로 (기본: stderr 출력)')
+        parser.add_argument('--dry-run', action='store_true', help='검증만 하고 저장하지 않음')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"파일을 찾을 수 없습니다: {path}")
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = options['batch_size']
+
+        # 참조 데이터는 한 번만 조회해 dict 로 보관 (행마다 product_type 을 조회하지 않음)
+        self.product_types = {product_type.code.upper(): product_type for product_type in ProductType.objects.all()}
+        self.sports = {}
+        for sport_id, name in Sport.objects.values_list('id', 'name'):
+            self.sports[str(sport_id)] = sport_id
+            self.sports[name] = sport_id
+
+        started_at = timezone.now()
+        self.errors = []
+        created = updated = 0
+
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = self.iter_rows(f, file_format)
+            with transaction.atomic(), catalog.suspend_sync():
+                batch = []
+                for line_no, row in rows:
+                    batch.append((line_no, row))
+                    if len(batch) >= batch_size:
+                        c, u = self.process_batch(batch, options['dry_run'])
+                        created, updated = created + c, updated + u
+                        batch = []
+                if batch:
+                    c, u = self.process_batch(batch, options['dry_run'])
+                    created, updated = created + c, updated + u
+
+        if not options['dry_run']:
+            catalog.refresh_changed_since(started_at)
+
+        self.write_report(options['report'])
+        summary = f"생성 {created}건, 수정 {updated}건, 오류 {len(self.errors)}건"
+        if options['dry_run']:
+            summary = f"[dry-run] {summary}"
+        self.stdout.write(self.style.SUCCESS(summary) if not self.errors else self.style.WARNING(summary))
+
+    def iter_rows(self, f, file_format):
+        """파일을 한 줄씩 읽어 (행 번호, dict) 를 반환한다. (전체를 메모리에 올리지 않음)"""
+        if file_format == 'csv':
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.errors.append((line_no, f"JSON 파싱 실패: {e}"))
+                continue
+            if not isinstance(row, dict):
+                self.errors.append((line_no, "JSON 객체가 아닙니다."))
+                continue
+            yield line_no, row
+
+    # --- 검증 ---------------------------------------------------------------------
+    def parse_row(self, row):
+        type_code = str(row.get('product_type') or '').strip().upper()
+        product_type = self.product_types.get(type_code)
+        if product_type is None:
+            raise RowError(f"product_type: 알 수 없는 상품 유형 '{type_code}'")
+
+        product_values = collect_values(Product, PRODUCT_COLUMNS, row)
+        is_active = str(row.get('is_active', '')).strip().lower()
+        if is_active:
+            if is_active not in TRUE_VALUES | FALSE_VALUES:
+                raise RowError(f"is_active: 올바르지 않은 값 '{is_active}'")
+            product_values['is_active'] = is_active in TRUE_VALUES
+
+        specific_values = {}
+        spec = SPECIFIC_SPECS.get(type_code)
+        if spec:
+            model, _, columns = spec
+            specific_values = collect_values(model, columns, row)
+            if type_code == 'LESSON' and not is_empty(row.get('sport')):
+                sport_id = self.sports.get(str(row['sport']).strip())
+                if sport_id is None:
+                    raise RowError(f"sport: 알 수 없는 스포츠 '{row['sport']}'")
+                specific_values['sport_id'] = sport_id
+
+        product_id = str(row.get('product_id') or '').strip()
+        if product_id and not product_id.isdigit():
+            raise RowError(f"product_id: 올바르지 않은 값 '{product_id}'")
+        return (int(product_id) if product_id else None), product_type, product_values, specific_values
+
+    def check_required(self, model, values):
+        """신규 생성 시 필수 필드 누락 여부 확인"""
+        missing = [
+            field.name for field in model._meta.concrete_fields
+            if not (field.null or field.blank or field.has_default() or field.primary_key
+                    or getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False))
+            and values.get(field.attname, values.get(field.name)) is None
+        ]
+        if missing:
+            raise RowError(f"필수 항목 누락: {', '.join(missing)}")
+
+    # --- 저장 ---------------------------------------------------------------------
+    def process_batch(self, batch, dry_run):
+        new_rows, update_rows = [], []
+        for line_no, row in batch:
+            try:
+                product_id, product_type, product_values, specific_values = self.parse_row(row)
+                if product_id is None:
+                    # base_price 가 없으면 유형별 상품 가격을 그대로 사용
+                    product_values.setdefault(
+                        'base_price',
+                        specific_values.get('original_price') or specific_values.get('price'),
+                    )
+                    self.check_required(Product, {**product_values, 'product_type': product_type})
+                    spec = SPECIFIC_SPECS.get(product_type.code.upper())
+                    if spec:
+                        self.check_required(spec[0], specific_values)
+                    new_rows.append((line_no, product_type, product_values, specific_values))
+                else:
+                    update_rows.append((line_no, product_id, product_type, product_values, specific_values))
+            except RowError as e:
+                self.errors.append((line_no, str(e)))
+
+        update_rows = self.resolve_updates(update_rows)
+        if dry_run:
+            return len(new_rows), len(update_rows)
+        self.create_products(new_rows)
+        self.update_products(update_rows)
+        return len(new_rows), len(update_rows)
+
+    def resolve_updates(self, update_rows):
+        """수정 대상 상품을 한 번에 조회해 행과 연결한다."""
+        if not update_rows:
+            return []
+        products = catalog.catalog_queryset().in_bulk([row[1] for row in update_rows])
+        resolved = []
+        for line_no, product_id, product_type, product_values, specific_values in update_rows:
+            product = products.get(product_id)
+            if product is None:
+                self.errors.append((line_no, f"product_id: 존재하지 않는 상품 {product_id}"))
+            elif product.product_type_id != product_type.pk:
+                self.errors.append((line_no, "product_type: 기존 상품의 유형은 변경할 수 없습니다."))
+            else:
+                resolved.append((line_no, product, product_values, specific_values))
+        return resolved
+
+    def create_products(self, new_rows):
+        specifics = {}
+        for index, (_, product_type, _, specific_values) in enumerate(new_rows):
+            spec = SPECIFIC_SPECS.get(product_type.code.upper())
+            if spec:
+                specifics.setdefault(spec[0], []).append((index, spec[0](**specific_values)))
+
+        linked = {}
+        for model, items in specifics.items():
+            objs = [obj for _, obj in items]
+            if model is ClassProduct:
+                # 할인율은 save() 대신 배치 단위로 한 번에 계산
+                for obj in objs:
+                    obj.discount_rate = ClassProduct.compute_discount_rate(obj.original_price, obj.discount_price)
+            if connection.features.can_return_rows_from_bulk_insert:
+                model.objects.bulk_create(objs)
+            else:
+                # MySQL 은 bulk_create 결과로 pk 를 돌려주지 않으므로 유형별 상품만 행 단위 INSERT
+                for obj in objs:
+                    obj.save(force_insert=True)
+            linked.update(items)
+
+        products = []
+        for index, (_, product_type, product_values, _) in enumerate(new_rows):
+            product = Product(product_type=product_type, **product_values)
+            specific = linked.get(index)
+            if specific is not None:
+                setattr(product, SPECIFIC_SPECS[product_type.code.upper()][1], specific)
+            products.append(product)
+        Product.objects.bulk_create(products)
+
+    def update_products(self, update_rows):
+        if not update_rows:
+            return
+        now = timezone.now()
+        product_fields = {'updated_at'}
+        specific_updates = {}
+        products = []
+        for _, product, product_values, specific_values in update_rows:
+            for field, value in product_values.items():
+                setattr(product, field, value)
+            product_fields.update(product_values)
+            product.updated_at = now
+            products.append(product)
+
+            spec = SPECIFIC_SPECS.get(product.product_type.code.upper())
+            specific = getattr(product, spec[1]) if spec else None
+            if specific is not None and specific_values:
+                for field, value in specific_values.items():
+                    setattr(specific, field, value)
+                fields = set(specific_values) | {'updated_at'}
+                if isinstance(specific, ClassProduct):
+                    specific.discount_rate = ClassProduct.compute_discount_rate(specific.original_price, specific.discount_price)
+                    fields.add('discount_rate')
+                specific.updated_at = now
+                model_objs, model_fields = specific_updates.setdefault(type(specific), ([], set()))
+                model_objs.append(specific)
+                model_fields.update(fields)
+
+        Product.objects.bulk_update(products, sorted(product_fields))
+        for model, (objs, fields) in specific_updates.items():
+            model.objects.bulk_update(objs, sorted(fields))
+
+    def write_report(self, report_path):
+        if not self.errors:
+            return
+        self.errors.sort()
+        if report_path:
+            with open(report_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'error'])
+                writer.writerows(self.errors)
+            self.stderr.write(f"오류 리포트 저장: {report_path}")
+            return
+        for line_no, message in self.errors:
+            self.stderr.write(f"line {line_no}: {message}")
@@ -0,0 +1,61 @@
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from buccl_main.fake_nicepay import FakeNicePay
+from buccl_main.nicepay import CircuitBreaker, NicePayError
+
+
+class Command(BaseCommand):
+    help = "NicePay 대역 서버를 띄워 인증 → 승인 → 취소 흐름을 동시 실행하고 호출별 지연 시간을 출력합니다. (외부 호출 없음)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flows', type=int, default=200, help='실행할 결제 흐름 수')
+        parser.add_argument('--concurrency', type=int, default=10, help='동시 실행 스레드 수')
+        parser.add_argument('--cancel-ratio', type=float, default=0.3, help='승인 후 전체 취소할 비율 (0~1)')
+        parser.add_argument('--approve-delay-ms', type=int, default=0, help='대역 서버의 승인 응답 지연')
+        parser.add_argument('--read-timeout', type=float, default=5, help='클라이언트 read timeout (초)')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        with FakeNicePay() as fake:
+            fake.delays['/approve'] = options['approve_delay_ms'] / 1000
+            client = fake.client(
+                read_timeout=options['read_timeout'],
+                pool_maxsize=concurrency,
+                # 부하 테스트 중에는 차단하지 않고 모든 흐름을 실행
+                breaker=CircuitBreaker(failure_threshold=options['flows'] + 1),
+            )
+            cancel_ratio = options['cancel_ratio']
+
+            def run_flow(index):
+                amt = random.randint(1, 100) * 1000
+                auth = fake.authorize(moid=f"LOADTEST-{index}", amt=amt)
+                try:
+                    captured = client.capture(auth['TxTid'], auth['AuthToken'], amt, auth['NextAppURL'], auth['NetCancelURL'])
+                    if not captured.ok:
+                        return f"capture_{captured.result_code}"
+                    if random.random() < cancel_ratio:
+                        cancelled = client.cancel(auth['TxTid'], auth['Moid'], amt, '부하 테스트 취소')
+                        return 'cancelled' if cancelled.ok else f"cancel_{cancelled.result_code}"
+                    return 'captured'
+                except NicePayError as e:
+                    return type(e).__name__
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                outcomes = Counter(executor.map(run_flow, range(options['flows'])))
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"흐름 {options['flows']}건 / {elapsed:.2f}s ({options['flows'] / elapsed:.1f} flows/s), TCP 연결 {fake.connections}개")
+        for outcome, count in sorted(outcomes.items()):
+            self.stdout.write(f"  {outcome}: {count}")
+        self.stdout.write(f"{'operation':<12}{'count':>7}{'errors':>8}{'avg':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for operation, row in client.stats.snapshot().items():
+            self.stdout.write(
+                f"{operation:<12}{row['count']:>7}{row['errors']:>8}{row['avg_ms']:>9}{row['p50_ms']:>9}"
+                f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}"
+            )
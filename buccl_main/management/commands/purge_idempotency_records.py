@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from buccl_main.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = "보존 기간이 지난 멱등 요청 기록(IdempotencyRecord)을 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.IDEMPOTENCY_RETENTION_DAYS, help='보존 일수')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 삭제할 행 수')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        total = 0
+        while True:
+            ids = list(
+                IdempotencyRecord.objects.filter(created_at__lt=cutoff)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            deleted, _ = IdempotencyRecord.objects.filter(pk__in=ids).delete()
+            total += deleted
+        self.stdout.write(self.style.SUCCESS(f"멱등 요청 기록 {total}건 삭제"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from buccl_main.catalog import rebuild_catalog
+
+
+class Command(BaseCommand):
+    help = "상품 카탈로그(CatalogEntry) 스냅샷을 전체 재구축합니다. (fixture 로드/대량 수정 이후 사용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='한 번에 처리할 상품 수')
+
+    def handle(self, *args, **options):
+        total = rebuild_catalog(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"카탈로그 재구축 완료: {total}건 갱신"))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from buccl_main.sweeper import sweep_stale_orders
+
+
+class Command(BaseCommand):
+    help = "결제를 마치지 않고 TTL 이 지난 주문을 취소/결제 실패로 정리합니다. 열린 결제는 망취소합니다. (cron 등으로 주기 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-minutes', type=int, default=settings.STALE_ORDER_TTL_MINUTES, help='마지막 결제 시도(없으면 주문 생성) 후 경과 시간')
+        parser.add_argument('--batch-size', type=int, default=settings.STALE_ORDER_BATCH_SIZE, help='한 번에 갱신할 주문 수')
+        parser.add_argument('--dry-run', action='store_true', help='변경 없이 대상 건수만 출력')
+
+    def handle(self, *args, **options):
+        counts = sweep_stale_orders(
+            ttl=timedelta(minutes=options['ttl_minutes']),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        if not counts:
+            self.stdout.write("정리할 주문이 없습니다.")
+        for name, count in sorted(counts.items()):
+            self.stdout.write(self.style.SUCCESS(f"{name}: {count}"))
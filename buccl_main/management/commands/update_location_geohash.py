@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from buccl_main.geo import fill_geohash
+from buccl_main.models import Location
+
+
+class Command(BaseCommand):
+    help = "장소 좌표로 geohash(가까운 장소 검색 인덱스)를 다시 계산합니다. (loaddata 로 장소를 넣은 뒤 실행)"
+
+    def handle(self, *args, **options):
+        count = fill_geohash(Location.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"{count}개 장소 geohash 갱신"))
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from buccl_main.rollups import BOOKINGS, ROLLUPS, SALES, update_rollups
+
+
+class Command(BaseCommand):
+    help = "일별 매출(daily_sales)/예약(daily_bookings) 집계를 마지막 실행 이후 변경분만 갱신합니다. (cron 등으로 주기 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=[SALES, BOOKINGS], help='하나의 집계만 갱신')
+        parser.add_argument('--since', help='YYYY-MM-DD 이후 전체를 다시 계산 (과거 데이터 보정용)')
+
+    def handle(self, *args, **options):
+        rebuild_since = None
+        if options['since']:
+            try:
+                rebuild_since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since 는 YYYY-MM-DD 형식이어야 합니다.")
+
+        names = [options['only']] if options['only'] else list(ROLLUPS)
+        processed = update_rollups(names=names, rebuild_since=rebuild_since)
+        for name, count in processed.items():
+            self.stdout.write(self.style.SUCCESS(f"{name}: {count}일 갱신"))
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_type_code', models.CharField(db_index=True, max_length=20)),
+                ('product_type_name', models.CharField(max_length=50)),
+                ('source_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('name', models.CharField(max_length=255)),
+                ('price', models.DecimalField(decimal_places=0, max_digits=10)),
+                ('display_price', models.DecimalField(db_index=True, decimal_places=0, max_digits=10)),
+                ('discount_rate', models.IntegerField(default=0)),
+                ('main_image', models.CharField(blank=True, max_length=255)),
+                ('is_available', models.BooleanField(default=True)),
+                ('available_until', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='catalog_entry', to='buccl_main.product')),
+                ('sport', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='catalog_entries', to='buccl_main.sport')),
+            ],
+            options={
+                'verbose_name': '상품 카탈로그',
+                'verbose_name_plural': '상품 카탈로그 조회',
+                'ordering': ['-product_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['product_type_code', 'source_id'], name='catalog_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_available', 'product'], name='catalog_available_idx'),
+        ),
+    ]
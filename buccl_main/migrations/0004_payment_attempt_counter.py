@@ -0,0 +1,56 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:10
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+
+def backfill_attempt_counters(apps, schema_editor):
+    """
+    기존 결제의 중복 attempt_number 를 생성 순서대로 다시 매기고, 주문별 카운터를 최대 시도 번호로 채운다.
+    (유니크 제약 추가 전에 실행)
+    """
+    Order = apps.get_model('buccl_main', 'Order')
+    Payment = apps.get_model('buccl_main', 'Payment')
+
+    rows = (
+        Payment.objects.order_by('order_id', 'created_at', 'id')
+        .values_list('id', 'order_id', 'attempt_number')
+        .iterator(chunk_size=2000)
+    )
+    renumbered = []
+    counters = {}
+    for order_id, payments in groupby(rows, key=lambda row: row[1]):
+        payments = list(payments)
+        numbers = [attempt_number for _, _, attempt_number in payments]
+        if len(set(numbers)) != len(numbers):
+            for number, (payment_id, _, attempt_number) in enumerate(payments, start=1):
+                if attempt_number != number:
+                    renumbered.append(Payment(id=payment_id, attempt_number=number))
+            numbers = range(1, len(payments) + 1)
+        counters.setdefault(max(numbers), []).append(order_id)
+
+    Payment.objects.bulk_update(renumbered, ['attempt_number'], batch_size=1000)
+    for count, order_ids in counters.items():
+        for start in range(0, len(order_ids), 1000):
+            Order.objects.filter(pk__in=order_ids[start:start + 1000]).update(payment_attempt_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0003_catalogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='payment_attempt_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_attempt_counters, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(fields=('order', 'attempt_number'), name='unique_payment_attempt_per_order'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.utils.dateparse import parse_datetime
+
+# 기존 시각 컬럼(event_timestamps 키와 동일) -> 이벤트 유형. 완료 시각은 현재 상태로 성공/실패를 판단
+TIMESTAMP_EVENTS = (
+    ('auth_requested_at', 'AUTH_REQUESTED', None),
+    ('auth_completed_at', 'AUTH_SUCCESS', 'AUTH_FAILED'),
+    ('capture_requested_at', 'CAPTURE_REQUESTED', None),
+    ('capture_completed_at', 'CAPTURE_SUCCESS', 'CAPTURE_FAILED'),
+)
+
+
+def backfill_payment_events(apps, schema_editor):
+    """기존 결제의 시각 컬럼/event_timestamps 로부터 이벤트 로그를 만든다. 마지막 상태가 빠지면 updated_at 기준으로 추가."""
+    Payment = apps.get_model('buccl_main', 'Payment')
+    PaymentEvent = apps.get_model('buccl_main', 'PaymentEvent')
+
+    fields = ['id', 'status', 'updated_at', 'error_code', 'event_timestamps'] + [field for field, _, _ in TIMESTAMP_EVENTS]
+    batch = []
+    for payment in Payment.objects.order_by('pk').values(*fields).iterator(chunk_size=2000):
+        stored = payment['event_timestamps'] or {}
+        types = set()
+        for field, success_type, failure_type in TIMESTAMP_EVENTS:
+            at = payment[field] or (parse_datetime(stored[field]) if isinstance(stored.get(field), str) else None)
+            if at is None:
+                continue
+            event_type = failure_type if failure_type and payment['status'] == failure_type else success_type
+            types.add(event_type)
+            batch.append(PaymentEvent(payment_id=payment['id'], type=event_type, at=at))
+        if payment['status'] not in types:
+            batch.append(PaymentEvent(payment_id=payment['id'], type=payment['status'], at=payment['updated_at'], code=payment['error_code']))
+        if len(batch) >= 2000:
+            PaymentEvent.objects.bulk_create(batch)
+            batch = []
+    PaymentEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0004_payment_attempt_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('AUTH_REQUESTED', '인증 요청됨'), ('AUTH_SUCCESS', '인증 성공'), ('AUTH_FAILED', '인증 실패'), ('CAPTURE_REQUESTED', '승인 요청됨'), ('CAPTURE_SUCCESS', '승인 성공 (결제 완료)'), ('CAPTURE_FAILED', '승인 실패'), ('CANCEL_REQUESTED', '취소 요청됨'), ('CANCEL_SUCCESS', '취소 성공'), ('CANCEL_FAILED', '취소 실패'), ('REFUNDED', '환불됨'), ('SYSTEM_ERROR', '시스템 오류')], max_length=20)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('code', models.CharField(blank=True, max_length=50, null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('payment', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='buccl_main.payment')),
+            ],
+            options={
+                'verbose_name': '결제 이벤트',
+                'verbose_name_plural': '결제 이벤트 로그',
+                'ordering': ['at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='paymentevent',
+            index=models.Index(fields=['type', 'at'], name='payment_event_type_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentevent',
+            index=models.Index(fields=['payment', 'at'], name='payment_event_payment_at_idx'),
+        ),
+        migrations.RunPython(backfill_payment_events, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='payment',
+            name='event_timestamps',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0005_payment_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('scope', models.CharField(max_length=50)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('response_body', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': '멱등 요청 기록',
+                'verbose_name_plural': '멱등 요청 기록 관리',
+            },
+        ),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import json
+import zlib
+
+BATCH_SIZE = 500
+
+# (모델, source, 결제 id 경로)
+RAW_DATA_MODELS = (
+    ('PaymentAuthRequest', 'auth_request', 'payment_id'),
+    ('PaymentAuthResponse', 'auth_response', 'payment_id'),
+    ('PaymentCaptureRequest', 'capture_request', 'payment_id'),
+    ('PaymentCaptureResponse', 'capture_response', 'payment_id'),
+    ('PaymentCancelRequest', 'cancel_request', 'payment_cancel__payment_id'),
+    ('PaymentCancelResponse', 'cancel_response', 'payment_cancel__payment_id'),
+    ('PaymentNetCancelRequest', 'net_cancel_request', 'payment_id'),
+    ('PaymentNetCancelResponse', 'net_cancel_response', 'payment_id'),
+)
+
+
+def _compress(value):
+    raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(raw, 6), len(raw)
+
+
+def _batches(queryset, *fields):
+    """pk 순서로 BATCH_SIZE 씩 끊어 읽는다. (OFFSET 없이 마지막 pk 이후부터)"""
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).order_by('pk').values('pk', *fields)[:BATCH_SIZE])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1]['pk']
+
+
+def move_raw_data(apps, schema_editor):
+    """raw_data 컬럼과 Payment.payment_method_details['raw'] 를 PaymentRawPayload 로 옮긴다."""
+    PaymentRawPayload = apps.get_model('buccl_main', 'PaymentRawPayload')
+    for model_name, source, payment_path in RAW_DATA_MODELS:
+        model = apps.get_model('buccl_main', model_name)
+        for rows in _batches(model.objects.exclude(raw_data={}), payment_path, 'raw_data'):
+            payloads = []
+            for row in rows:
+                data, size = _compress(row['raw_data'])
+                payloads.append(PaymentRawPayload(payment_id=row[payment_path], source=source, object_id=row['pk'], data=data, size=size))
+            PaymentRawPayload.objects.bulk_create(payloads)
+
+    Payment = apps.get_model('buccl_main', 'Payment')
+    for rows in _batches(Payment.objects.filter(payment_method_details__has_key='raw'), 'payment_method_details'):
+        payloads = []
+        for row in rows:
+            details = row['payment_method_details']
+            data, size = _compress(details.pop('raw'))
+            payloads.append(PaymentRawPayload(payment_id=row['pk'], source='payment', object_id=row['pk'], data=data, size=size))
+            Payment.objects.filter(pk=row['pk']).update(payment_method_details=details)
+        PaymentRawPayload.objects.bulk_create(payloads)
+
+
+def restore_raw_data(apps, schema_editor):
+    PaymentRawPayload = apps.get_model('buccl_main', 'PaymentRawPayload')
+    Payment = apps.get_model('buccl_main', 'Payment')
+    sources = {source: model_name for model_name, source, _ in RAW_DATA_MODELS}
+    for rows in _batches(PaymentRawPayload.objects.all(), 'source', 'object_id', 'data'):
+        for row in rows:
+            value = json.loads(zlib.decompress(row['data']))
+            if row['source'] == 'payment':
+                payment = Payment.objects.filter(pk=row['object_id']).first()
+                if payment is not None:
+                    payment.payment_method_details = dict(payment.payment_method_details or {}, raw=value)
+                    payment.save(update_fields=['payment_method_details'])
+            else:
+                apps.get_model('buccl_main', sources[row['source']]).objects.filter(pk=row['object_id']).update(raw_data=value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0006_idempotency_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentRawPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('payment', '결제 인증 콜백'), ('auth_request', '인증 요청'), ('auth_response', '인증 응답'), ('capture_request', '승인 요청'), ('capture_response', '승인 응답'), ('cancel_request', '취소 요청'), ('cancel_response', '취소 응답'), ('net_cancel_request', '망 취소 요청'), ('net_cancel_response', '망 취소 응답')], max_length=30)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='raw_payloads', to='buccl_main.payment')),
+            ],
+            options={
+                'verbose_name': 'PG 원본 전문',
+                'verbose_name_plural': 'PG 원본 전문 관리',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='paymentrawpayload',
+            constraint=models.UniqueConstraint(fields=('source', 'object_id'), name='unique_raw_payload_per_object'),
+        ),
+        migrations.RunPython(move_raw_data, restore_raw_data),
+        migrations.RemoveField(
+            model_name='paymentauthrequest',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentauthresponse',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentcancelrequest',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentcancelresponse',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentcapturerequest',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentcaptureresponse',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentnetcancelrequest',
+            name='raw_data',
+        ),
+        migrations.RemoveField(
+            model_name='paymentnetcancelresponse',
+            name='raw_data',
+        ),
+    ]
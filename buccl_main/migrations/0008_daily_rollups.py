@@ -0,0 +1,92 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('buccl_main', '0007_payment_raw_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('processed_until', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '집계 진행 위치',
+                'verbose_name_plural': '집계 진행 위치 관리',
+            },
+        ),
+        migrations.AlterField(
+            model_name='paymentcancel',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('product_type', models.CharField(choices=[('LESSON', '레슨'), ('CLASS', '클래스'), ('TRAVEL', '여행'), ('PRODUCT', '일반 상품')], max_length=20)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('payment_count', models.PositiveIntegerField(default=0)),
+                ('gross_amount', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('cancel_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_amount', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sport', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='buccl_main.sport')),
+            ],
+            options={
+                'verbose_name': '일별 매출 집계',
+                'verbose_name_plural': '일별 매출 집계 조회',
+                'db_table': 'daily_sales',
+                'ordering': ['date', 'product_type', 'sport'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyBookings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('schedule_count', models.PositiveIntegerField(default=0)),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('booked_count', models.PositiveIntegerField(default=0)),
+                ('waiting_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='buccl_main.location')),
+            ],
+            options={
+                'verbose_name': '일별 예약 집계',
+                'verbose_name_plural': '일별 예약 집계 조회',
+                'db_table': 'daily_bookings',
+                'ordering': ['date', 'instructor', 'location'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysales',
+            constraint=models.UniqueConstraint(fields=('date', 'product_type', 'sport'), name='unique_daily_sales_row'),
+        ),
+        migrations.AddIndex(
+            model_name='dailybookings',
+            index=models.Index(fields=['instructor', 'date'], name='daily_bookings_instructor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailybookings',
+            index=models.Index(fields=['location', 'date'], name='daily_bookings_location_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybookings',
+            constraint=models.UniqueConstraint(fields=('date', 'instructor', 'location'), name='unique_daily_bookings_row'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0009_order_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'last_payment_attempt_at'], name='order_status_attempt_idx'),
+        ),
+    ]
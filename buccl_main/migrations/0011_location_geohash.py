@@ -0,0 +1,51 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:30
+
+from django.db import migrations, models
+
+# 마이그레이션이 앱 코드(buccl_main.geo)의 변경에 영향받지 않도록 인코더를 복사해 둔다
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def fill_geohash(apps, schema_editor):
+    Location = apps.get_model('buccl_main', 'Location')
+    locations = list(Location.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude'))
+    for location in locations:
+        location.geohash = encode(location.latitude, location.longitude)
+    Location.objects.bulk_update(locations, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0010_order_status_attempt_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-19 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_main', '0011_location_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencyrecord',
+            name='request_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
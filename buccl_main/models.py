@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from buccl_back.choices import *
 from buccl_user.models import *
@@ -6,6 +6,13 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.db.models import Q, F
+from django.db.models.functions import Greatest
+from datetime import timedelta
+import json
+import zlib
+
+from buccl_back import refcache
+from . import geo
 
 # 1. 기본 모델 (Base models)
 class Sport(models.Model):
@@ -28,6 +35,8 @@ class Location(models.Model):
      facilities = models.JSONField(default=list, blank=True, null=True)
      latitude = models.FloatField(blank=True, null=True)
      longitude = models.FloatField(blank=True, null=True)
+     # 가까운 장소 검색용 geohash (buccl_main.geo). 좌표가 있으면 save() 에서 채운다
+     geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True, editable=False)
      sports = models.ManyToManyField('Sport', related_name='locations', blank=True)     
 
      class Meta:
@@ -38,6 +47,16 @@ class Location(models.Model):
      def __str__(self):
          return self.name
 
+     def save(self, *args, **kwargs):
+         if self.latitude is not None and self.longitude is not None:
+             self.geohash = geo.encode(self.latitude, self.longitude)
+         else:
+             self.geohash = None
+         update_fields = kwargs.get('update_fields')
+         if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+             kwargs['update_fields'] = set(update_fields) | {'geohash'}
+         super().save(*args, **kwargs)
+
 class ProductType(models.Model):
     """상품 유형 정의 모델"""
     name = models.CharField(max_length=50, unique=True)
@@ -91,14 +110,17 @@ class ClassProduct(models.Model):
         verbose_name = "클래스 상품"
         verbose_name_plural = "클래스 상품 관리"
 
-    def save(self, *args, **kwargs):
+    @staticmethod
+    def compute_discount_rate(original_price, discount_price):
+        """할인율 계산 (save 및 일괄 import 에서 공통 사용)"""
         # discount_price가 있을 때만 할인율 자동 계산
-        if self.discount_price and self.original_price and self.original_price > 0:
+        if discount_price and original_price and original_price > 0:
             # 할인율 = (원가 - 할인가) / 원가 * 100
-            self.discount_rate = int(((self.original_price - self.discount_price) / self.original_price) * 100)
-        else:
-            self.discount_rate = 0
-        
+            return int(((original_price - discount_price) / original_price) * 100)
+        return 0
+
+    def save(self, *args, **kwargs):
+        self.discount_rate = self.compute_discount_rate(self.original_price, self.discount_price)
         super().save(*args, **kwargs)
     
     @property
@@ -148,7 +170,8 @@ class Product(models.Model):
     def clean(self):
         super().clean()
         # product_type에 따라 해당 specific product만 설정되었는지 확인
-        type_code = self.product_type.code.upper()
+        # 유형 코드는 기준 데이터 캐시에서 읽는다 (product_type 조회 쿼리 없음)
+        type_code = (refcache.value('buccl_main.ProductType', self.product_type_id, 'code') or self.product_type.code).upper()
         specific_products_populated = sum([
             1 if self.class_product else 0,
             1 if self.travel_product else 0,
@@ -187,6 +210,40 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.name} ({self.product_type.name})"
 
+class CatalogEntry(models.Model):
+    """
+    판매 상품 카탈로그 스냅샷 (읽기 전용 모델)
+    Product + ClassProduct/TravelProduct/LessonProduct 를 상품 1건당 1행으로 비정규화한다.
+    직접 수정하지 않고 buccl_main.catalog 의 refresh 함수(시그널)로만 갱신한다.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='catalog_entry')
+    product_type_code = models.CharField(max_length=20, db_index=True)
+    product_type_name = models.CharField(max_length=50)
+    source_id = models.PositiveBigIntegerField(null=True, blank=True) # 연결된 유형별 상품(class/travel/lesson)의 pk
+
+    name = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=0) # 정가
+    display_price = models.DecimalField(max_digits=10, decimal_places=0, db_index=True) # 실제 판매가
+    discount_rate = models.IntegerField(default=0)
+    main_image = models.CharField(max_length=255, blank=True)
+    sport = models.ForeignKey(Sport, on_delete=models.SET_NULL, null=True, blank=True, related_name='catalog_entries')
+
+    is_available = models.BooleanField(default=True)
+    available_until = models.DateField(null=True, blank=True) # 여행 상품 출발일 등 판매 종료일 (없으면 상시 판매)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "상품 카탈로그"
+        verbose_name_plural = "상품 카탈로그 조회"
+        ordering = ['-product_id']
+        indexes = [
+            models.Index(fields=['product_type_code', 'source_id'], name='catalog_source_idx'),
+            models.Index(fields=['is_available', 'product'], name='catalog_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.product_type_name})"
+
 # 3. 주문 및 결제 모델 (Order and payment)
 class Order(models.Model):
     """주문/구매 정보 관리 모델"""
@@ -229,11 +286,41 @@ class Order(models.Model):
 
     # 결제 흐름 추적을 위한 추가 필드 (선택적)
     last_payment_attempt_at = models.DateTimeField(null=True, blank=True)
+    # 지금까지 발급된 결제 시도 번호 (Payment.attempt_number 채번용 카운터)
+    payment_attempt_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name = "주문"
         verbose_name_plural = "주문 관리"
         ordering = ['-created_at']
+        indexes = [
+            # 내 주문 내역 keyset 페이지네이션 (MyOrderListView)
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            # 결제 미완료 주문 정리 (buccl_main.sweeper)
+            models.Index(fields=['status', 'last_payment_attempt_at'], name='order_status_attempt_idx'),
+        ]
+
+    @staticmethod
+    def allocate_payment_attempt(order_id, attempt_number=None):
+        """
+        주문의 다음 결제 시도 번호를 발급한다.
+        카운터를 UPDATE ... SET count = count + 1 로 올린 뒤 같은 트랜잭션에서 다시 읽으므로,
+        동시에 들어온 요청은 행 잠금 순서대로 서로 다른 번호를 받는다. 반드시 transaction.atomic() 안에서 호출할 것.
+        attempt_number 를 지정하면 그 번호를 쓰고, 이후 발급이 겹치지 않도록 카운터를 max(카운터, 번호) 로 올린다.
+        """
+        if attempt_number is None:
+            counter = F('payment_attempt_count') + 1
+        else:
+            counter = Greatest(F('payment_attempt_count'), attempt_number)
+        updated = Order.objects.filter(pk=order_id).update(
+            payment_attempt_count=counter,
+            last_payment_attempt_at=timezone.now(),
+        )
+        if not updated:
+            raise Order.DoesNotExist(f"주문 {order_id} 이(가) 존재하지 않습니다.")
+        if attempt_number is not None:
+            return attempt_number
+        return Order.objects.filter(pk=order_id).values_list('payment_attempt_count', flat=True).get()
     
     def __str__(self):
         product_name = "무상품"
@@ -243,7 +330,50 @@ class Order(models.Model):
         #     product_name = self.lesson_product.title
         return f"{self.user.user_id} - {product_name} - {self.status}"
 
-class Payment(models.Model):
+class DeferredFieldsManager(models.Manager):
+    """목록/단건 조회 시 무거운 JSON 컬럼을 기본으로 defer 하는 매니저. 필요하면 .defer(None) 으로 전체 조회"""
+
+    def __init__(self, *deferred_fields):
+        super().__init__()
+        self.deferred_fields = deferred_fields
+
+    def get_queryset(self):
+        return super().get_queryset().defer(*self.deferred_fields)
+
+
+class RawPayloadMixin:
+    """
+    PG 원본 전문(raw_data)을 PaymentRawPayload 에 압축 저장하는 모델 믹스인.
+    raw_data 는 처음 접근할 때 1회 조회하고, 값을 대입한 경우에만 save() 시 함께 저장한다.
+    여러 행의 raw_data 가 필요하면 PaymentRawPayload.prefetch(instances) 로 한 번에 읽는다.
+    """
+    RAW_PAYLOAD_SOURCE = None
+
+    def get_raw_payload_payment_id(self):
+        return self.payment_id
+
+    @property
+    def raw_data(self):
+        if '_raw_data' not in self.__dict__:
+            self._raw_data = PaymentRawPayload.load(self.RAW_PAYLOAD_SOURCE, self.pk) if self.pk else {}
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value):
+        self._raw_data = value or {}
+        self._raw_data_changed = True
+
+    def save(self, *args, **kwargs):
+        if not self.__dict__.get('_raw_data_changed'):
+            return super().save(*args, **kwargs)
+        created = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            PaymentRawPayload.store(self, created=created)
+        self._raw_data_changed = False
+
+
+class Payment(RawPayloadMixin, models.Model):
     """결제 정보만 관리하는 모델"""
     PAYMENT_FLOW_STATUS_CHOICES = (
         ('AUTH_REQUESTED', '인증 요청됨'),
@@ -288,25 +418,38 @@ class Payment(models.Model):
     # 결제 수단 상세 (카드사, 은행코드 등)
     payment_method_details = models.JSONField(default=dict, blank=True)
     
-    # 시간 추적 (타임스탬프 모음)
-    event_timestamps = models.JSONField(default=dict, blank=True)
-    # 예: {'auth_requested_at': '2023-06-01T12:34:56', 'auth_completed_at': '2023-06-01T12:35:00'}
+    # 상태 변경 이력은 PaymentEvent 에 쌓는다. (record_event 참고)
     
     # 오류 정보
     error_data = models.JSONField(default=dict, blank=True)
     # 예: {'code': 'ERR123', 'message': '카드 한도 초과', 'details': {...}}
 
+    # 인증 콜백 원본은 raw_data (PaymentRawPayload) 로 저장
+    RAW_PAYLOAD_SOURCE = 'payment'
+
+    objects = DeferredFieldsManager('payment_method_details', 'error_data')
+
+    def get_raw_payload_payment_id(self):
+        return self.pk
+
     class Meta:
         verbose_name = "결제 주요 정보"
         verbose_name_plural = "결제 주요 정보 관리"
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'attempt_number'], name='unique_payment_attempt_per_order'),
+        ]
     
     def save(self, *args, **kwargs):
         # attempt_number 자동 부여 (새 레코드일 때만)
-        if not self.pk and self.order_id and (self.attempt_number == 1 or self.attempt_number is None):
-            # 현재까지 시도된 결제 수를 계산하여 +1
-            current_attempts = Payment.objects.filter(order_id=self.order_id).count()
-            self.attempt_number = current_attempts + 1
+        if not self.pk and self.order_id:
+            # Order 의 카운터로 채번 (번호 발급과 INSERT 를 한 트랜잭션으로 묶어 카운터와 실제 행이 어긋나지 않게 함)
+            # 기본값 1 이 아닌 번호를 직접 지정한 경우에도 카운터를 그 번호까지 올린다
+            requested = self.attempt_number if self.attempt_number not in (None, 1) else None
+            with transaction.atomic():
+                self.attempt_number = Order.allocate_payment_attempt(self.order_id, requested)
+                super().save(*args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -314,6 +457,37 @@ class Payment(models.Model):
             
     # save 메소드에서 상태 변경에 따른 시간 자동 설정 등은 비즈니스 로직 복잡도에 따라 서비스 계층에서 처리하는 것을 고려
 
+    # 상태 -> 함께 갱신할 시각 컬럼
+    EVENT_TIMESTAMP_FIELDS = {
+        'AUTH_REQUESTED': 'auth_requested_at',
+        'AUTH_SUCCESS': 'auth_completed_at',
+        'AUTH_FAILED': 'auth_completed_at',
+        'CAPTURE_REQUESTED': 'capture_requested_at',
+        'CAPTURE_SUCCESS': 'capture_completed_at',
+        'CAPTURE_FAILED': 'capture_completed_at',
+    }
+    FAILURE_STATUSES = ('AUTH_FAILED', 'CAPTURE_FAILED', 'CANCEL_FAILED', 'SYSTEM_ERROR')
+
+    def record_event(self, event_type, code=None, message=None, payload=None, at=None):
+        """
+        상태 전이 기록. PaymentEvent INSERT 1회 + Payment 의 status/시각 컬럼만 갱신하는 UPDATE 1회.
+        (JSON 컬럼을 포함한 전체 행을 다시 쓰지 않는다)
+        """
+        at = at or timezone.now()
+        changes = {'status': event_type, 'updated_at': at}
+        timestamp_field = self.EVENT_TIMESTAMP_FIELDS.get(event_type)
+        if timestamp_field:
+            changes[timestamp_field] = at
+        if event_type in self.FAILURE_STATUSES:
+            changes.update(last_failed_at=at, error_code=code, error_message=message)
+
+        with transaction.atomic():
+            event = PaymentEvent.objects.create(payment=self, type=event_type, at=at, code=code, payload=payload or {})
+            Payment.objects.filter(pk=self.pk).update(**changes)
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return event
+
     def get_buyer_name(self):
         """요청 데이터에서 구매자 이름을 가져옵니다"""
         # auth_request 관계를 통해 구매자 정보 접근
@@ -329,19 +503,161 @@ class Payment(models.Model):
     @staticmethod
     def save_payment_data(order, data_dict):
         """결제 데이터를 저장하는 정적 메서드"""
-        # DB 컬럼 + JSON 필드에 모두 저장하여 데이터 누락 방지
-        payment = Payment.objects.create(
-            order=order,
-            moid=data_dict.get('Moid'),
-            amount=data_dict.get('Amt') or 0,
-            status='AUTH_REQUESTED',
-            payment_method_type=data_dict.get('PayMethod'),
-            # JSON 필드에는 원본 그대로 저장
-            payment_method_details={'raw': data_dict}
-        )
+        # DB 컬럼 + 원본 전문(raw_data)에 모두 저장하여 데이터 누락 방지
+        now = timezone.now()
+        with transaction.atomic():
+            payment = Payment.objects.create(
+                order=order,
+                moid=data_dict.get('Moid'),
+                amount=data_dict.get('Amt') or 0,
+                status='AUTH_REQUESTED',
+                auth_requested_at=now,
+                payment_method_type=data_dict.get('PayMethod'),
+                # 원본은 그대로 별도 테이블에 압축 저장
+                raw_data=data_dict,
+            )
+            PaymentEvent.objects.create(payment=payment, type='AUTH_REQUESTED', at=now)
         return payment
 
-class PaymentAuthRequest(models.Model):
+
+class PaymentEventQuerySet(models.QuerySet):
+    def stuck(self, event_type, older_than, window=None):
+        """
+        event_type 상태로 들어간 지 older_than 이상 지났는데 아직 그 상태인 결제들의 이벤트. ((type, at) 인덱스 범위 검색)
+        window 를 주면 cutoff 이전 window 만큼의 구간만 본다. (기본: 오래된 것까지 모두)
+        """
+        cutoff = timezone.now() - older_than
+        queryset = self.filter(type=event_type, at__lt=cutoff, payment__status=event_type)
+        if window is not None:
+            queryset = queryset.filter(at__gte=cutoff - window)
+        return queryset
+
+    def funnel(self, start, end):
+        """기간 내 상태별 결제 수 {type: count}"""
+        rows = (
+            self.filter(at__gte=start, at__lt=end)
+            .values('type')
+            .annotate(payments=models.Count('payment', distinct=True))
+            .order_by()
+        )
+        return {row['type']: row['payments'] for row in rows}
+
+
+class PaymentEvent(models.Model):
+    """결제 상태 전이 로그 (append-only). 현재 상태는 Payment.status 에 투영해 둔다."""
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='events', db_index=False)
+    type = models.CharField(max_length=20, choices=Payment.PAYMENT_FLOW_STATUS_CHOICES)
+    at = models.DateTimeField(default=timezone.now)
+    code = models.CharField(max_length=50, null=True, blank=True)  # PG 결과/오류 코드
+    payload = models.JSONField(default=dict, blank=True)  # 부가 정보 (작게 유지)
+
+    objects = PaymentEventQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "결제 이벤트"
+        verbose_name_plural = "결제 이벤트 로그"
+        ordering = ['at', 'id']
+        indexes = [
+            models.Index(fields=['type', 'at'], name='payment_event_type_at_idx'),
+            models.Index(fields=['payment', 'at'], name='payment_event_payment_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.payment_id} - {self.type} ({self.at})"
+
+class IdempotencyRecord(models.Model):
+    """
+    결제 콜백 등 재전송될 수 있는 요청의 처리 결과. (buccl_main.idempotency 참고)
+    key 는 scope + 멱등키의 sha256, request_hash 는 처음 요청 본문의 sha256 이다.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    scope = models.CharField(max_length=50)
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(default=dict, blank=True)
+    request_hash = models.CharField(max_length=64, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "멱등 요청 기록"
+        verbose_name_plural = "멱등 요청 기록 관리"
+
+    def __str__(self):
+        return f"{self.scope} - {self.key[:12]} ({self.status_code})"
+
+
+class PaymentRawPayload(models.Model):
+    """
+    결제/PG 모델의 원본 전문. (source, object_id) 로 원래 행을 가리키며, JSON 을 zlib 압축해 저장한다.
+    결제가 삭제되면 함께 삭제되도록 payment 를 두고, 원래 행만 삭제되면 post_delete 시그널(buccl_main.signals)로 지운다.
+    """
+    SOURCE_CHOICES = (
+        ('payment', '결제 인증 콜백'),
+        ('auth_request', '인증 요청'),
+        ('auth_response', '인증 응답'),
+        ('capture_request', '승인 요청'),
+        ('capture_response', '승인 응답'),
+        ('cancel_request', '취소 요청'),
+        ('cancel_response', '취소 응답'),
+        ('net_cancel_request', '망 취소 요청'),
+        ('net_cancel_response', '망 취소 응답'),
+    )
+    COMPRESS_LEVEL = 6
+
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='raw_payloads', db_index=True)
+    source = models.CharField(max_length=30, choices=SOURCE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    data = models.BinaryField()  # zlib(JSON)
+    size = models.PositiveIntegerField(default=0)  # 압축 전 바이트 수
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "PG 원본 전문"
+        verbose_name_plural = "PG 원본 전문 관리"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'object_id'], name='unique_raw_payload_per_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()}: {self.object_id} ({self.size} bytes)"
+
+    @classmethod
+    def compress(cls, value):
+        raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return zlib.compress(raw, cls.COMPRESS_LEVEL), len(raw)
+
+    @staticmethod
+    def decompress(data):
+        return json.loads(zlib.decompress(data)) if data else {}
+
+    @classmethod
+    def load(cls, source, object_id):
+        data = cls.objects.filter(source=source, object_id=object_id).values_list('data', flat=True).first()
+        return cls.decompress(data)
+
+    @classmethod
+    def store(cls, instance, created=False):
+        data, size = cls.compress(instance.raw_data)
+        values = {'payment_id': instance.get_raw_payload_payment_id(), 'data': data, 'size': size}
+        if created:
+            cls.objects.create(source=instance.RAW_PAYLOAD_SOURCE, object_id=instance.pk, **values)
+        else:
+            cls.objects.update_or_create(source=instance.RAW_PAYLOAD_SOURCE, object_id=instance.pk, defaults=values)
+
+    @classmethod
+    def prefetch(cls, instances):
+        """같은 모델 인스턴스 목록의 raw_data 를 쿼리 1회로 채운다."""
+        instances = [instance for instance in instances if instance.pk and '_raw_data' not in instance.__dict__]
+        if not instances:
+            return
+        rows = dict(
+            cls.objects.filter(source=instances[0].RAW_PAYLOAD_SOURCE, object_id__in=[i.pk for i in instances])
+            .values_list('object_id', 'data')
+        )
+        for instance in instances:
+            instance._raw_data = cls.decompress(rows.get(instance.pk))
+
+
+class PaymentAuthRequest(RawPayloadMixin, models.Model):
     """결제 인증 요청 파라미터 저장 모델"""
     payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name='auth_request')
     
@@ -370,18 +686,20 @@ class PaymentAuthRequest(models.Model):
     payment_config = models.JSONField(default=dict)
     # {'card_number_masked': '123456*1234', 'card_expiry': '2412', ...}
     
-    # 5. 전체 원본 데이터 (백업)
-    raw_data = models.JSONField(default=dict)
+    # 5. 전체 원본 데이터 (백업) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'auth_request'
+
+    objects = DeferredFieldsManager('buyer_info', 'amount_details', 'ui_options', 'payment_config')
 
     class Meta:
         verbose_name = "PG 인증 요청 정보"
         verbose_name_plural = "PG 인증 요청 정보 관리"
     
     def __str__(self):
-        return f"인증요청: {self.payment.order.moid if hasattr(self.payment, 'order') and hasattr(self.payment.order, 'moid') else self.payment_id}"
+        return f"인증요청: {self.payment_id}"
 
 
-class PaymentAuthResponse(models.Model):
+class PaymentAuthResponse(RawPayloadMixin, models.Model):
     """결제 인증 응답 파라미터 저장 모델"""
     payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name='auth_response')
     
@@ -406,8 +724,8 @@ class PaymentAuthResponse(models.Model):
     card_type = models.CharField(max_length=10, null=True, blank=True)  # 카드 종류 (신용/체크 등)
     pg_tid = models.CharField(max_length=100, null=True, blank=True)  # 인증 성공 시 PG TID
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 인증 응답 전체
+    # 전체 전문 (인증 응답 전체) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'auth_response'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -415,10 +733,10 @@ class PaymentAuthResponse(models.Model):
         verbose_name_plural = "PG 인증 응답 정보 관리"
     
     def __str__(self):
-        return f"인증응답: {self.payment.order.moid if hasattr(self.payment, 'order') and hasattr(self.payment.order, 'moid') else self.payment_id} - {self.result_code}"
+        return f"인증응답: {self.payment_id} - {self.result_code}"
 
 
-class PaymentCaptureRequest(models.Model):
+class PaymentCaptureRequest(RawPayloadMixin, models.Model):
     """결제 승인 요청 파라미터 저장 모델"""
     payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name='capture_request')
     
@@ -433,8 +751,8 @@ class PaymentCaptureRequest(models.Model):
     edi_type = models.CharField(max_length=20, null=True, blank=True)  # EdiType
     mall_reserved = models.TextField(null=True, blank=True)  # MallReserved
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 승인 요청 전체 파라미터
+    # 전체 전문 (승인 요청 전체 파라미터) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'capture_request'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -442,10 +760,10 @@ class PaymentCaptureRequest(models.Model):
         verbose_name_plural = "PG 승인 요청 정보 관리"
     
     def __str__(self):
-        return f"승인요청: {self.payment.order.moid if hasattr(self.payment, 'order') and hasattr(self.payment.order, 'moid') else self.payment_id}"
+        return f"승인요청: {self.payment_id}"
 
 
-class PaymentCaptureResponse(models.Model):
+class PaymentCaptureResponse(RawPayloadMixin, models.Model):
     """결제 승인 응답 파라미터 저장 모델"""
     payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name='capture_response')
     
@@ -482,8 +800,8 @@ class PaymentCaptureResponse(models.Model):
     card_acquirer_code = models.CharField(max_length=10, null=True, blank=True)  # 매입 카드사 코드
     card_acquirer_name = models.CharField(max_length=50, null=True, blank=True)  # 매입 카드사명
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 승인 응답 전체
+    # 전체 전문 (승인 응답 전체) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'capture_response'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -491,14 +809,14 @@ class PaymentCaptureResponse(models.Model):
         verbose_name_plural = "PG 승인 응답 정보 관리"
     
     def __str__(self):
-        return f"승인응답: {self.payment.order.moid if hasattr(self.payment, 'order') and hasattr(self.payment.order, 'moid') else self.payment_id} - {self.result_code}"
+        return f"승인응답: {self.payment_id} - {self.result_code}"
 
 class PaymentCancel(models.Model):
     """결제 취소 정보 관리 모델"""
     payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='cancellations', db_index=True)
     cancel_amount = models.DecimalField(max_digits=10, decimal_places=0)
     requested_at = models.DateTimeField(auto_now_add=True)  # 취소 요청 시각
-    completed_at = models.DateTimeField(null=True, blank=True)  # 취소 완료 시각 (PG 응답 기준)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)  # 취소 완료 시각 (PG 응답 기준, 매출 집계 증분 기준)
     
     reason = models.TextField(verbose_name="취소 사유")
     is_partial_cancel = models.BooleanField(default=False)  # 부분취소 여부
@@ -509,6 +827,8 @@ class PaymentCancel(models.Model):
     
     # 추가 JSON 필드
     cancel_details = models.JSONField(default=dict, blank=True)  # 취소 관련 추가 정보
+
+    objects = DeferredFieldsManager('cancel_details')
     
     class Meta:
         verbose_name = "결제 취소 정보"
@@ -519,7 +839,7 @@ class PaymentCancel(models.Model):
         cancel_type = "부분취소" if self.is_partial_cancel else "전체취소"
         return f"{cancel_type}: {self.payment.moid} - {self.cancel_amount}원 - {self.get_status_display() if self.status else 'N/A'}"
 
-class PaymentCancelRequest(models.Model):
+class PaymentCancelRequest(RawPayloadMixin, models.Model):
     """결제 취소 요청 파라미터 저장 모델"""
     payment_cancel = models.OneToOneField(PaymentCancel, on_delete=models.CASCADE, related_name='cancel_request')
     
@@ -550,20 +870,23 @@ class PaymentCancelRequest(models.Model):
     refund_bank_cd = models.CharField(max_length=20, null=True, blank=True)  # RefundBankCd
     refund_acct_nm = models.CharField(max_length=50, null=True, blank=True)  # RefundAcctNm
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 취소 요청 전체 파라미터
+    # 전체 전문 (취소 요청 전체 파라미터) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'cancel_request'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name = "PG 취소 요청 정보"
         verbose_name_plural = "PG 취소 요청 정보 관리"
     
+    def get_raw_payload_payment_id(self):
+        return self.payment_cancel.payment_id
+
     def __str__(self):
         payment_id = self.payment_cancel.payment_id if hasattr(self.payment_cancel, 'payment_id') else 'N/A'
         return f"취소요청: {payment_id} - {self.cancel_amt or 0}원"
 
 
-class PaymentCancelResponse(models.Model):
+class PaymentCancelResponse(RawPayloadMixin, models.Model):
     """결제 취소 응답 파라미터 저장 모델"""
     payment_cancel = models.OneToOneField(PaymentCancel, on_delete=models.CASCADE, related_name='cancel_response')
     
@@ -593,20 +916,23 @@ class PaymentCancelResponse(models.Model):
     multi_coupon_amt = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)  # MultiCouponAmt
     multi_rcpt_amt = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)  # MultiRcptAmt
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 취소 응답 전체
+    # 전체 전문 (취소 응답 전체) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'cancel_response'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name = "PG 취소 응답 정보"
         verbose_name_plural = "PG 취소 응답 정보 관리"
     
+    def get_raw_payload_payment_id(self):
+        return self.payment_cancel.payment_id
+
     def __str__(self):
         payment_id = self.payment_cancel.payment_id if hasattr(self.payment_cancel, 'payment_id') else 'N/A'
         return f"취소응답: {payment_id} - {self.result_code}"
 
 
-class PaymentNetCancelRequest(models.Model):
+class PaymentNetCancelRequest(RawPayloadMixin, models.Model):
     """망 취소 요청 파라미터 저장 모델"""
     payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='net_cancel_requests')
     
@@ -622,8 +948,8 @@ class PaymentNetCancelRequest(models.Model):
     edi_type = models.CharField(max_length=20, null=True, blank=True)  # EdiType
     mall_reserved = models.TextField(null=True, blank=True)  # MallReserved
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 망 취소 요청 전체 파라미터
+    # 전체 전문 (망 취소 요청 전체 파라미터) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'net_cancel_request'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -631,10 +957,10 @@ class PaymentNetCancelRequest(models.Model):
         verbose_name_plural = "PG 망 취소 요청 정보 관리"
     
     def __str__(self):
-        return f"망취소요청: {self.payment.order.moid if hasattr(self.payment, 'order') and hasattr(self.payment.order, 'moid') else self.payment_id}"
+        return f"망취소요청: {self.payment_id}"
 
 
-class PaymentNetCancelResponse(models.Model):
+class PaymentNetCancelResponse(RawPayloadMixin, models.Model):
     """망 취소 응답 파라미터 저장 모델"""
     payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='net_cancel_responses')
     net_cancel_request = models.OneToOneField(PaymentNetCancelRequest, on_delete=models.CASCADE, related_name='response', null=True, blank=True)
@@ -664,8 +990,8 @@ class PaymentNetCancelResponse(models.Model):
     multi_coupon_amt = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)  # MultiCouponAmt
     multi_rcpt_amt = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)  # MultiRcptAmt
     
-    # 전체 전문
-    raw_data = models.JSONField(default=dict, blank=True)  # 망 취소 응답 전체
+    # 전체 전문 (망 취소 응답 전체) -> raw_data (PaymentRawPayload)
+    RAW_PAYLOAD_SOURCE = 'net_cancel_response'
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -673,7 +999,7 @@ class PaymentNetCancelResponse(models.Model):
         verbose_name_plural = "PG 망 취소 응답 정보 관리"
     
     def __str__(self):
-        return f"망취소응답: {self.payment.order.moid if hasattr(self.payment, 'order') and hasattr(self.payment.order, 'moid') else self.payment_id} - {self.result_code}"
+        return f"망취소응답: {self.payment_id} - {self.result_code}"
 
 # 6. 리뷰 관련 모델 (Reviews)
 class ClassReview(models.Model):
@@ -704,4 +1030,81 @@ class ReviewImage(models.Model):
         verbose_name_plural = "리뷰 이미지 관리"
 
     def __str__(self):
-        return f"Review {self.review.id} Image"
\ No newline at end of file
+        return f"Review {self.review_id} Image"
+
+
+# 7. 집계 모델 (Rollups) - buccl_main.rollups 에서만 갱신, 리포트 API 는 이 테이블만 조회
+class RollupWatermark(models.Model):
+    """집계별 마지막 처리 시각. 다음 실행은 이 시각 이후 변경된 행만 다시 집계한다."""
+    name = models.CharField(max_length=50, unique=True)
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "집계 진행 위치"
+        verbose_name_plural = "집계 진행 위치 관리"
+
+    def __str__(self):
+        return f"{self.name}: {self.processed_until}"
+
+
+class DailySales(models.Model):
+    """일별 매출 집계 (결제 승인일/취소 완료일 기준, 상품 유형 x 종목)"""
+    date = models.DateField()
+    product_type = models.CharField(max_length=20, choices=Order.PRODUCT_TYPE_CHOICES)
+    sport = models.ForeignKey(Sport, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    order_count = models.PositiveIntegerField(default=0)
+    payment_count = models.PositiveIntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=0, default=0)  # 승인 금액
+    cancel_count = models.PositiveIntegerField(default=0)
+    cancelled_amount = models.DecimalField(max_digits=14, decimal_places=0, default=0)  # 취소 완료 금액
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "daily_sales"
+        verbose_name = "일별 매출 집계"
+        verbose_name_plural = "일별 매출 집계 조회"
+        ordering = ['date', 'product_type', 'sport']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product_type', 'sport'], name='unique_daily_sales_row'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product_type} {self.sport_id or '-'}: {self.net_amount}원"
+
+    @property
+    def net_amount(self):
+        return self.gross_amount - self.cancelled_amount
+
+
+class DailyBookings(models.Model):
+    """일별 레슨 예약 집계 (스케줄 날짜 기준, 강사 x 장소)"""
+    date = models.DateField()
+    instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    schedule_count = models.PositiveIntegerField(default=0)  # 취소되지 않은 스케줄 수
+    capacity = models.PositiveIntegerField(default=0)
+    booked_count = models.PositiveIntegerField(default=0)  # 확정 예약 (대기/취소 제외)
+    waiting_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "daily_bookings"
+        verbose_name = "일별 예약 집계"
+        verbose_name_plural = "일별 예약 집계 조회"
+        ordering = ['date', 'instructor', 'location']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'instructor', 'location'], name='unique_daily_bookings_row'),
+        ]
+        indexes = [
+            models.Index(fields=['instructor', 'date'], name='daily_bookings_instructor_idx'),
+            models.Index(fields=['location', 'date'], name='daily_bookings_location_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.instructor_id}@{self.location_id}: {self.booked_count}/{self.capacity}"
+
+    @property
+    def fill_rate(self):
+        return round(self.booked_count / self.capacity, 4) if self.capacity else None
@@ -0,0 +1,341 @@
+"""
+NicePay 결제 API 클라이언트
+
+- 프로세스 당 하나의 requests.Session(keep-alive 커넥션 풀)을 공유한다. get_client() 사용.
+- 모든 호출에 connect/read timeout 을 건다. 재시도는 하지 않는다. (승인/취소는 멱등하지 않음)
+- 연속 실패 시 CircuitBreaker 가 열려 일정 시간 동안 PG 호출 없이 바로 실패한다.
+- 승인 요청 후 응답을 받지 못한 경우(read timeout 등) 결과를 알 수 없으므로 자동으로 망취소를 보낸다.
+- 호출별 소요 시간은 LatencyStats 에 기록되고 logger 로도 남는다.
+"""
+import hashlib
+import hmac
+import logging
+import math
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('django')
+
+DEFAULT_CANCEL_URL = 'https://pg-api.nicepay.co.kr/webapi/cancel_process.jsp'
+DEFAULT_ALLOWED_HOSTS = (
+    'webapi.nicepay.co.kr', 'pg-api.nicepay.co.kr', 'dc1-api.nicepay.co.kr', 'dc2-api.nicepay.co.kr',
+)
+
+# 승인 성공 코드 (결제수단별)
+CAPTURE_SUCCESS_CODES = {
+    'CARD': '3001',
+    'BANK': '4000',
+    'VBANK': '4100',
+    'CELLPHONE': 'A000',
+}
+CANCEL_SUCCESS_CODES = ('2001', '2211')
+NET_CANCEL_SUCCESS_CODES = ('2001', '2211')
+
+
+class NicePayError(Exception):
+    pass
+
+
+class GatewayUnavailable(NicePayError):
+    """요청이 PG 에 전달되지 않은 경우 (CircuitBreaker open, 연결 실패). 재시도해도 안전하다."""
+    pass
+
+
+class GatewayTimeout(NicePayError):
+    """요청은 보냈지만 응답을 받지 못한 경우. 승인이면 net_cancel_response 에 망취소 결과가 담긴다."""
+
+    def __init__(self, message, net_cancel_response=None):
+        super().__init__(message)
+        self.net_cancel_response = net_cancel_response
+
+
+class CircuitBreaker:
+    """
+    연속 failure_threshold 회 실패하면 open 되어 reset_timeout 초 동안 호출을 막는다.
+    이후 한 건만 통과시켜(half-open) 성공하면 닫고, 실패하면 다시 연다.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class LatencyStats:
+    """작업(operation)별 호출 수/오류 수와 최근 window 건의 소요 시간(ms) 분포"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, operation, elapsed_ms, ok=True):
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self.window)).append(elapsed_ms)
+            count = self._counts.setdefault(operation, {'count': 0, 'errors': 0})
+            count['count'] += 1
+            if not ok:
+                count['errors'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for operation, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[operation] = {
+                    **self._counts[operation],
+                    'avg_ms': round(sum(ordered) / len(ordered), 1),
+                    'p50_ms': round(_percentile(ordered, 50), 1),
+                    'p95_ms': round(_percentile(ordered, 95), 1),
+                    'p99_ms': round(_percentile(ordered, 99), 1),
+                    'max_ms': round(ordered[-1], 1),
+                }
+            return result
+
+
+def _percentile(ordered, percent):
+    # nearest-rank
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class NicePayResponse:
+    """PG 응답. params 는 보낸 요청 파라미터(요청 모델 raw_data 저장용), data 는 응답 JSON"""
+
+    def __init__(self, operation, params, data, elapsed_ms, success_codes):
+        self.operation = operation
+        self.params = params
+        self.data = data
+        self.elapsed_ms = elapsed_ms
+        self._success_codes = success_codes
+
+    @property
+    def result_code(self):
+        return self.data.get('ResultCode')
+
+    @property
+    def result_msg(self):
+        return self.data.get('ResultMsg')
+
+    @property
+    def ok(self):
+        return self.result_code in self._success_codes
+
+    def __repr__(self):
+        return f"<NicePayResponse {self.operation} {self.result_code} {self.elapsed_ms:.0f}ms>"
+
+
+class NicePayClient:
+    def __init__(self, merchant_id, merchant_key, cancel_url=DEFAULT_CANCEL_URL, connect_timeout=3, read_timeout=15,
+                 pool_maxsize=20, allowed_hosts=DEFAULT_ALLOWED_HOSTS, breaker=None, stats=None):
+        self.merchant_id = merchant_id
+        self.merchant_key = merchant_key
+        self.cancel_url = cancel_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.allowed_hosts = set(allowed_hosts)
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = stats or LatencyStats()
+
+        self.session = requests.Session()
+        # 재시도는 하지 않는다. (승인/취소 요청이 중복 처리될 수 있음)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    # ---- 서명 ----
+    @staticmethod
+    def edi_date():
+        now = timezone.now()
+        if timezone.is_aware(now):
+            now = timezone.localtime(now)
+        return now.strftime('%Y%m%d%H%M%S')
+
+    @staticmethod
+    def sign(*parts):
+        return hashlib.sha256(''.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def auth_sign_data(self, edi_date, amt):
+        """결제창 호출(인증 요청) 시 사용하는 SignData"""
+        return self.sign(edi_date, self.merchant_id, amt, self.merchant_key)
+
+    def verify_auth_signature(self, auth_token, amt, signature):
+        """인증 결과(returnURL 로 전달된 값)의 Signature 검증"""
+        return hmac.compare_digest(self.sign(auth_token, self.merchant_id, amt, self.merchant_key), signature or '')
+
+    # ---- API ----
+    def capture(self, tid, auth_token, amt, next_app_url, net_cancel_url=None, mall_reserved=''):
+        """
+        승인 요청. 응답을 받지 못하면 net_cancel_url 로 망취소를 보내고 GatewayTimeout 을 올린다.
+        """
+        edi_date = self.edi_date()
+        params = {
+            'TID': tid,
+            'AuthToken': auth_token,
+            'MID': self.merchant_id,
+            'Amt': str(amt),
+            'EdiDate': edi_date,
+            'SignData': self.sign(auth_token, self.merchant_id, amt, edi_date, self.merchant_key),
+            'CharSet': 'utf-8',
+            'EdiType': 'JSON',
+            'MallReserved': mall_reserved,
+        }
+        try:
+            return self._post('capture', next_app_url, params, tuple(CAPTURE_SUCCESS_CODES.values()))
+        except GatewayTimeout as e:
+            if not net_cancel_url:
+                raise
+            logger.warning(f"nicepay capture 응답 없음, 망취소 진행: tid={tid}")
+            try:
+                net_cancel_response = self.net_cancel(tid, auth_token, amt, net_cancel_url)
+            except NicePayError as net_cancel_error:
+                logger.error(f"nicepay 망취소 실패: tid={tid}, error={net_cancel_error}")
+                net_cancel_response = None
+            raise GatewayTimeout(str(e), net_cancel_response=net_cancel_response) from e
+
+    def net_cancel(self, tid, auth_token, amt, net_cancel_url):
+        """망취소. 승인 결과를 알 수 없을 때 보내는 요청이므로 CircuitBreaker 와 무관하게 항상 시도한다."""
+        edi_date = self.edi_date()
+        params = {
+            'TID': tid,
+            'AuthToken': auth_token,
+            'MID': self.merchant_id,
+            'Amt': str(amt),
+            'EdiDate': edi_date,
+            'NetCancel': '1',
+            'SignData': self.sign(auth_token, self.merchant_id, amt, edi_date, self.merchant_key),
+            'CharSet': 'utf-8',
+            'EdiType': 'JSON',
+        }
+        return self._post('net_cancel', net_cancel_url, params, NET_CANCEL_SUCCESS_CODES, use_breaker=False)
+
+    def cancel(self, tid, moid, cancel_amt, cancel_msg, partial=False):
+        """승인 취소 (전체/부분)"""
+        edi_date = self.edi_date()
+        params = {
+            'TID': tid,
+            'MID': self.merchant_id,
+            'Moid': moid,
+            'CancelAmt': str(cancel_amt),
+            'CancelMsg': cancel_msg,
+            'PartialCancelCode': '1' if partial else '0',
+            'EdiDate': edi_date,
+            'SignData': self.sign(self.merchant_id, cancel_amt, edi_date, self.merchant_key),
+            'CharSet': 'utf-8',
+            'EdiType': 'JSON',
+        }
+        return self._post('cancel', self.cancel_url, params, CANCEL_SUCCESS_CODES)
+
+    def _post(self, operation, url, params, success_codes, use_breaker=True):
+        host = urlsplit(url).hostname
+        if host not in self.allowed_hosts:
+            # NextAppURL/NetCancelURL 은 클라이언트를 거쳐 전달되는 값이므로 허용된 PG 호스트만 호출
+            raise NicePayError(f"허용되지 않은 PG 호스트: {host}")
+        if use_breaker and not self.breaker.allow():
+            self.stats.record(operation, 0, ok=False)
+            raise GatewayUnavailable(f"nicepay {operation}: circuit open")
+
+        started = time.perf_counter()
+        failed = True
+        try:
+            try:
+                response = self.session.post(url, data=params, timeout=self.timeout)
+            except requests.ConnectTimeout as e:
+                raise GatewayUnavailable(f"nicepay {operation}: connect timeout") from e
+            except requests.Timeout as e:
+                raise GatewayTimeout(f"nicepay {operation}: read timeout") from e
+            except requests.ConnectionError as e:
+                # 연결 자체가 안 된 경우와 전송 도중 끊긴 경우를 구분할 수 없으므로 결과 불명으로 처리
+                raise GatewayTimeout(f"nicepay {operation}: connection error ({e})") from e
+
+            if response.status_code >= 500:
+                raise GatewayTimeout(f"nicepay {operation}: HTTP {response.status_code}")
+            try:
+                data = response.json()
+            except ValueError as e:
+                raise GatewayTimeout(f"nicepay {operation}: invalid response body") from e
+            failed = False
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats.record(operation, elapsed_ms, ok=not failed)
+            if use_breaker:
+                if failed:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+        result = NicePayResponse(operation, params, data, elapsed_ms, success_codes)
+        logger.debug(f"nicepay {operation}: tid={params.get('TID')}, code={result.result_code}, {elapsed_ms:.0f}ms")
+        return result
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """settings 기반으로 생성한 프로세스 공용 클라이언트"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NicePayClient(
+                    merchant_id=settings.NICEPAY_MERCHANT_ID,
+                    merchant_key=settings.NICEPAY_MERCHANT_KEY,
+                    cancel_url=getattr(settings, 'NICEPAY_CANCEL_URL', DEFAULT_CANCEL_URL),
+                    connect_timeout=getattr(settings, 'NICEPAY_CONNECT_TIMEOUT', 3),
+                    read_timeout=getattr(settings, 'NICEPAY_READ_TIMEOUT', 15),
+                    pool_maxsize=getattr(settings, 'NICEPAY_POOL_MAXSIZE', 20),
+                    allowed_hosts=getattr(settings, 'NICEPAY_ALLOWED_HOSTS', DEFAULT_ALLOWED_HOSTS),
+                    breaker=CircuitBreaker(
+                        failure_threshold=getattr(settings, 'NICEPAY_BREAKER_THRESHOLD', 5),
+                        reset_timeout=getattr(settings, 'NICEPAY_BREAKER_RESET_SECONDS', 30),
+                    ),
+                )
+    return _client
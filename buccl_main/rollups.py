@@ -0,0 +1,180 @@
+"""
+일별 매출/예약 집계(DailySales, DailyBookings) 증분 갱신
+
+원본 테이블 전체를 다시 읽지 않고, 워터마크(RollupWatermark) 이후 변경된 행이 속한 날짜만 찾아
+그 날짜의 집계 행을 다시 계산한다. 날짜 단위로 통째로 다시 쓰므로 같은 구간을 여러 번 처리해도 결과가 같다.
+
+- 매출: PaymentEvent(type, at) 인덱스로 승인(CAPTURE_SUCCESS), PaymentCancel.completed_at 으로 취소 완료를 찾는다.
+- 예약: SessionReservation.created_at / cancelled_at, InstructorSchedule.updated_at(정원/상태 변경)을 본다.
+
+`python manage.py update_rollups` 를 주기적으로(cron 등) 실행한다.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from buccl_lessons.models import InstructorSchedule, SessionReservation
+from .models import DailyBookings, DailySales, Payment, PaymentCancel, PaymentEvent, RollupWatermark
+
+logger = logging.getLogger('django')
+
+SALES = 'daily_sales'
+BOOKINGS = 'daily_bookings'
+
+# 워터마크가 없을 때(최초 실행) 시작 시각
+INITIAL_WATERMARK = datetime(2000, 1, 1)
+# 예약 집계를 한 번에 계산할 날짜 수
+BOOKING_DATES_PER_QUERY = 31
+
+
+def _day_range(day):
+    start = datetime.combine(day, time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    return start, start + timedelta(days=1)
+
+
+def _to_date(value):
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def changed_sales_dates(since, until):
+    """since ~ until 사이에 승인/취소 완료가 발생한 날짜"""
+    captured = PaymentEvent.objects.filter(type='CAPTURE_SUCCESS', at__gt=since, at__lte=until).datetimes('at', 'day')
+    cancelled = PaymentCancel.objects.filter(completed_at__gt=since, completed_at__lte=until).datetimes('completed_at', 'day')
+    return {_to_date(day) for day in captured} | {_to_date(day) for day in cancelled}
+
+
+def changed_booking_dates(since, until):
+    """since ~ until 사이에 예약 생성/취소, 스케줄 변경이 있었던 스케줄 날짜"""
+    reserved = SessionReservation.objects.filter(
+        Q(created_at__gt=since, created_at__lte=until) | Q(cancelled_at__gt=since, cancelled_at__lte=until)
+    ).values_list('schedule__date', flat=True).distinct()
+    scheduled = InstructorSchedule.objects.filter(updated_at__gt=since, updated_at__lte=until).values_list('date', flat=True).distinct()
+    return set(reserved) | set(scheduled)
+
+
+def compute_sales(day):
+    """하루치 DailySales 행 (저장 전). 승인/취소 각각 집계 쿼리 1회"""
+    start, end = _day_range(day)
+    rows = defaultdict(dict)
+
+    # 같은 결제에 승인 이벤트가 중복으로 남아도 금액을 한 번만 더하도록 결제 단위로 집계한다
+    captured_payments = PaymentEvent.objects.filter(type='CAPTURE_SUCCESS', at__gte=start, at__lt=end).values('payment_id')
+    captured = (
+        Payment.objects.filter(pk__in=captured_payments)
+        .values(kind=F('order__product_type'), sport_ref=F('order__product__catalog_entry__sport_id'))
+        .annotate(
+            order_count=Count('order', distinct=True),
+            payment_count=Count('id'),
+            gross_amount=Sum('amount'),
+        )
+        .order_by()
+    )
+    cancelled = (
+        PaymentCancel.objects.filter(status='CANCEL_SUCCESS', completed_at__gte=start, completed_at__lt=end)
+        .values(kind=F('payment__order__product_type'), sport_ref=F('payment__order__product__catalog_entry__sport_id'))
+        .annotate(cancel_count=Count('id'), cancelled_amount=Sum('cancel_amount'))
+        .order_by()
+    )
+    for row in list(captured) + list(cancelled):
+        rows[(row.pop('kind'), row.pop('sport_ref'))].update(row)
+
+    return [
+        DailySales(date=day, product_type=product_type, sport_id=sport_id, **values)
+        for (product_type, sport_id), values in rows.items()
+    ]
+
+
+def compute_bookings(days):
+    """여러 날짜의 DailyBookings 행 (저장 전). 스케줄/예약 집계 쿼리 각 1회"""
+    rows = defaultdict(dict)
+    schedules = (
+        InstructorSchedule.objects.filter(date__in=days).exclude(status='CANCELLED')
+        .values('date', 'instructor_id', 'location_id')
+        .annotate(schedule_count=Count('id'), capacity=Sum('capacity'))
+        .order_by()
+    )
+    active = ~Q(status='CANCELLED')
+    reservations = (
+        SessionReservation.objects.filter(schedule__date__in=days)
+        .values(day=F('schedule__date'), instructor_ref=F('schedule__instructor_id'), location_ref=F('schedule__location_id'))
+        .annotate(
+            booked_count=Count('id', filter=active & Q(is_waiting=False)),
+            waiting_count=Count('id', filter=active & Q(is_waiting=True)),
+            cancelled_count=Count('id', filter=Q(status='CANCELLED')),
+        )
+        .order_by()
+    )
+    for row in schedules:
+        rows[(row.pop('date'), row.pop('instructor_id'), row.pop('location_id'))].update(row)
+    for row in reservations:
+        rows[(row.pop('day'), row.pop('instructor_ref'), row.pop('location_ref'))].update(row)
+
+    return [
+        DailyBookings(date=day, instructor_id=instructor_id, location_id=location_id, **values)
+        for (day, instructor_id, location_id), values in rows.items()
+    ]
+
+
+def rebuild_sales(days):
+    for day in sorted(days):
+        DailySales.objects.filter(date=day).delete()
+        DailySales.objects.bulk_create(compute_sales(day))
+
+
+def rebuild_bookings(days):
+    days = sorted(days)
+    for i in range(0, len(days), BOOKING_DATES_PER_QUERY):
+        chunk = days[i:i + BOOKING_DATES_PER_QUERY]
+        DailyBookings.objects.filter(date__in=chunk).delete()
+        DailyBookings.objects.bulk_create(compute_bookings(chunk))
+
+
+ROLLUPS = {
+    SALES: (changed_sales_dates, rebuild_sales),
+    BOOKINGS: (changed_booking_dates, rebuild_bookings),
+}
+
+
+def all_dates_since(name, start_date):
+    """start_date 이후 집계 대상이 될 수 있는 모든 날짜 (--since 재구축용)"""
+    if name == BOOKINGS:
+        return set(InstructorSchedule.objects.filter(date__gte=start_date).values_list('date', flat=True).distinct())
+    today = _to_date(timezone.now())
+    return {start_date + timedelta(days=n) for n in range((today - start_date).days + 1)}
+
+
+def update_rollups(names=None, rebuild_since=None, now=None):
+    """
+    집계별로 워터마크 이후 변경된 날짜를 다시 계산하고 워터마크를 옮긴다. {name: 처리한 날짜 수} 반환.
+    커밋이 늦게 된 행을 놓치지 않도록 ROLLUP_SAFETY_LAG_SECONDS 만큼 이전 구간부터 다시 본다.
+    rebuild_since(date) 를 주면 그 날짜 이후 전체를 다시 계산한다.
+    """
+    now = now or timezone.now()
+    lag = timedelta(seconds=getattr(settings, 'ROLLUP_SAFETY_LAG_SECONDS', 300))
+    processed = {}
+    for name in names or ROLLUPS:
+        find_dates, rebuild = ROLLUPS[name]
+        with transaction.atomic():
+            # 동시에 실행되어도 같은 날짜를 번갈아 지우고 쓰지 않도록 워터마크 행을 잠근다
+            watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(
+                name=name, defaults={'processed_until': INITIAL_WATERMARK},
+            )
+            if rebuild_since is not None:
+                days = all_dates_since(name, rebuild_since)
+            else:
+                days = find_dates(watermark.processed_until - lag, now)
+            rebuild(days)
+            watermark.processed_until = now
+            watermark.save(update_fields=['processed_until', 'updated_at'])
+        processed[name] = len(days)
+        logger.info(f"rollup {name}: {len(days)} day(s) refreshed, watermark={now}")
+    return processed
@@ -2,11 +2,13 @@ from .models import (
     Sport, Location,
     Product, ProductType, Order, Payment, PaymentCancel,
     TravelProduct, ClassProduct, 
-    ProductImage, ClassReview, ReviewImage
+    ProductImage, ClassReview, ReviewImage, CatalogEntry,
+    DailySales, DailyBookings
 )
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from datetime import timedelta
 
 User = get_user_model()
@@ -21,12 +23,19 @@ class LocationSerializer(serializers.ModelSerializer):
         model = Location
         fields = '__all__'
 
+class NearbyLocationSerializer(LocationSerializer):
+    distance_km = serializers.SerializerMethodField()
+
+    def get_distance_km(self, obj):
+        return round(obj.distance_km, 3)
+
 class PaymentSerializer(serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
     class Meta:
         model = Payment
-        fields = '__all__'
+        # 무거운 JSON 컬럼은 기본 매니저에서 defer 되므로 직렬화하지 않는다 (행마다 추가 쿼리 발생)
+        exclude = ('payment_method_details', 'error_data')
 
 class PaymentCancelSerializer(serializers.ModelSerializer):
     class Meta:
@@ -107,6 +116,44 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = '__all__'
 
+class OrderPaymentSummarySerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = ['id', 'attempt_number', 'status', 'status_display', 'amount', 'payment_method_type', 'capture_completed_at']
+
+class MyOrderSerializer(serializers.ModelSerializer):
+    """내 주문 내역. latest_payments(마지막 결제 1건, cancelled_amount 주석 포함)를 prefetch 한 Order 를 받는다."""
+    product_name = serializers.CharField(source='product.name', default=None, read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    latest_payment = serializers.SerializerMethodField()
+    cancellation_status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'product', 'product_name', 'product_type', 'quantity', 'total_amount',
+            'status', 'status_display', 'created_at', 'latest_payment', 'cancellation_status'
+        ]
+
+    @staticmethod
+    def _latest_payment(obj):
+        payments = getattr(obj, 'latest_payments', None)
+        return payments[0] if payments else None
+
+    def get_latest_payment(self, obj):
+        payment = self._latest_payment(obj)
+        return OrderPaymentSummarySerializer(payment).data if payment else None
+
+    def get_cancellation_status(self, obj):
+        """NONE / PARTIAL (부분 취소) / FULL (전체 취소)"""
+        payment = self._latest_payment(obj)
+        cancelled = getattr(payment, 'cancelled_amount', None) or 0
+        if obj.status == 'CANCELLED' or (payment and payment.amount and cancelled >= payment.amount):
+            return 'FULL'
+        return 'PARTIAL' if cancelled else 'NONE'
+
 class ProductTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductType
@@ -115,4 +162,40 @@ class ProductTypeSerializer(serializers.ModelSerializer):
 class ClassProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClassProduct
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class CatalogEntrySerializer(serializers.ModelSerializer):
+    product_id = serializers.IntegerField(read_only=True)
+    sport_id = serializers.IntegerField(read_only=True)
+    main_image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CatalogEntry
+        fields = [
+            'product_id', 'product_type_code', 'product_type_name', 'name',
+            'price', 'display_price', 'discount_rate', 'main_image',
+            'sport_id', 'is_available', 'available_until'
+        ]
+
+    def get_main_image(self, obj):
+        return default_storage.url(obj.main_image) if obj.main_image else None
+
+class DailySalesSerializer(serializers.ModelSerializer):
+    net_amount = serializers.DecimalField(max_digits=14, decimal_places=0, read_only=True)
+
+    class Meta:
+        model = DailySales
+        fields = [
+            'date', 'product_type', 'sport', 'order_count', 'payment_count',
+            'gross_amount', 'cancel_count', 'cancelled_amount', 'net_amount'
+        ]
+
+class DailyBookingsSerializer(serializers.ModelSerializer):
+    fill_rate = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = DailyBookings
+        fields = [
+            'date', 'instructor', 'location', 'schedule_count', 'capacity',
+            'booked_count', 'waiting_count', 'cancelled_count', 'fill_rate'
+        ]
@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from buccl_lessons.models import LessonProduct
+from .models import Payment, PaymentRawPayload, Product, ProductType, ClassProduct, RawPayloadMixin, TravelProduct
+from . import catalog
+
+
+# 상품 카탈로그 스냅샷 갱신 (CatalogEntry)
+@receiver(post_save, sender=Product)
+def refresh_catalog_on_product_save(sender, instance, raw=False, **kwargs):
+    if raw or not catalog.sync_enabled():  # loaddata/대량 import 는 별도로 일괄 처리
+        return
+    catalog.refresh_products([instance.pk])
+
+@receiver(post_save, sender=ProductType)
+def refresh_catalog_on_product_type_save(sender, instance, raw=False, **kwargs):
+    if raw or not catalog.sync_enabled():
+        return
+    catalog.refresh_products(instance.product_set.values_list('pk', flat=True))
+
+@receiver(post_save, sender=ClassProduct)
+@receiver(post_delete, sender=ClassProduct)
+def refresh_catalog_on_class_product_change(sender, instance, raw=False, **kwargs):
+    if raw or not catalog.sync_enabled():
+        return
+    catalog.refresh_source('CLASS', instance.pk)
+
+@receiver(post_save, sender=TravelProduct)
+@receiver(post_delete, sender=TravelProduct)
+def refresh_catalog_on_travel_product_change(sender, instance, raw=False, **kwargs):
+    if raw or not catalog.sync_enabled():
+        return
+    catalog.refresh_source('TRAVEL', instance.pk)
+
+@receiver(post_save, sender=LessonProduct)
+@receiver(post_delete, sender=LessonProduct)
+def refresh_catalog_on_lesson_product_change(sender, instance, raw=False, **kwargs):
+    if raw or not catalog.sync_enabled():
+        return
+    catalog.refresh_source('LESSON', instance.pk)
+
+
+# PG 원본 전문 정리. PaymentRawPayload 는 원래 행을 (source, object_id) 로만 가리키므로
+# 결제가 남아 있는 채로 망취소/취소 기록 등을 지우면 직접 삭제한다. (결제 삭제는 payment FK CASCADE 로 함께 지워짐)
+def delete_raw_payload(sender, instance, **kwargs):
+    PaymentRawPayload.objects.filter(source=sender.RAW_PAYLOAD_SOURCE, object_id=instance.pk).delete()
+
+for model in apps.get_app_config('buccl_main').get_models():
+    if issubclass(model, RawPayloadMixin) and model is not Payment:
+        post_delete.connect(delete_raw_payload, sender=model, dispatch_uid=f'delete_raw_payload_{model.__name__}')
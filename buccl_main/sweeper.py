@@ -0,0 +1,157 @@
+"""
+결제 미완료(이탈) 주문 정리
+
+PENDING / PAYMENT_ATTEMPTED / PAYMENT_PROCESSING 상태로 TTL 이상 머문 주문을 찾아 종료 상태로 옮긴다.
+- PENDING -> CANCELLED, PAYMENT_ATTEMPTED / PAYMENT_PROCESSING -> PAYMENT_FAILED
+- 인증만 끝났거나 승인 결과를 모르는 결제(HALF_OPEN_STATUSES)는 먼저 망취소하고, 실패하면 그 주문은 다음 실행으로 미룬다.
+- 인증 요청에서 멈춘 결제(AUTH_REQUESTED)와 PG 에 열린 거래가 없어 망취소할 것이 없는 결제는 AUTH_FAILED(EXPIRED) 이벤트를 남긴다.
+
+주문은 (status, last_payment_attempt_at) 인덱스로 찾고, pk 순서로 batch_size 씩 UPDATE 한다.
+망취소는 STALE_ORDER_NET_CANCEL_GATEWAY 설정의 클래스로 보낸다. (기본: NicePay)
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Order, Payment, PaymentEvent, PaymentNetCancelRequest, PaymentNetCancelResponse
+from .nicepay import NicePayError, get_client
+
+logger = logging.getLogger('django')
+
+# 주문 상태 -> 정리 후 상태
+STALE_TRANSITIONS = {
+    'PENDING': 'CANCELLED',
+    'PAYMENT_ATTEMPTED': 'PAYMENT_FAILED',
+    'PAYMENT_PROCESSING': 'PAYMENT_FAILED',
+}
+# PG 에 거래가 열려 있을 수 있어 망취소가 필요한 결제 상태
+HALF_OPEN_STATUSES = ('AUTH_SUCCESS', 'CAPTURE_REQUESTED')
+EXPIRED_CODE = 'EXPIRED'
+# net_cancel() 결과: PG 에 열린 거래가 없어 망취소를 보내지 않음
+NOTHING_TO_CANCEL = 'NOTHING_TO_CANCEL'
+
+
+class NicePayNetCancelGateway:
+    """
+    망취소 게이트웨이 기본 구현. net_cancel(payment) 는 망취소에 성공하면 True, 실패하면 False,
+    인증 응답이 없어 PG 에 열린 거래가 없으면 NOTHING_TO_CANCEL 을 돌려준다.
+    다른 PG 를 쓰려면 같은 메소드를 가진 클래스를 STALE_ORDER_NET_CANCEL_GATEWAY 에 지정한다.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or get_client()
+
+    def net_cancel(self, payment):
+        auth = getattr(payment, 'auth_response', None)
+        if auth is None or not (auth.tx_tid and auth.auth_token and auth.net_cancel_url):
+            # 인증 응답이 없으면 PG 에 열린 거래도 없다
+            return NOTHING_TO_CANCEL
+        amt = int(auth.amt or payment.amount)
+        try:
+            response = self.client.net_cancel(auth.tx_tid, auth.auth_token, amt, auth.net_cancel_url)
+        except NicePayError as e:
+            logger.warning(f"stale order net cancel failed: payment={payment.pk}, error={e}")
+            return False
+
+        params = response.params
+        request = PaymentNetCancelRequest.objects.create(
+            payment=payment, tid=params.get('TID'), auth_token=params.get('AuthToken'), mid=params.get('MID'),
+            amt=amt, edi_date=params.get('EdiDate'), net_cancel=params.get('NetCancel'), sign_data=params.get('SignData'),
+            char_set=params.get('CharSet'), edi_type=params.get('EdiType'), raw_data=params,
+        )
+        PaymentNetCancelResponse.objects.create(
+            payment=payment, net_cancel_request=request, result_code=response.result_code, result_msg=response.result_msg,
+            tid=response.data.get('TID'), cancel_amt=response.data.get('CancelAmt') or None, raw_data=response.data,
+        )
+        if not response.ok:
+            logger.warning(f"stale order net cancel rejected: payment={payment.pk}, code={response.result_code}")
+        return response.ok
+
+
+def get_net_cancel_gateway():
+    path = getattr(settings, 'STALE_ORDER_NET_CANCEL_GATEWAY', 'buccl_main.sweeper.NicePayNetCancelGateway')
+    return import_string(path)()
+
+
+def stale_condition(cutoff):
+    """마지막 결제 시도(없으면 주문 생성) 시각이 cutoff 이전"""
+    return Q(last_payment_attempt_at__lt=cutoff) | Q(last_payment_attempt_at__isnull=True, created_at__lt=cutoff)
+
+
+def _net_cancel_half_open(order_ids, gateway, counts):
+    """열린 결제를 망취소하고, 실패한 주문 id 집합을 돌려준다."""
+    failed = set()
+    half_open = Payment.objects.filter(order_id__in=order_ids, status__in=HALF_OPEN_STATUSES).select_related('auth_response')
+    for payment in half_open:
+        result = gateway.net_cancel(payment)
+        if result == NOTHING_TO_CANCEL:
+            # 취소된 거래가 없으므로 CANCEL_SUCCESS 가 아니라 인증 만료로 남긴다
+            payment.record_event('AUTH_FAILED', code=EXPIRED_CODE, message='결제 유효 시간 초과')
+            counts['payments_expired'] += 1
+        elif result:
+            payment.record_event('CANCEL_SUCCESS', code=EXPIRED_CODE, message='결제 미완료 주문 자동 망취소')
+            counts['net_cancelled'] += 1
+        else:
+            failed.add(payment.order_id)
+            counts['net_cancel_failed'] += 1
+    return failed
+
+
+def _expire_auth_requests(order_ids, now):
+    """인증 요청에서 멈춘 결제를 AUTH_FAILED 로. 이벤트 INSERT 1회 + UPDATE 1회"""
+    payment_ids = list(
+        Payment.objects.select_for_update().filter(order_id__in=order_ids, status='AUTH_REQUESTED').values_list('pk', flat=True)
+    )
+    if not payment_ids:
+        return 0
+    PaymentEvent.objects.bulk_create([
+        PaymentEvent(payment_id=payment_id, type='AUTH_FAILED', at=now, code=EXPIRED_CODE) for payment_id in payment_ids
+    ])
+    return Payment.objects.filter(pk__in=payment_ids).update(
+        status='AUTH_FAILED', auth_completed_at=now, last_failed_at=now,
+        error_code=EXPIRED_CODE, error_message='결제 유효 시간 초과', updated_at=now,
+    )
+
+
+def sweep_stale_orders(ttl=None, batch_size=None, gateway=None, dry_run=False, now=None):
+    """TTL 이 지난 결제 미완료 주문을 정리하고 건수(Counter)를 돌려준다."""
+    now = now or timezone.now()
+    ttl = ttl or timedelta(minutes=settings.STALE_ORDER_TTL_MINUTES)
+    batch_size = batch_size or settings.STALE_ORDER_BATCH_SIZE
+    cutoff = now - ttl
+    counts = Counter()
+    if not dry_run:
+        gateway = gateway or get_net_cancel_gateway()
+
+    for from_status, to_status in STALE_TRANSITIONS.items():
+        stale = Order.objects.filter(status=from_status).filter(stale_condition(cutoff))
+        last_pk = 0
+        while True:
+            order_ids = list(stale.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not order_ids:
+                break
+            last_pk = order_ids[-1]
+            if dry_run:
+                counts[to_status.lower()] += len(order_ids)
+                continue
+
+            # 망취소(외부 호출)는 트랜잭션 밖에서
+            skipped = _net_cancel_half_open(order_ids, gateway, counts)
+            order_ids = [pk for pk in order_ids if pk not in skipped]
+            if not order_ids:
+                continue
+            with transaction.atomic():
+                counts['payments_expired'] += _expire_auth_requests(order_ids, now)
+                # 그 사이 결제 콜백으로 상태가 바뀐 주문은 건드리지 않도록 상태 조건을 함께 건다
+                counts[to_status.lower()] += Order.objects.filter(pk__in=order_ids, status=from_status).update(
+                    status=to_status, updated_at=now,
+                )
+
+    logger.info(f"stale order sweep (cutoff={cutoff}, dry_run={dry_run}): {dict(counts)}")
+    return counts
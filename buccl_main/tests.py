@@ -1,10 +1,622 @@
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
+from django.utils import timezone
 from unittest.mock import patch, MagicMock
 import json
 import jwt
-from datetime import datetime
+import os
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
 
 from .views import PaymentResult, PrePaymentCheckView
-from .models import Order, Payment, PaymentDetail, PaymentCancel, Product, ProductType, Sport
-from buccl_user.models import User
+from .models import DailyBookings, DailySales, IdempotencyRecord, Order, Payment, PaymentAuthRequest, PaymentAuthResponse, PaymentEvent, PaymentNetCancelRequest, PaymentRawPayload, PaymentCancel, Product, ProductType, Sport, Location, ClassProduct, ClassReview, ReviewImage, CatalogEntry, TravelProduct
+from buccl_user.models import User, UserLevel
+from buccl_back import refcache
+from buccl_back.paginator import EstimatedCountPaginator
+from .fake_nicepay import FakeNicePay
+from .idempotency import idempotent, make_digest
+from .rollups import update_rollups
+from .sweeper import NicePayNetCancelGateway, sweep_stale_orders
+from .checkout import CheckoutError, validate_checkout, verify_quote
+from .geo import encode, neighbour_cells
+from .nicepay import CircuitBreaker, GatewayTimeout, GatewayUnavailable, NicePayError
+from buccl_lessons.models import LessonProduct, InstructorSchedule, Ticket, SessionReservation
+from buccl_user.serializers import CustomTokenObtainPairSerializer
+
+
+def login_with_token(client, user):
+    """API 기본 인증(JWTCookieAuthentication)용 access 쿠키를 설정한다."""
+    client.cookies["access"] = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+
+
+class CatalogSyncTest(TestCase):
+    def setUp(self):
+        self.class_type = ProductType.objects.create(name="클래스", code="CLASS")
+        self.class_product = ClassProduct.objects.create(
+            title="프리다이빙 입문", brand="buccl", original_price=100000, discount_price=80000,
+        )
+        self.product = Product.objects.create(
+            name="프리다이빙 입문", base_price=100000, product_type=self.class_type, class_product=self.class_product,
+        )
+
+    def test_entry_created_on_product_save(self):
+        entry = CatalogEntry.objects.get(product=self.product)
+        self.assertEqual(entry.product_type_code, "CLASS")
+        self.assertEqual(entry.display_price, 80000)
+        self.assertEqual(entry.discount_rate, 20)
+
+    def test_entry_follows_class_product_changes(self):
+        self.class_product.discount_price = None
+        self.class_product.save()
+        entry = CatalogEntry.objects.get(product=self.product)
+        self.assertEqual(entry.display_price, 100000)
+        self.assertEqual(entry.discount_rate, 0)
+
+    def test_entry_removed_with_product(self):
+        self.product.delete()
+        self.assertFalse(CatalogEntry.objects.exists())
+
+    def test_catalog_list_view(self):
+        response = self.client.get(reverse("buccl_main:catalog_list"), {"product_type": "class"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["product_id"] for row in response.json()["results"]], [self.product.pk])
+
+
+class ImportCatalogTest(TestCase):
+    def setUp(self):
+        ProductType.objects.create(name="클래스", code="CLASS")
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            f.write("product_type,name,base_price,brand,original_price,discount_price\n")
+            f.write("CLASS,입문,,buccl,100000,80000\n")
+            f.write("CLASS,고급,,buccl,abc,\n")
+            f.write("FOO,알수없음,1000,,,\n")
+        self.addCleanup(os.remove, self.path)
+
+    def test_import_creates_valid_rows_and_reports_errors(self):
+        call_command("import_catalog", self.path, stdout=StringIO(), stderr=StringIO())
+
+        product = Product.objects.get()
+        self.assertEqual(product.base_price, 100000)
+        self.assertEqual(product.class_product.discount_rate, 20)
+        self.assertEqual(CatalogEntry.objects.get().display_price, 80000)
+
+    def test_jsonl_non_object_lines_are_row_errors(self):
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            f.write('["CLASS", "목록"]\n"문자열"\n')
+            f.write(json.dumps({"product_type": "CLASS", "name": "입문", "brand": "buccl", "original_price": 50000}, ensure_ascii=False) + "\n")
+        self.addCleanup(os.remove, path)
+        err = StringIO()
+        call_command("import_catalog", path, stdout=StringIO(), stderr=err)
+        self.assertEqual(Product.objects.get().name, "입문")
+        self.assertEqual(err.getvalue().count("JSON 객체가 아닙니다."), 2)
+
+
+class AdminChangelistQueryTest(TestCase):
+    """changelist 쿼리 수는 행 수와 무관해야 한다."""
+    CHANGELISTS = [
+        "admin:buccl_main_order_changelist",
+        "admin:buccl_main_payment_changelist",
+        "admin:buccl_main_product_changelist",
+        "admin:buccl_main_classproduct_changelist",
+        "admin:buccl_main_classreview_changelist",
+        "admin:buccl_lessons_ticket_changelist",
+        "admin:buccl_lessons_sessionreservation_changelist",
+        "admin:buccl_user_user_changelist",
+        "admin:buccl_user_certificateupload_changelist",
+    ]
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(user_id="admin", hp="01000000000", password="pw", name="관리자", is_staff=True)
+        self.client.force_login(self.admin)
+        sport = Sport.objects.create(name="프리다이빙")
+        location = Location.objects.create(name="딥스테이션", address="용인", latitude=0, longitude=0)
+        self.class_type = ProductType.objects.create(name="클래스", code="CLASS")
+        self.lesson_product = LessonProduct.objects.create(sport=sport, title="레슨", sessions_count=5, price=300000)
+        self.schedule_kwargs = {
+            "lesson_product": self.lesson_product, "instructor": self.admin, "location": location,
+            "start_time": "10:00", "end_time": "12:00", "capacity": 10,
+        }
+        self.rows = 0
+        self.add_rows(1)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.rows += 1
+            n = self.rows
+            user = User.objects.create_user(user_id=f"user{n}", password="pw", hp=f"0101111{n:04d}", auth=None, name=f"회원{n}")
+            class_product = ClassProduct.objects.create(title=f"클래스{n}", brand="buccl", original_price=10000)
+            product = Product.objects.create(name=f"상품{n}", base_price=10000, product_type=self.class_type, class_product=class_product)
+            order = Order.objects.create(user=user, product=product, product_type="CLASS", total_amount=10000)
+            Payment.objects.create(order=order, amount=10000, status="AUTH_REQUESTED", moid=f"moid{n}")
+            review = ClassReview.objects.create(user=user, product=class_product, rating=5, content="좋아요")
+            ReviewImage.objects.create(review=review, image="reviews/a.jpg")
+            ticket = Ticket.objects.create(user=user, lesson_product=self.lesson_product, sessions_total=5)
+            schedule = InstructorSchedule.objects.create(date=f"2026-01-{n:02d}", **self.schedule_kwargs)
+            SessionReservation.objects.create(ticket=ticket, schedule=schedule)
+            user.certificates.create(certificate_name="자격증", certificate_file="certificates/a.pdf")
+
+    def test_query_count_does_not_grow_with_rows(self):
+        before = {}
+        for name in self.CHANGELISTS:
+            # 첫 요청은 ContentType 등 캐시 적재 쿼리가 섞이므로 한 번 먼저 호출
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200, name)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(name))
+            before[name] = len(queries)
+
+        self.add_rows(4)
+        for name in self.CHANGELISTS:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(name))
+            self.assertEqual(len(queries), before[name], name)
+
+    def test_estimated_count_used_only_for_unfiltered_large_tables(self):
+        with patch("buccl_back.paginator.estimated_row_count", return_value=5000000):
+            with self.settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000000):
+                self.assertEqual(EstimatedCountPaginator(Order.objects.all(), 100).count, 5000000)
+                self.assertEqual(EstimatedCountPaginator(Order.objects.filter(status="PENDING"), 100).count, 1)
+            with self.settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=10000000):
+                self.assertEqual(EstimatedCountPaginator(Order.objects.all(), 100).count, 1)
+
+
+class PaymentAttemptNumberTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        self.order = Order.objects.create(user=user, product_type="CLASS", total_amount=10000)
+
+    def test_attempt_numbers_are_sequential_per_order(self):
+        payments = [
+            Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid=f"moid-{i}")
+            for i in range(3)
+        ]
+        self.assertEqual([p.attempt_number for p in payments], [1, 2, 3])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_attempt_count, 3)
+        self.assertIsNotNone(self.order.last_payment_attempt_at)
+
+        # 번호를 직접 지정해도 이후 자동 채번과 겹치지 않는다
+        Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid="moid-5", attempt_number=5)
+        payment = Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid="moid-6")
+        self.assertEqual(payment.attempt_number, 6)
+
+    def test_allocation_does_not_scan_existing_payments(self):
+        Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid="moid-0")
+        with CaptureQueriesContext(connection) as queries:
+            Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid="moid-1")
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+
+
+class PaymentEventTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        self.order = Order.objects.create(user=user, product_type="CLASS", total_amount=10000)
+
+    def test_record_event_appends_and_projects_status(self):
+        payment = Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid="moid-0")
+        with CaptureQueriesContext(connection) as queries:
+            payment.record_event("CAPTURE_REQUESTED", at=timezone.now() - timedelta(minutes=10))
+        writes = [q["sql"] for q in queries if q["sql"].startswith(("INSERT", "UPDATE"))]
+        self.assertEqual(len(writes), 2)
+        self.assertNotIn("payment_method_details", writes[1])
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "CAPTURE_REQUESTED")
+        self.assertIsNotNone(payment.capture_requested_at)
+        stuck = PaymentEvent.objects.stuck("CAPTURE_REQUESTED", older_than=timedelta(minutes=5))
+        self.assertEqual([event.payment_id for event in stuck], [payment.pk])
+
+        payment.record_event("CAPTURE_SUCCESS", code="3001")
+        self.assertFalse(PaymentEvent.objects.stuck("CAPTURE_REQUESTED", older_than=timedelta(minutes=5)).exists())
+
+    def test_stuck_includes_old_events_unless_windowed(self):
+        payment = Payment.objects.create(order=self.order, amount=10000, status="AUTH_REQUESTED", moid="moid-0")
+        payment.record_event("CAPTURE_REQUESTED", at=timezone.now() - timedelta(days=3))
+        self.assertTrue(PaymentEvent.objects.stuck("CAPTURE_REQUESTED", older_than=timedelta(minutes=5)).exists())
+        self.assertFalse(
+            PaymentEvent.objects.stuck("CAPTURE_REQUESTED", older_than=timedelta(minutes=5), window=timedelta(days=1)).exists()
+        )
+
+
+class PaymentRawPayloadTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        order = Order.objects.create(user=user, product_type="CLASS", total_amount=10000)
+        self.payment = Payment.save_payment_data(order, {"Moid": "ORDER-RAW", "Amt": "10000", "PayMethod": "CARD"})
+
+    def test_raw_data_is_compressed_and_loaded_only_on_access(self):
+        raw = {"Moid": "ORDER-RAW", "GoodsName": "서핑 클래스", "ReqReserved": "x" * 4000}
+        PaymentAuthRequest.objects.create(payment=self.payment, amt=10000, mid="nicepay00m", moid="ORDER-RAW", pay_method="CARD", raw_data=raw)
+        stored = PaymentRawPayload.objects.get(source="auth_request")
+        self.assertLess(len(stored.data), stored.size)
+
+        with CaptureQueriesContext(connection) as queries:
+            auth_request = PaymentAuthRequest.objects.get(payment=self.payment)
+        self.assertNotIn("buyer_info", queries[0]["sql"])
+        with self.assertNumQueries(1):
+            self.assertEqual(auth_request.raw_data, raw)
+            self.assertEqual(auth_request.raw_data["GoodsName"], "서핑 클래스")
+
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).raw_data["Moid"], "ORDER-RAW")
+        # 결제는 남기고 원래 행만 지워도 원본 전문이 남지 않는다
+        PaymentNetCancelRequest.objects.create(payment=self.payment, raw_data={"TID": "t"}).delete()
+        auth_request.delete()
+        self.assertEqual(list(PaymentRawPayload.objects.values_list("source", flat=True)), ["payment"])
+        self.payment.delete()
+        self.assertFalse(PaymentRawPayload.objects.exists())
+
+
+class NicePayClientTest(TestCase):
+    def setUp(self):
+        self.fake = FakeNicePay().start()
+        self.addCleanup(self.fake.stop)
+
+    def test_capture_and_cancel_reuse_connection(self):
+        client = self.fake.client()
+        for i in range(3):
+            auth = self.fake.authorize(moid=f"ORDER-{i}", amt=10000)
+            self.assertTrue(client.verify_auth_signature(auth["AuthToken"], 10000, auth["Signature"]))
+            captured = client.capture(auth["TxTid"], auth["AuthToken"], 10000, auth["NextAppURL"], auth["NetCancelURL"])
+            self.assertTrue(captured.ok, captured.data)
+            cancelled = client.cancel(auth["TxTid"], auth["Moid"], 4000, "부분 취소", partial=True)
+            self.assertEqual(cancelled.data["RemainAmt"], "6000")
+        self.assertEqual(self.fake.connections, 1)
+        self.assertEqual(client.stats.snapshot()["capture"]["count"], 3)
+
+    def test_capture_timeout_sends_net_cancel(self):
+        self.fake.delays["/approve"] = 0.5
+        client = self.fake.client(read_timeout=0.1)
+        auth = self.fake.authorize(moid="ORDER-1", amt=10000)
+        with self.assertRaises(GatewayTimeout) as ctx:
+            client.capture(auth["TxTid"], auth["AuthToken"], 10000, auth["NextAppURL"], auth["NetCancelURL"])
+        self.assertTrue(ctx.exception.net_cancel_response.ok)
+        self.assertEqual(self.fake.transactions[auth["TxTid"]]["status"], "NET_CANCELLED")
+
+    def test_rejects_unknown_host_and_opens_breaker(self):
+        client = self.fake.client()
+        with self.assertRaises(NicePayError):
+            client.capture("tid", "token", 1000, "http://evil.example.com/approve")
+
+        now = [0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        breaker.record_failure()
+        client = self.fake.client(breaker=breaker)
+        with self.assertRaises(GatewayUnavailable):
+            client.cancel("tid", "moid", 1000, "취소")
+        now[0] = 11
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+
+class PaymentCallbackIdempotencyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("buccl_main:payment_result")
+        self.callback = {"AuthResultCode": "0000", "Moid": "ORDER-1", "TxTid": "nicepay00m01abc", "Amt": "10000"}
+
+    def test_replayed_callback_returns_stored_response_from_cache(self):
+        first = self.client.post(self.url, self.callback)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(IdempotencyRecord.objects.count(), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            replay = self.client.post(self.url, self.callback)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.json(), first.json())
+
+    def test_falls_back_to_db_and_blocks_in_flight_duplicates(self):
+        self.client.post(self.url, self.callback)
+        cache.clear()
+        self.assertEqual(self.client.post(self.url, self.callback)["Idempotent-Replayed"], "true")
+
+        other = dict(self.callback, TxTid="nicepay00m01def")
+        digest = make_digest("payment_result", "callback:ORDER-1:nicepay00m01def:0000")
+        cache.add(f"idempotency-lock:{digest}", 1)
+        self.assertEqual(self.client.post(self.url, other).status_code, 409)
+
+    def test_only_successful_responses_are_stored(self):
+        results = [status.HTTP_400_BAD_REQUEST, status.HTTP_200_OK]
+
+        class CallbackView(APIView):
+            @idempotent("test_callback")
+            def post(self, request):
+                return Response({"status": results[0]}, status=results.pop(0))
+
+        view = CallbackView.as_view()
+        # 검증에 실패한 요청은 키를 선점하지 않는다
+        self.assertEqual(view(APIRequestFactory().post("/", self.callback)).status_code, 400)
+        self.assertEqual(view(APIRequestFactory().post("/", self.callback)).status_code, 200)
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, 200)
+
+    def test_header_key_is_per_user_and_bound_to_body(self):
+        buyer = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        self.client.post(self.url, {"Amt": "10000"}, HTTP_IDEMPOTENCY_KEY="k1")
+        # 같은 키로 본문이 다르면 거절
+        response = self.client.post(self.url, {"Amt": "20000"}, HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual((response.status_code, response.json()["code"]), (422, "1013"))
+        # 다른 사용자는 같은 키를 써도 남의 응답을 받지 않는다
+        login_with_token(self.client, buyer)
+        response = self.client.post(self.url, {"Amt": "20000"}, HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+
+class RollupTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(user_id="admin", hp="01000000000", password="pw", name="관리자")
+        self.instructor = User.objects.create_user(user_id="coach", password="pw", hp="01022223333", auth=None, name="강사")
+        self.buyer = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        self.location = Location.objects.create(name="딥스테이션", address="용인")
+        self.lesson_product = LessonProduct.objects.create(sport=Sport.objects.create(name="프리다이빙"), title="레슨", sessions_count=5, price=300000)
+
+    def test_sales_rollup_is_incremental_and_idempotent(self):
+        order = Order.objects.create(user=self.buyer, product_type="CLASS", total_amount=10000)
+        payment = Payment.objects.create(order=order, amount=10000, status="CAPTURE_REQUESTED", moid="ORDER-1")
+        payment.record_event("CAPTURE_SUCCESS", code="3001")
+        payment.record_event("CAPTURE_SUCCESS", code="3001")  # 중복 승인 콜백
+        self.assertEqual(update_rollups(), {"daily_sales": 1, "daily_bookings": 0})
+
+        PaymentCancel.objects.create(payment=payment, cancel_amount=4000, reason="부분 취소", is_partial_cancel=True,
+                                     status="CANCEL_SUCCESS", completed_at=timezone.now())
+        update_rollups(names=["daily_sales"])
+        update_rollups(names=["daily_sales"])
+        row = DailySales.objects.get()
+        self.assertEqual((row.product_type, row.payment_count, row.gross_amount, row.cancel_count, row.net_amount), ("CLASS", 1, 10000, 1, 6000))
+
+    def test_bookings_rollup_and_report_read_only_rollup_tables(self):
+        schedule = InstructorSchedule.objects.create(
+            lesson_product=self.lesson_product, instructor=self.instructor, location=self.location,
+            date=timezone.now().date(), start_time="10:00", end_time="12:00", capacity=4,
+        )
+        for n, waiting in enumerate([False, False, True]):
+            user = User.objects.create_user(user_id=f"member{n}", password="pw", hp=f"0103333{n:04d}", auth=None, name=f"회원{n}")
+            ticket = Ticket.objects.create(user=user, lesson_product=self.lesson_product, sessions_total=5)
+            SessionReservation.objects.create(ticket=ticket, schedule=schedule, is_waiting=waiting)
+        update_rollups()
+        row = DailyBookings.objects.get()
+        self.assertEqual((row.capacity, row.booked_count, row.waiting_count, row.fill_rate), (4, 2, 1, 0.5))
+
+        url = reverse("buccl_main:report_daily_bookings")
+        login_with_token(self.client, self.instructor)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        login_with_token(self.client, self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"location": self.location.pk})
+        self.assertEqual(response.json()["totals"]["fill_rate"], 0.5)
+        self.assertFalse(any("buccl_lessons_" in q["sql"] for q in queries))
+
+
+class MyOrderListTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        product_type = ProductType.objects.create(name="일반 상품", code="PRODUCT")
+        self.product = Product.objects.create(name="서핑 클래스", base_price=10000, product_type=product_type)
+        self.url = reverse("buccl_main:my_orders")
+        login_with_token(self.client, self.user)
+
+    def add_orders(self, count):
+        for n in range(count):
+            order = Order.objects.create(user=self.user, product=self.product, product_type="PRODUCT", total_amount=10000)
+            for attempt_status in ("CAPTURE_FAILED", "CAPTURE_SUCCESS"):
+                payment = Payment.objects.create(order=order, amount=10000, status=attempt_status, moid=f"{order.pk}-{attempt_status}")
+        PaymentCancel.objects.create(payment=payment, cancel_amount=4000, reason="부분 취소", status="CANCEL_SUCCESS")
+        return order
+
+    def test_latest_payment_keyset_pages_and_constant_queries(self):
+        newest = self.add_orders(3)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as small:
+            first = self.client.get(self.url, {"page_size": 2}).json()
+        self.assertEqual(first["results"][0]["id"], newest.pk)
+        self.assertEqual(first["results"][0]["product_name"], "서핑 클래스")
+        self.assertEqual(first["results"][0]["latest_payment"]["attempt_number"], 2)
+        self.assertEqual(first["results"][0]["latest_payment"]["status"], "CAPTURE_SUCCESS")
+        self.assertEqual(first["results"][0]["cancellation_status"], "PARTIAL")
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(len(second["results"]), 1)
+        self.assertIsNone(second["next"])
+        ids = [row["id"] for row in first["results"] + second["results"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+        self.add_orders(20)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url, {"page_size": 20})
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(self.client.get(self.url, {"cursor": "broken"}).status_code, 404)
+
+
+class StaleOrderSweepTest(TestCase):
+    def setUp(self):
+        self.fake = FakeNicePay().start()
+        self.addCleanup(self.fake.stop)
+        self.user = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        self.old = timezone.now() - timedelta(hours=3)
+
+    def make_order(self, status, payment_status=None):
+        order = Order.objects.create(user=self.user, product_type="CLASS", total_amount=10000, status=status)
+        if payment_status:
+            payment = Payment.objects.create(order=order, amount=10000, status=payment_status, moid=f"ORDER-{order.pk}")
+            if payment_status == "AUTH_SUCCESS":
+                auth = self.fake.authorize(moid=payment.moid, amt=10000)
+                PaymentAuthResponse.objects.create(
+                    payment=payment, result_code="0000", auth_token=auth["AuthToken"], amt=10000,
+                    tx_tid=auth["TxTid"], net_cancel_url=auth["NetCancelURL"],
+                )
+        Order.objects.filter(pk=order.pk).update(created_at=self.old, last_payment_attempt_at=self.old if payment_status else None)
+        return order
+
+    def test_sweep_closes_abandoned_orders_and_net_cancels_open_payments(self):
+        pending = self.make_order("PENDING")
+        attempted = self.make_order("PAYMENT_ATTEMPTED", "AUTH_REQUESTED")
+        processing = self.make_order("PAYMENT_PROCESSING", "AUTH_SUCCESS")
+        fresh = Order.objects.create(user=self.user, product_type="CLASS", total_amount=10000)
+
+        counts = sweep_stale_orders(gateway=NicePayNetCancelGateway(self.fake.client()), batch_size=1)
+        self.assertEqual(counts, {"cancelled": 1, "payment_failed": 2, "payments_expired": 1, "net_cancelled": 1})
+        statuses = dict(Order.objects.values_list("pk", "status"))
+        self.assertEqual(
+            [statuses[o.pk] for o in (pending, attempted, processing, fresh)],
+            ["CANCELLED", "PAYMENT_FAILED", "PAYMENT_FAILED", "PENDING"],
+        )
+        self.assertEqual(attempted.payments.get().events.last().code, "EXPIRED")
+        self.assertEqual(processing.payments.get().status, "CANCEL_SUCCESS")
+        self.assertEqual(list(self.fake.transactions.values())[0]["status"], "NET_CANCELLED")
+
+    def test_failed_net_cancel_defers_order_to_next_run(self):
+        processing = self.make_order("PAYMENT_PROCESSING", "AUTH_SUCCESS")
+        rejecting_gateway = MagicMock()
+        rejecting_gateway.net_cancel.return_value = False
+        counts = sweep_stale_orders(gateway=rejecting_gateway)
+        self.assertEqual(counts, {"net_cancel_failed": 1})
+        processing.refresh_from_db()
+        self.assertEqual(processing.status, "PAYMENT_PROCESSING")
+
+    def test_payment_without_auth_response_is_expired_not_cancelled(self):
+        processing = self.make_order("PAYMENT_PROCESSING", "CAPTURE_REQUESTED")
+        counts = sweep_stale_orders(gateway=NicePayNetCancelGateway(self.fake.client()))
+        self.assertEqual(counts, {"payment_failed": 1, "payments_expired": 1})
+        payment = processing.payments.get()
+        self.assertEqual((payment.status, payment.error_code), ("AUTH_FAILED", "EXPIRED"))
+        self.assertFalse(self.fake.transactions)
+
+
+class PrePaymentCheckTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(user_id="buyer", password="pw", hp="01012345678", auth=None, name="구매자")
+        self.class_product = ClassProduct.objects.create(title="서핑", brand="buccl", original_price=50000, discount_price=40000)
+        self.class_item = Product.objects.create(
+            name="서핑 클래스", base_price=50000, class_product=self.class_product,
+            product_type=ProductType.objects.create(name="클래스", code="CLASS"),
+        )
+        travel = TravelProduct.objects.create(
+            name="발리 서핑 트립", start_date=timezone.now().date() + timedelta(days=30), end_date=timezone.now().date() + timedelta(days=35),
+            location="발리", guide="가이드", requirements="", max_participants=2, detailed_content="", price=1000000,
+        )
+        self.travel_item = Product.objects.create(
+            name="발리 서핑 트립", base_price=1000000, travel_product=travel,
+            product_type=ProductType.objects.create(name="여행", code="TRAVEL"),
+        )
+        Order.objects.create(user=self.user, product=self.travel_item, product_type="TRAVEL", total_amount=1000000, status="CONFIRMED")
+
+    def test_cached_validation_query_budget_and_price_change(self):
+        with self.assertNumQueries(1):
+            quote = validate_checkout(self.user, {"product_id": self.class_item.pk, "quantity": 2, "amount": 80000})
+        with self.assertNumQueries(0):
+            validate_checkout(self.user, {"product_id": self.class_item.pk})
+        self.assertEqual(verify_quote(quote["quote"], self.user, amount=80000)["quantity"], 2)
+        with self.assertRaises(CheckoutError):
+            verify_quote(quote["quote"], self.user, amount=70000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.class_product.discount_price = 35000
+            self.class_product.save()
+        with self.assertRaises(CheckoutError) as raised:
+            validate_checkout(self.user, {"product_id": self.class_item.pk, "amount": 40000})
+        self.assertEqual(raised.exception.extra["unit_price"], 35000)
+
+    def test_travel_view_checks_remaining_capacity(self):
+        url = reverse("buccl_main:pre_payment_check_travel")
+        self.assertEqual(self.client.post(url, {"product_id": self.travel_item.pk}).status_code, 401)
+        login_with_token(self.client, self.user)
+        self.assertEqual(self.client.post(url, {"product_id": self.class_item.pk}).status_code, 404)
+
+        validate_checkout(self.user, {"product_id": self.travel_item.pk})
+        with self.assertNumQueries(1):
+            validate_checkout(self.user, {"product_id": self.travel_item.pk})
+        sold_out = self.client.post(url, {"product_id": self.travel_item.pk, "quantity": 2})
+        self.assertEqual((sold_out.status_code, sold_out.json()["code"], sold_out.json()["remaining"]), (409, "1010", 1))
+        ok = self.client.post(url, {"product_id": self.travel_item.pk, "quantity": 1, "amount": 1000000}).json()
+        self.assertTrue(ok["valid"])
+        self.assertEqual(ok["remaining"], 1)
+
+
+class NearbyLocationTest(TestCase):
+    def setUp(self):
+        self.surf = Sport.objects.create(name="서핑")
+        self.gangnam = Location.objects.create(name="강남 풀", category="POOL", latitude=37.4979, longitude=127.0276)
+        self.gangnam.sports.add(self.surf)
+        self.hongdae = Location.objects.create(name="홍대 풀", category="POOL", latitude=37.5563, longitude=126.9220)
+        self.busan = Location.objects.create(name="송정 해변", category="BEACH", latitude=35.1787, longitude=129.1997)
+        self.busan.sports.add(self.surf)
+        Location.objects.create(name="좌표 없음", category="POOL")
+
+    def test_geohash(self):
+        self.assertEqual(encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(len(neighbour_cells(37.5, 127.0, 5)), 9)
+        self.busan.latitude, self.busan.longitude = 37.5, 127.0
+        self.busan.save(update_fields=["latitude", "longitude"])
+        self.assertEqual(Location.objects.get(pk=self.busan.pk).geohash, encode(37.5, 127.0))
+
+        Location.objects.update(geohash=None)
+        call_command("update_location_geohash", stdout=StringIO())
+        self.assertEqual(Location.objects.filter(geohash__isnull=False).count(), 3)
+
+    def test_nearest_locations(self):
+        url = reverse("buccl_main:nearby_locations")
+        data = self.client.get(url, {"lat": 37.50, "lng": 127.03, "k": 2}).json()
+        self.assertEqual([row["name"] for row in data], ["강남 풀", "홍대 풀"])
+        self.assertLess(data[0]["distance_km"], 1)
+
+        data = self.client.get(url, {"lat": 37.50, "lng": 127.03, "k": 5}).json()
+        self.assertEqual([row["name"] for row in data], ["강남 풀", "홍대 풀", "송정 해변"])
+        self.assertEqual(len(self.client.get(url, {"lat": 37.50, "lng": 127.03, "k": 5, "radius": 20}).json()), 2)
+
+        data = self.client.get(url, {"lat": 37.50, "lng": 127.03, "sport": self.surf.pk, "category": "BEACH"}).json()
+        self.assertEqual([row["name"] for row in data], ["송정 해변"])
+        self.assertEqual(self.client.get(url, {"lat": 137, "lng": 127}).status_code, 400)
+
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        refcache._tables.clear()
+        refcache._pending().clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sport = Sport.objects.create(name="서핑")
+            UserLevel.objects.create(level=1, name="입문", sport=self.sport)
+
+    def test_rows_are_served_from_worker_memory(self):
+        url = reverse("buccl_user:user_level")
+        self.assertEqual(self.client.get(url).json()[0]["sport_id"], self.sport.pk)
+        refcache.get("buccl_main.Sport", self.sport.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()[0]["name"], "입문")
+            self.assertEqual(refcache.value("buccl_main.Sport", self.sport.pk, "name"), "서핑")
+
+    def test_version_bump_invalidates(self):
+        refcache.get("buccl_main.Sport", self.sport.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sport.name = "윈드서핑"
+            self.sport.save()
+        self.assertEqual(refcache.value("buccl_main.Sport", self.sport.pk, "name"), "윈드서핑")
+
+        # 다른 워커의 변경: 공유 버전만 올라가고, 확인 주기가 지나면 다시 읽는다
+        Sport.objects.filter(pk=self.sport.pk).update(name="카이트서핑")
+        cache.incr(refcache.version_key("buccl_main.Sport"))
+        self.assertEqual(refcache.value("buccl_main.Sport", self.sport.pk, "name"), "윈드서핑")
+        refcache._tables["buccl_main.Sport"]["checked_at"] = 0
+        self.assertEqual(refcache.value("buccl_main.Sport", self.sport.pk, "name"), "카이트서핑")
+
+    def test_rolled_back_change_is_not_cached(self):
+        refcache.get("buccl_main.Sport", self.sport.pk)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Sport.objects.filter(pk=self.sport.pk).update(name="취소될 이름")
+            Sport.objects.get(pk=self.sport.pk).save()
+            # 트랜잭션 안에서는 바뀐 행을 본다
+            self.assertEqual(refcache.value("buccl_main.Sport", self.sport.pk, "name"), "취소될 이름")
+            raise RuntimeError
+        self.assertEqual(refcache.value("buccl_main.Sport", self.sport.pk, "name"), "서핑")
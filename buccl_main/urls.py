@@ -4,6 +4,7 @@ from .views import (
     PaymentResult, 
     PaymentRetryAli, 
     PrePaymentCheckView,
+    MyOrderListView,
     SaveTravelProductView,
     TravelProductListView,
     TravelProductDetailView,
@@ -15,6 +16,10 @@ from .views import (
     UserReviewsView,
     ReviewCreateView,
     ReviewDetailView,
+    CatalogListView,
+    NearbyLocationListView,
+    DailySalesReportView,
+    DailyBookingsReportView,
 )
 from django.conf import settings
 from django.conf.urls.static import static
@@ -27,6 +32,19 @@ urlpatterns = [
     path("api/v1/payment-retry-ali/", PaymentRetryAli.as_view(), name="payment_retry_ali"),
     path("api/v1/payment-validation/", PrePaymentCheckView.as_view(), name="payment_validation"),
     
+    # 내 주문 내역
+    path("api/v1/orders/my/", MyOrderListView.as_view(), name="my_orders"),
+    
+    # 통합 상품 카탈로그
+    path("api/v1/catalog/", CatalogListView.as_view(), name="catalog_list"),
+    
+    # 가까운 장소 검색
+    path("api/v1/locations/nearby/", NearbyLocationListView.as_view(), name="nearby_locations"),
+    
+    # 운영 리포트 (집계 테이블 조회, buccl_main.rollups)
+    path("api/v1/reports/daily-sales/", DailySalesReportView.as_view(), name="report_daily_sales"),
+    path("api/v1/reports/daily-bookings/", DailyBookingsReportView.as_view(), name="report_daily_bookings"),
+    
     # 이미지 업로드
     path("api/v1/upload-image/", ImageUploadView.as_view(), name="upload_image"),
     
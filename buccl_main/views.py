@@ -1,9 +1,22 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import permissions, status
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404
-from .models import ClassProduct, ClassReview, TravelProduct
-from .serializers import ClassReviewSerializer, TravelProductSerializer
+from django.conf import settings
+from django.db.models import OuterRef, Prefetch, Q, Subquery, Sum, prefetch_related_objects
+from django.utils import timezone
+from datetime import date, timedelta
+from buccl_back.pagination import KeysetPagination
+from buccl_back.permissions import IsAdministrator
+from .models import ClassProduct, ClassReview, TravelProduct, CatalogEntry, DailySales, DailyBookings, Location, Order, Payment
+from .serializers import (
+    ClassReviewSerializer, TravelProductSerializer, CatalogEntrySerializer,
+    DailySalesSerializer, DailyBookingsSerializer, MyOrderSerializer, NearbyLocationSerializer,
+)
+from .idempotency import idempotent
+from .checkout import CheckoutError, validate_checkout
+from .geo import nearest_locations
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 import uuid
@@ -37,6 +50,7 @@ class ImageUploadView(APIView):
 
 class PaymentResult(APIView):
     """결제 결과 처리 API"""
+    @idempotent('payment_result')
     def post(self, request):
         # TODO: 실제 결제 처리 로직 구현
         return Response({"message": "Payment result received"}, status=status.HTTP_200_OK)
@@ -44,16 +58,60 @@ class PaymentResult(APIView):
 
 class PaymentRetryAli(APIView):
     """결제 재시도 API"""
+    @idempotent('payment_retry')
     def post(self, request):
         # TODO: 실제 결제 재시도 로직 구현
         return Response({"message": "Payment retry initiated"}, status=status.HTTP_200_OK)
 
 
+class MyOrderListView(APIView):
+    """
+    내 주문 내역 (최신순). 주문별 마지막 결제 상태, 상품명, 취소 상태를 함께 돌려준다.
+    (user, -created_at, -id) 인덱스로 keyset 페이지네이션하고, 결제는 주문별 마지막 시도 1건만 읽는다.
+    query params: status, page_size, cursor
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        latest_payment = Payment.objects.filter(order=OuterRef('pk')).order_by('-attempt_number').values('pk')[:1]
+        orders = (
+            Order.objects.filter(user=request.user)
+            .select_related('product')
+            .only('id', 'product_id', 'product__name', 'product_type', 'quantity', 'total_amount', 'status', 'created_at')
+            .annotate(latest_payment_id=Subquery(latest_payment))
+        )
+        order_status = request.query_params.get('status')
+        if order_status:
+            orders = orders.filter(status=order_status.upper())
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+
+        payment_ids = [order.latest_payment_id for order in page if order.latest_payment_id]
+        payments = (
+            Payment.objects.filter(pk__in=payment_ids)
+            .only('id', 'order_id', 'attempt_number', 'status', 'amount', 'payment_method_type', 'capture_completed_at')
+            .annotate(cancelled_amount=Sum('cancellations__cancel_amount', filter=Q(cancellations__status='CANCEL_SUCCESS')))
+        )
+        prefetch_related_objects(page, Prefetch('payments', queryset=payments, to_attr='latest_payments'))
+        return paginator.get_paginated_response(MyOrderSerializer(page, many=True).data)
+
+
 class PrePaymentCheckView(APIView):
-    """결제 전 검증 API"""
+    """
+    결제 전 검증 API (buccl_main.checkout)
+    body: product_id, quantity(기본 1), amount(결제할 금액, 선택)
+    현재 판매가/남은 정원을 확인하고, 승인 단계에서 확인할 서명된 가격 견적(quote)을 돌려준다.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    product_type = None
+
     def post(self, request):
-        # TODO: 실제 결제 전 검증 로직 구현
-        return Response({"valid": True}, status=status.HTTP_200_OK)
+        try:
+            quote = validate_checkout(request.user, request.data, product_type=self.product_type)
+        except CheckoutError as e:
+            return Response(e.as_response_data(), status=e.http_status)
+        return Response(quote, status=status.HTTP_200_OK)
 
 
 # Travel Product Views (view_groups가 없으므로 여기에 직접 구현)
@@ -110,11 +168,9 @@ class DeleteTravelProductView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class PrePaymentCheckTravelView(APIView):
-    """여행 상품 결제 전 검증"""
-    def post(self, request):
-        # TODO: 실제 여행 상품 결제 전 검증 로직 구현
-        return Response({"valid": True}, status=status.HTTP_200_OK)
+class PrePaymentCheckTravelView(PrePaymentCheckView):
+    """여행 상품 결제 전 검증 (출발일, 남은 정원 포함)"""
+    product_type = 'TRAVEL'
 
 
 # Review Views
@@ -166,4 +222,147 @@ class ReviewDetailView(APIView):
     def get(self, request, review_id):
         review = get_object_or_404(ClassReview, pk=review_id)
         serializer = ClassReviewSerializer(review)
-        return Response(serializer.data) 
\ No newline at end of file
+        return Response(serializer.data)
+
+
+# Catalog Views
+class CatalogCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-product_id'
+
+
+class CatalogListView(APIView):
+    """
+    통합 상품 카탈로그 목록
+    CatalogEntry 단일 테이블만 조회하며 cursor 기반 페이지네이션을 사용한다.
+    query params: product_type(CLASS/TRAVEL/LESSON...), sport, min_price, max_price, page_size, cursor
+    """
+    def get(self, request):
+        queryset = CatalogEntry.objects.filter(is_available=True).filter(
+            Q(available_until__isnull=True) | Q(available_until__gte=timezone.now().date())
+        )
+
+        product_type = request.query_params.get('product_type')
+        if product_type:
+            queryset = queryset.filter(product_type_code=product_type.upper())
+
+        try:
+            sport_id = request.query_params.get('sport')
+            if sport_id:
+                queryset = queryset.filter(sport_id=int(sport_id))
+            min_price = request.query_params.get('min_price')
+            if min_price:
+                queryset = queryset.filter(display_price__gte=int(min_price))
+            max_price = request.query_params.get('max_price')
+            if max_price:
+                queryset = queryset.filter(display_price__lte=int(max_price))
+        except ValueError:
+            return Response(
+                {"error": "sport, min_price, max_price must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        paginator = CatalogCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = CatalogEntrySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class NearbyLocationListView(APIView):
+    """
+    가까운 장소 목록 (거리순)
+    query params: lat, lng (필수), k(기본 10), radius(km, 없으면 자동 확장), sport(id, 쉼표 구분), category
+    """
+    def get(self, request):
+        params = request.query_params
+        try:
+            latitude, longitude = float(params['lat']), float(params['lng'])
+            k = int(params.get('k', 10))
+            radius_km = float(params['radius']) if params.get('radius') else None
+            sport_ids = [int(sport_id) for sport_id in params['sport'].split(',')] if params.get('sport') else None
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or k < 1 or (radius_km is not None and radius_km <= 0):
+                raise ValueError
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "lat, lng are required numbers, k and sport must be positive integers and radius must be positive"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        locations = nearest_locations(
+            Location.objects.prefetch_related('sports'), latitude, longitude,
+            k=min(k, settings.NEARBY_MAX_RESULTS), radius_km=radius_km, sport_ids=sport_ids, category=params.get('category'),
+        )
+        return Response(NearbyLocationSerializer(locations, many=True).data)
+
+
+def parse_report_filters(request, int_params):
+    """
+    리포트 공통 query params: start, end (YYYY-MM-DD, 기본 최근 30일) + 정수 필터.
+    (필터 dict, None) 또는 (None, 오류 Response) 반환
+    """
+    try:
+        end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else timezone.now().date()
+        start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else end - timedelta(days=29)
+        filters = {'date__gte': start, 'date__lte': end}
+        for param in int_params:
+            value = request.query_params.get(param)
+            if value:
+                filters[f"{param}_id"] = int(value)
+    except ValueError:
+        return None, Response(
+            {"error": f"start, end must be YYYY-MM-DD and {', '.join(int_params)} must be integers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if start > end or (end - start).days >= settings.REPORT_MAX_DAYS:
+        return None, Response(
+            {"error": f"start must be before end and the range must be within {settings.REPORT_MAX_DAYS} days"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return filters, None
+
+
+class DailySalesReportView(APIView):
+    """
+    일별 매출 리포트 (운영자 전용). 집계 테이블(daily_sales)만 조회한다.
+    query params: start, end, product_type, sport
+    """
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        filters, error = parse_report_filters(request, ['sport'])
+        if error:
+            return error
+        queryset = DailySales.objects.filter(**filters)
+        product_type = request.query_params.get('product_type')
+        if product_type:
+            queryset = queryset.filter(product_type=product_type.upper())
+
+        totals = queryset.aggregate(
+            gross_amount=Sum('gross_amount'), cancelled_amount=Sum('cancelled_amount'),
+            payment_count=Sum('payment_count'), cancel_count=Sum('cancel_count'),
+        )
+        totals = {key: value or 0 for key, value in totals.items()}
+        totals['net_amount'] = totals['gross_amount'] - totals['cancelled_amount']
+        return Response({"results": DailySalesSerializer(queryset, many=True).data, "totals": totals})
+
+
+class DailyBookingsReportView(APIView):
+    """
+    일별 레슨 예약/정원 충원율 리포트 (운영자 전용). 집계 테이블(daily_bookings)만 조회한다.
+    query params: start, end, instructor, location
+    """
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        filters, error = parse_report_filters(request, ['instructor', 'location'])
+        if error:
+            return error
+        queryset = DailyBookings.objects.filter(**filters)
+
+        totals = queryset.aggregate(capacity=Sum('capacity'), booked_count=Sum('booked_count'), waiting_count=Sum('waiting_count'))
+        totals = {key: value or 0 for key, value in totals.items()}
+        totals['fill_rate'] = round(totals['booked_count'] / totals['capacity'], 4) if totals['capacity'] else None
+        return Response({"results": DailyBookingsSerializer(queryset, many=True).data, "totals": totals})
+
@@ -3,6 +3,7 @@ from django.contrib.admin import AdminSite
 from django.utils.html import format_html
 from .models import User, UserLevel, CertificateUpload
 from django.utils import timezone
+from buccl_back.paginator import EstimatedCountPaginator
 
 # 커스텀 AdminSite 생성
 class SuperuserAdminSite(AdminSite):
@@ -15,6 +16,10 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ('user_id', 'name', 'user_email', 'level', 'is_active', 'is_staff', 'is_superuser', 'is_admin', 'date_joined')
     list_filter = ('level', 'is_active', 'is_staff', 'is_superuser', 'is_admin', 'date_joined')
     search_fields = ('user_id', 'name', 'user_email', 'hp')
+    # UserLevel.__str__ 가 sport.name 을 사용
+    list_select_related = ('level__sport',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = ('date_joined', 'last_login')
     
     fieldsets = (
@@ -50,6 +55,10 @@ class CertificateUploadAdmin(admin.ModelAdmin):
     list_display = ('user', 'certificate_name', 'certificate_preview', 'uploaded_at', 'is_approved')
     list_filter = ('is_approved', 'uploaded_at')
     search_fields = ('user__user_id', 'user__name', 'certificate_name')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user', 'approved_by')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     fieldsets = (
         ('인증서 정보', {
@@ -0,0 +1,77 @@
+"""
+JWT(access) 인증
+
+access 토큰을 `Authorization: Bearer <token>` 헤더 또는 `access` 쿠키에서 읽어 요청당 한 번만 검증하고 request.user 를 채운다.
+토큰의 user_id 클레임은 로그인 아이디(User.user_id) 문자열, uid 클레임은 pk 이다. (CustomTokenObtainPairSerializer)
+
+사용자는 principal 캐시(buccl_user.principal)에서 읽으므로 캐시가 있으면 DB 조회가 없다.
+- 헤더 토큰이 잘못되었으면 401 을 돌려준다.
+- 쿠키 토큰이 만료/손상되었으면 익명 사용자로 둔다. (공개 API 는 그대로 동작하고, 토큰 갱신은 AuthAPIView 가 처리)
+- 로그아웃 등으로 폐기된 토큰(buccl_user.revocation)은 잘못된 토큰과 같이 처리한다.
+"""
+import logging
+
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import revocation
+from .principal import get_principal_by_login
+
+logger = logging.getLogger('django')
+
+ACCESS_COOKIE = 'access'
+AUTH_HEADER_TYPE = b'bearer'
+
+
+def get_token_user(token):
+    """토큰 클레임의 활성 사용자 (principal 캐시로 만든 User 인스턴스). 없거나 비활성화면 None"""
+    principal = get_principal_by_login(token.get('user_id'), token.get('uid'))
+    if principal is None or not principal.is_active:
+        return None
+    return principal.as_user()
+
+
+def decode_access_token(raw_token):
+    """검증된 AccessToken. 만료/서명 오류, 폐기된 토큰이면 TokenError"""
+    token = AccessToken(raw_token)
+    if revocation.is_revoked(token):
+        raise TokenError('Token is revoked')
+    return token
+
+
+class JWTCookieAuthentication(BaseAuthentication):
+    """REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] 의 기본 인증 클래스"""
+    www_authenticate_realm = 'api'
+
+    def get_raw_token(self, request):
+        """(토큰, 헤더에서 읽었는지 여부). 토큰이 없으면 (None, False)"""
+        header = get_authorization_header(request).split()
+        if header and header[0].lower() == AUTH_HEADER_TYPE:
+            if len(header) != 2:
+                raise AuthenticationFailed('Invalid Authorization header.')
+            return header[1].decode('latin-1'), True
+        return request.COOKIES.get(ACCESS_COOKIE), False
+
+    def authenticate(self, request):
+        raw_token, from_header = self.get_raw_token(request)
+        if not raw_token:
+            return None
+        try:
+            token = decode_access_token(raw_token)
+        except TokenError as e:
+            if from_header:
+                raise AuthenticationFailed(str(e))
+            logger.debug(f"access cookie ignored: {e}")
+            return None
+
+        user = get_token_user(token)
+        if user is None:
+            if from_header:
+                raise AuthenticationFailed('User not found or inactive.')
+            return None
+        return user, token
+
+    def authenticate_header(self, request):
+        return f'Bearer realm="{self.www_authenticate_realm}"'
@@ -0,0 +1,181 @@
+"""
+회원가입 아이디/휴대폰번호/이메일 중복 확인
+
+가입 폼은 입력칸을 벗어날 때마다 중복 확인을 요청하고, 대부분의 값은 아직 사용되지 않은 값이다.
+워커 메모리에 컬럼별로 사용 중인 값의 블룸 필터(TakenFilter)를 두어 "없음" 이 확실한 값은 DB 를 조회하지 않는다.
+- 필터에 있다고 나온 값(실제 사용 중이거나 오탐)만 모아 한 번의 쿼리(컬럼__in)로 확인한다.
+- 블룸 필터는 삭제를 지원하지 않는다. 탈퇴/변경으로 사라진 값은 오탐이 되어 DB 로 확인하게 될 뿐이고, 주기적으로 다시 만든다.
+  (AVAILABILITY_FILTER_REBUILD_SECONDS)
+- 운영 DB(MySQL utf8mb4)의 비교는 대소문자를 구분하지 않으므로 필터에는 casefold 한 값을 넣고, 조회 결과도 casefold 해 맞춘다.
+- User 저장 시 새 값을 이 워커의 필터에 바로 넣고, 커밋 후 공유 캐시의 버전을 올린다.
+  다른 워커는 AVAILABILITY_FILTER_CHECK_SECONDS 마다 버전을 확인해 바뀌었으면 다시 만든다.
+  그 사이에는 방금 가입한 값을 "사용 가능" 으로 답할 수 있지만, 가입 시 unique 제약으로 다시 검사된다.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+FIELDS = ('user_id', 'hp', 'user_email')
+VERSION_KEY = 'availability:version'
+
+
+class TakenFilter:
+    """bytearray 블룸 필터. capacity 개를 넣었을 때 오탐률이 error_rate 가 되도록 크기를 정한다."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        # 이중 해싱: sha256 하나에서 두 해시를 만들어 k 개 위치를 얻는다
+        digest = hashlib.sha256(value.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def normalize(value):
+    """필터/비교용 값. 숫자로 들어온 요청 값도 문자열로 다루고, DB collation 처럼 대소문자를 무시한다."""
+    return str(value).casefold()
+
+
+_lock = threading.Lock()
+# {'version', 'built_at', 'checked_at', 'filters': {컬럼: TakenFilter}}
+_state = {}
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def _build(version):
+    User = get_user_model()
+    # 다시 만들기 전까지 들어올 가입을 위한 여유
+    capacity = int(User.objects.count() * 1.2) + 1000
+    error_rate = getattr(settings, 'AVAILABILITY_FILTER_ERROR_RATE', 0.01)
+    filters = {field: TakenFilter(capacity, error_rate) for field in FIELDS}
+    for row in User.objects.values_list(*FIELDS).iterator(chunk_size=5000):
+        for field, value in zip(FIELDS, row):
+            if value:
+                filters[field].add(normalize(value))
+    now = time.monotonic()
+    return {'version': version, 'built_at': now, 'checked_at': now, 'filters': filters}
+
+
+def filters():
+    """컬럼별 필터. 버전이 바뀌었거나, 재구축 주기가 지났거나, 용량을 넘겼으면 다시 만든다."""
+    global _state
+    check_interval = getattr(settings, 'AVAILABILITY_FILTER_CHECK_SECONDS', 5)
+    state = _state
+    if state and time.monotonic() - state['checked_at'] < check_interval:
+        return state['filters']
+    with _lock:
+        state = _state
+        now = time.monotonic()
+        if state and now - state['checked_at'] < check_interval:
+            return state['filters']
+        version = current_version()
+        if (
+            state and state['version'] == version
+            and now - state['built_at'] < getattr(settings, 'AVAILABILITY_FILTER_REBUILD_SECONDS', 600)
+            and all(f.count <= f.capacity for f in state['filters'].values())
+        ):
+            state['checked_at'] = now
+            return state['filters']
+        # 버전을 먼저 읽고 행을 읽으므로, 그 사이 가입이 있으면 다음 확인에서 다시 만든다
+        _state = _build(version)
+        return _state['filters']
+
+
+def taken_values(candidates):
+    """
+    candidates: {컬럼: [값, ...]} -> {컬럼: 사용 중인 값 set} (요청한 값 그대로, 문자열로)
+    필터에 없는 값은 DB 를 보지 않고, 나머지는 컬럼과 관계없이 한 번의 쿼리로 확인한다.
+    """
+    taken = {field: set() for field in candidates}
+    current = filters()
+    maybe = {
+        field: [str(value) for value in values if normalize(value) in current[field]]
+        for field, values in candidates.items()
+    }
+    condition = Q()
+    for field, values in maybe.items():
+        if values:
+            condition |= Q(**{f"{field}__in": values})
+    if not condition:
+        return taken
+    fields = list(maybe)
+    found = {field: set() for field in fields}
+    for row in get_user_model().objects.filter(condition).values_list(*fields):
+        for field, value in zip(fields, row):
+            if value:
+                found[field].add(normalize(value))
+    for field, values in maybe.items():
+        taken[field].update(value for value in values if normalize(value) in found[field])
+    return taken
+
+
+def is_taken(field, value):
+    value = str(value)
+    return value in taken_values({field: [value]})[field]
+
+
+def _publish(version):
+    try:
+        new_version = cache.incr(VERSION_KEY)
+    except ValueError:  # 버전 키가 없어진 경우 (캐시 재시작/축출). 어떤 워커의 버전과도 겹치지 않는 값으로
+        cache.set(VERSION_KEY, time.time_ns(), None)
+        return
+    state = _state
+    # 이 워커의 변경만 반영된 버전이면 이 워커는 다시 만들 필요가 없다
+    if state and version is not None and state['version'] == version and new_version == version + 1:
+        state['version'] = new_version
+
+
+def invalidate():
+    """bulk_create 처럼 시그널이 없는 대량 변경 뒤에 호출. 모든 워커가 다음 확인 때 필터를 다시 만든다."""
+    global _state
+    _state = {}
+    _publish(None)
+
+
+def record_user(user, update_fields=None):
+    """
+    User 저장 시 (buccl_user.signals) 이 워커의 필터에 새 값을 넣고, 커밋 후 다른 워커가 다시 만들도록 버전을 올린다.
+    세 컬럼을 저장하지 않았거나 (로그인 시각 갱신 등) 값이 모두 이미 필터에 있으면 버전을 올리지 않는다.
+    """
+    if update_fields is not None and not set(update_fields) & set(FIELDS):
+        return
+    state = _state
+    values = [(field, normalize(getattr(user, field))) for field in FIELDS if getattr(user, field)]
+    if state:
+        new_values = [(field, value) for field, value in values if value not in state['filters'][field]]
+        if not new_values:
+            return
+        for field, value in new_values:
+            state['filters'][field].add(value)
+    version = state['version'] if state else None
+    transaction.on_commit(lambda: _publish(version))
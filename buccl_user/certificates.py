@@ -0,0 +1,150 @@
+"""
+자격증 파일 저장과 검증
+
+- store_file(): 업로드 파일을 저장소에 청크 단위로 쓴다. 뷰는 이것을 트랜잭션 밖에서 호출하고, 트랜잭션 안에서는 메타데이터만 저장한다.
+- schedule_validation(): 커밋 후 프로세스 내 백그라운드 스레드에서 validate_certificate() 를 실행한다.
+  워커가 재시작되어 처리하지 못한 행은 validate_certificates 명령어(cron)가 다시 처리한다.
+- validate_certificate(): 파일 앞부분(매직 넘버)으로 실제 형식을 확인하고 크기를 검사한다.
+  잘못된 파일은 반려(rejection_reason)하고, 이미지는 미리보기(썸네일)를 만든다.
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+
+from .models import CertificateUpload, unique_file_path
+
+logger = logging.getLogger('django')
+
+# 파일 앞부분 -> MIME (클라이언트가 보낸 Content-Type 은 믿지 않는다)
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'%PDF-', 'application/pdf'),
+)
+PREVIEW_SIZE = (320, 320)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def sniff_content_type(head):
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def store_file(uploaded_file):
+    """업로드 파일을 저장하고 저장된 이름을 돌려준다. (DB 트랜잭션 밖에서 호출)"""
+    field = CertificateUpload._meta.get_field('certificate_file')
+    return field.storage.save(unique_file_path(None, uploaded_file.name), uploaded_file)
+
+
+def discard_file(name):
+    """메타데이터 저장에 실패했을 때 먼저 저장한 파일 삭제"""
+    try:
+        CertificateUpload._meta.get_field('certificate_file').storage.delete(name)
+    except Exception as e:
+        logger.warning(f"자격증 파일 삭제 실패: {name}, error={e}")
+
+
+def make_preview(data):
+    """이미지 썸네일(JPEG) bytes. Pillow 가 없거나 열 수 없는 이미지면 None"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(PREVIEW_SIZE)
+            output = io.BytesIO()
+            image.convert('RGB').save(output, format='JPEG', quality=80)
+            return output.getvalue()
+    except Exception as e:
+        logger.warning(f"자격증 미리보기 생성 실패: {e}")
+        return None
+
+
+def validate_certificate(certificate_id):
+    """파일 형식/크기를 확인하고 결과(file_status, content_type, file_size, preview)를 저장한다."""
+    certificate = (
+        CertificateUpload.objects.filter(pk=certificate_id, file_status=CertificateUpload.FILE_PENDING)
+        .only('id', 'certificate_file')
+        .first()
+    )
+    if certificate is None:
+        return None
+    name = certificate.certificate_file.name
+    storage = certificate.certificate_file.storage
+    max_bytes = getattr(settings, 'CERTIFICATE_MAX_BYTES', 10 * 1024 * 1024)
+    allowed = getattr(settings, 'CERTIFICATE_ALLOWED_TYPES', ('image/jpeg', 'image/png', 'application/pdf'))
+
+    error = None
+    content_type = ''
+    preview = None
+    try:
+        size = storage.size(name)
+        if size > max_bytes:
+            error = f"파일 크기는 {max_bytes // (1024 * 1024)}MB 이하여야 합니다."
+        else:
+            with storage.open(name, 'rb') as f:
+                head = f.read(16)
+                content_type = sniff_content_type(head) or ''
+                if content_type not in allowed:
+                    error = "지원하지 않는 파일 형식입니다. (JPG, PNG, PDF)"
+                elif content_type.startswith('image/'):
+                    # 이미지만 전체를 읽어 미리보기를 만든다
+                    preview = make_preview(head + f.read())
+    except FileNotFoundError:
+        size, error = None, "파일을 찾을 수 없습니다."
+
+    updates = {'content_type': content_type, 'file_size': size}
+    if error:
+        updates.update(file_status=CertificateUpload.FILE_INVALID, rejection_reason=error,
+                       review_status=CertificateUpload.REVIEW_REJECTED, is_approved=False)
+    else:
+        updates['file_status'] = CertificateUpload.FILE_VALID
+        if preview:
+            preview_name = CertificateUpload._meta.get_field('preview').generate_filename(
+                None, f"{os.path.splitext(os.path.basename(name))[0]}.jpg"
+            )
+            updates['preview'] = storage.save(preview_name, ContentFile(preview))
+    # 검증하는 동안 재등록되었으면 (파일 이름이 바뀜) 이 결과는 버린다
+    CertificateUpload.objects.filter(pk=certificate_id, certificate_file=name).update(**updates)
+    return updates['file_status']
+
+
+def _run(certificate_id):
+    close_old_connections()
+    try:
+        validate_certificate(certificate_id)
+    except Exception as e:
+        logger.error(f"자격증 검증 실패: id={certificate_id}, error={e}")
+    finally:
+        connection.close()  # 스레드 전용 커넥션
+
+
+def get_executor():
+    """프로세스 공용 검증 스레드 (fork 된 워커라면 그 프로세스에서 새로 만든다)"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'CERTIFICATE_VALIDATION_WORKERS', 1),
+                    thread_name_prefix='certificate-validator',
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def schedule_validation(certificate_id):
+    """트랜잭션 커밋 후 백그라운드에서 검증한다. (롤백되면 하지 않음)"""
+    transaction.on_commit(lambda: get_executor().submit(_run, certificate_id))
@@ -0,0 +1,54 @@
+"""
+네이버 SENS 대역 서버 (테스트/부하 테스트용)
+
+    with FakeSens() as fake:
+        client = fake.client()
+        client.send([('01012345678', '인증 번호 [123456]')])
+        fake.messages   # [{'to': ..., 'content': ...}, ...]
+
+fail_next 에 상태 코드를 넣으면 그 순서대로 실패 응답을 돌려준다. (재시도 확인용)
+"""
+import threading
+import uuid
+
+from buccl_back.fakeserver import FakeHTTPServer
+
+from .sms import SensClient
+
+SERVICE_ID = 'ncp:sms:kr:000000000000:fake'
+
+
+class FakeSens(FakeHTTPServer):
+    def __init__(self, access_key='fake-access-key', secret_key='fake-secret-key', sender='01000000000', **kwargs):
+        super().__init__(**kwargs)
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.sender = sender
+        self.messages = []
+        self.calls = 0
+        self.fail_next = []
+        self._messages_lock = threading.Lock()
+        self.route('POST', f"/sms/v2/services/{SERVICE_ID}/messages", self._send)
+
+    def client(self, **kwargs):
+        """이 서버를 바라보는 SensClient (재시도 대기 없음)"""
+        kwargs.setdefault('sleep', lambda seconds: None)
+        return SensClient(self.access_key, self.secret_key, SERVICE_ID, self.sender, base_url=self.base_url, **kwargs)
+
+    def _send(self, request):
+        with self._messages_lock:
+            self.calls += 1
+            if self.fail_next:
+                return self.fail_next.pop(0), {'status': 'failed'}
+        checker = SensClient(self.access_key, self.secret_key, SERVICE_ID, self.sender)
+        timestamp = request.headers.get('x-ncp-apigw-timestamp', '')
+        if request.headers.get('x-ncp-apigw-signature-v2') != checker.signature(timestamp):
+            return 401, {'errorMessage': 'Authentication Failed'}
+
+        body = request.json()
+        messages = [{'to': message['to'], 'content': message.get('content') or body['content']} for message in body['messages']]
+        if not 1 <= len(messages) <= 100:
+            return 400, {'errorMessage': 'messages size must be between 1 and 100'}
+        with self._messages_lock:
+            self.messages.extend(messages)
+        return 202, {'requestId': uuid.uuid4().hex, 'statusCode': '202', 'statusName': 'success'}
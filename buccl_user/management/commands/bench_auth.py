@@ -0,0 +1,77 @@
+import base64
+import statistics
+import time
+
+import jwt
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.request import Request
+
+from buccl_user.authentication import JWTCookieAuthentication
+from buccl_user.principal import invalidate_principal
+from buccl_user.models import User
+from buccl_user.serializers import CustomTokenObtainPairSerializer
+
+BENCH_USER_ID = '__bench_auth__'
+BENCH_PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = "요청당 인증 비용을 비교합니다. (이전: Basic 인증, jwt.decode + User 조회 / 현재: JWTCookieAuthentication) 임시 사용자는 롤백됩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='방식별 반복 횟수')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        factory = RequestFactory()
+        with transaction.atomic():
+            user = User.objects.create_user(user_id=BENCH_USER_ID, password=BENCH_PASSWORD, hp=None, auth=None, name='bench')
+            access = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+            basic = base64.b64encode(f"{BENCH_USER_ID}:{BENCH_PASSWORD}".encode()).decode()
+            jwt_auth = JWTCookieAuthentication()
+
+            def basic_auth():
+                request = Request(factory.get('/', HTTP_AUTHORIZATION=f"Basic {basic}"))
+                BasicAuthentication().authenticate(request)
+
+            def decode_and_query():
+                # 이전 뷰들이 하던 방식: 뷰마다 토큰을 직접 decode 하고 User 를 다시 조회
+                payload = jwt.decode(access, settings.SECRET_KEY, algorithms=['HS256'])
+                User.objects.get(user_id=payload['user_id'])
+
+            def cookie_cold():
+                invalidate_principal(user.pk)
+                request = factory.get('/')
+                request.COOKIES['access'] = access
+                jwt_auth.authenticate(Request(request))
+
+            def cookie_warm():
+                request = factory.get('/')
+                request.COOKIES['access'] = access
+                jwt_auth.authenticate(Request(request))
+
+            cases = [
+                ('basic', basic_auth),
+                ('jwt_decode+db', decode_and_query),
+                ('jwt_cookie_cold', cookie_cold),
+                ('jwt_cookie_warm', cookie_warm),
+            ]
+            self.stdout.write(f"{'method':<18}{'count':>7}{'avg_ms':>9}{'p50_ms':>9}{'p95_ms':>9}")
+            for name, run in cases:
+                run()  # 준비 (캐시/커넥션)
+                samples = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    run()
+                    samples.append((time.perf_counter() - started) * 1000)
+                samples.sort()
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                self.stdout.write(
+                    f"{name:<18}{len(samples):>7}{statistics.mean(samples):>9.3f}{statistics.median(samples):>9.3f}{p95:>9.3f}"
+                )
+            invalidate_principal(user.pk)
+            transaction.set_rollback(True)
@@ -0,0 +1,73 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from buccl_user.models import User
+from buccl_user.serializers import CustomTokenObtainPairSerializer, RegisterSerializer
+
+BENCH_PREFIX = '__bench_reg_'
+BENCH_PASSWORD = 'bench-password'
+
+
+def signup_data(user_id):
+    return {
+        'user_id': user_id,
+        'password': BENCH_PASSWORD,
+        'name': 'bench',
+        'terms_accepted': True,
+        'age_confirmed': True,
+        'privacy_accepted': True,
+    }
+
+
+def previous_flow(user_id):
+    # 이전 RegisterAPIView: 중복 조회 + create_user(해시) + authenticate(조회 + 해시) + 토큰
+    User.objects.filter(user_id=user_id).exists()
+    User.objects.create_user(user_id=user_id, password=BENCH_PASSWORD, hp=None, auth=None, name='bench')
+    user = authenticate(username=user_id, password=BENCH_PASSWORD)
+    CustomTokenObtainPairSerializer.get_token(user)
+
+
+def current_flow(user_id):
+    serializer = RegisterSerializer(data=signup_data(user_id))
+    serializer.is_valid(raise_exception=True)
+    CustomTokenObtainPairSerializer.get_token(serializer.save())
+
+
+class Command(BaseCommand):
+    help = "동시 회원가입 지연시간을 비교합니다. (이전 흐름 / 현재 RegisterSerializer) 만든 임시 사용자는 끝나면 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--signups', type=int, default=40, help='방식별 가입 수')
+        parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수(스레드)')
+
+    def handle(self, *args, **options):
+        cases = [('previous', previous_flow), ('current', current_flow)]
+        try:
+            self.stdout.write(f"{'flow':<10}{'count':>7}{'avg_ms':>9}{'p50_ms':>9}{'p95_ms':>9}{'total_s':>9}")
+            for name, run in cases:
+                def timed(_):
+                    user_id = f"{BENCH_PREFIX}{uuid.uuid4().hex[:12]}"
+                    started = time.perf_counter()
+                    try:
+                        run(user_id)
+                        return (time.perf_counter() - started) * 1000
+                    finally:
+                        connection.close()  # 스레드별 커넥션 정리
+
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                    samples = sorted(pool.map(timed, range(options['signups'])))
+                total = time.perf_counter() - started
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                self.stdout.write(
+                    f"{name:<10}{len(samples):>7}{statistics.mean(samples):>9.1f}{statistics.median(samples):>9.1f}{p95:>9.1f}{total:>9.2f}"
+                )
+        finally:
+            deleted, _ = User.objects.filter(user_id__startswith=BENCH_PREFIX).delete()
+            self.stdout.write(f"임시 사용자 {deleted}건 삭제")
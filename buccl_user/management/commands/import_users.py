@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from buccl_back import refcache
+from buccl_user import availability
+from buccl_user.models import User
+from buccl_user.utils.password_pool import hash_password, password_pool
+
+# 입력 컬럼 -> User 필드 (password, level 은 따로 처리)
+COLUMNS = (
+    'user_id', 'name', 'user_email', 'hp', 'user_gender', 'user_birthday',
+    'terms_accepted', 'age_confirmed', 'privacy_accepted',
+)
+UNIQUE_COLUMNS = ('user_id', 'hp', 'user_email')
+
+
+class RowError(Exception):
+    pass
+
+
+def fold(value):
+    """중복 비교용 값. 운영 DB(MySQL) collation 처럼 대소문자를 무시한다."""
+    return str(value).casefold()
+
+
+def clean_value(field_name, value):
+    field = User._meta.get_field(field_name)
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == '':
+        if field.null:
+            return None
+        if field.has_default():
+            return field.get_default()
+    try:
+        return field.clean(value, None)
+    except ValidationError as e:
+        raise RowError(f"{field_name}: {' '.join(e.messages)}")
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV/JSONL 파일로 회원을 일괄 등록합니다. (제휴사 회원 이관)\n"
+        "컬럼: user_id, password, name, user_email, hp, user_gender, user_birthday, level(등급 번호), "
+        "terms_accepted, age_confirmed, privacy_accepted\n"
+        "이미 있는 user_id/hp/user_email 은 건너뜁니다. 비밀번호 해시는 프로세스 풀에서 병렬로 계산합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV 또는 JSONL 파일 경로')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='파일 형식 (기본: 확장자로 판단)')
+        parser.add_argument('--batch-size', type=int, default=500, help='한 번에 조회/저장할 행 수')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='비밀번호 해시 프로세스 수')
+        parser.add_argument('--report', help='행별 오류/건너뜀 리포트를 저장할 CSV 경로 (기본: stderr 출력)')
+        parser.add_argument('--dry-run', action='store_true', help='검증만 하고 저장하지 않음')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"파일을 찾을 수 없습니다: {path}")
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        # 등급 번호 -> UserLevel id (기준 데이터 캐시)
+        self.levels = {str(row['level']): row['id'] for row in refcache.rows('buccl_user.UserLevel')}
+        self.errors = []
+        self.seen = {column: set() for column in UNIQUE_COLUMNS}
+        created = skipped = 0
+
+        with open(path, newline='', encoding='utf-8-sig') as f, \
+                password_pool(options['workers']) as pool:
+            batch = []
+            for line_no, row in self.iter_rows(f, file_format):
+                batch.append((line_no, row))
+                if len(batch) >= options['batch_size']:
+                    c, s = self.process_batch(batch, pool, options['dry_run'])
+                    created, skipped = created + c, skipped + s
+                    batch = []
+            if batch:
+                c, s = self.process_batch(batch, pool, options['dry_run'])
+                created, skipped = created + c, skipped + s
+
+        if created and not options['dry_run']:
+            # bulk_create 는 post_save 시그널이 없으므로 가입 중복 확인 필터를 직접 무효화
+            availability.invalidate()
+        self.write_report(options['report'])
+        summary = f"생성 {created}건, 건너뜀(중복) {skipped}건, 오류 {len(self.errors) - skipped}건"
+        if options['dry_run']:
+            summary = f"[dry-run] {summary}"
+        self.stdout.write(self.style.SUCCESS(summary) if len(self.errors) == skipped else self.style.WARNING(summary))
+
+    def iter_rows(self, f, file_format):
+        """파일을 한 줄씩 읽어 (행 번호, dict) 를 반환한다. (전체를 메모리에 올리지 않음)"""
+        if file_format == 'csv':
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.errors.append((line_no, f"JSON 파싱 실패: {e}"))
+                continue
+            if not isinstance(row, dict):
+                self.errors.append((line_no, "JSON 객체가 아닙니다."))
+                continue
+            yield line_no, row
+
+    def parse_row(self, row):
+        values = {column: clean_value(column, row.get(column)) for column in COLUMNS if column in row}
+        if not values.get('user_id'):
+            raise RowError("user_id: 필수 항목입니다.")
+        level = str(row.get('level') or '').strip()
+        if level and level != '0':
+            if level not in self.levels:
+                raise RowError(f"level: 알 수 없는 등급 '{level}'")
+            values['level_id'] = self.levels[level]
+        return values, row.get('password') or None
+
+    def process_batch(self, batch, pool, dry_run):
+        parsed = []
+        for line_no, row in batch:
+            try:
+                values, password = self.parse_row(row)
+            except RowError as e:
+                self.errors.append((line_no, str(e)))
+                continue
+            # 파일 안에서 겹치는 값은 먼저 나온 행만 사용 (DB collation 처럼 대소문자 무시)
+            duplicate = [column for column in UNIQUE_COLUMNS if values.get(column) and fold(values[column]) in self.seen[column]]
+            if duplicate:
+                self.errors.append((line_no, f"파일 내 중복: {', '.join(duplicate)}"))
+                continue
+            for column in UNIQUE_COLUMNS:
+                if values.get(column):
+                    self.seen[column].add(fold(values[column]))
+            parsed.append((line_no, values, password))
+
+        parsed, skipped = self.exclude_existing(parsed)
+        if dry_run or not parsed:
+            return len(parsed), skipped
+
+        passwords = list(pool.map(hash_password, [password for _, _, password in parsed], chunksize=16))
+        users = [User(password=hashed, **values) for (_, values, _), hashed in zip(parsed, passwords)]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        except IntegrityError:
+            # 조회 후 저장 사이에 가입한 회원이 있으면 다시 걸러서 한 번 더
+            remaining, raced = self.exclude_existing(parsed)
+            keep = {line_no for line_no, _, _ in remaining}
+            rows = [(line_no, user) for (line_no, _, _), user in zip(parsed, users) if line_no in keep]
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user for _, user in rows])
+            except IntegrityError:
+                # 그래도 겹치면 한 건씩 저장하고, 실패한 행만 리포트에 남긴다 (앞서 커밋한 배치와 나머지 행은 유지)
+                created, conflicts = self.create_one_by_one(rows)
+                return created, skipped + raced + conflicts
+            return len(rows), skipped + raced
+        return len(users), skipped
+
+    def create_one_by_one(self, rows):
+        created = conflicts = 0
+        for line_no, user in rows:
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user])
+            except IntegrityError as e:
+                self.errors.append((line_no, f"저장 실패(중복): {e}"))
+                conflicts += 1
+            else:
+                created += 1
+        return created, conflicts
+
+    def exclude_existing(self, parsed):
+        """배치의 user_id/hp/user_email 중 이미 가입된 값을 한 번에 조회해 그 행을 뺀다."""
+        condition = Q()
+        for column in UNIQUE_COLUMNS:
+            values = [values[column] for _, values, _ in parsed if values.get(column)]
+            if values:
+                condition |= Q(**{f"{column}__in": values})
+        if not condition:
+            return parsed, 0
+        taken = {column: set() for column in UNIQUE_COLUMNS}
+        for row in User.objects.filter(condition).values_list(*UNIQUE_COLUMNS):
+            for column, value in zip(UNIQUE_COLUMNS, row):
+                if value:
+                    taken[column].add(fold(value))
+        remaining, skipped = [], 0
+        for line_no, values, password in parsed:
+            existing = [column for column in UNIQUE_COLUMNS if values.get(column) and fold(values[column]) in taken[column]]
+            if existing:
+                self.errors.append((line_no, f"이미 가입됨: {', '.join(existing)}"))
+                skipped += 1
+            else:
+                remaining.append((line_no, values, password))
+        return remaining, skipped
+
+    def write_report(self, report_path):
+        if not self.errors:
+            return
+        self.errors.sort()
+        if report_path:
+            with open(report_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'error'])
+                writer.writerows(self.errors)
+            self.stderr.write(f"오류 리포트 저장: {report_path}")
+            return
+        for line_no, message in self.errors:
+            self.stderr.write(f"line {line_no}: {message}")
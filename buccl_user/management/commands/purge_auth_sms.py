@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from buccl_user.models import AuthSMS
+
+
+class Command(BaseCommand):
+    help = "만료된 문자 인증번호(AuthSMS)를 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 삭제할 행 수')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = 0
+        while True:
+            hps = list(
+                AuthSMS.objects.filter(Q(expires_at__lte=now) | Q(expires_at__isnull=True))
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not hps:
+                break
+            deleted, _ = AuthSMS.objects.filter(pk__in=hps).delete()
+            total += deleted
+        self.stdout.write(self.style.SUCCESS(f"만료된 인증번호 {total}건 삭제"))
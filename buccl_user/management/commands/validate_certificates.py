@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from buccl_user.certificates import validate_certificate
+from buccl_user.models import CertificateUpload
+
+
+class Command(BaseCommand):
+    help = "검증되지 않은 자격증 파일을 검증합니다. (워커 재시작 등으로 백그라운드 검증이 빠진 경우, cron 으로 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=5, help='업로드 후 지난 분 (처리 중인 업로드와 겹치지 않도록)')
+        parser.add_argument('--batch-size', type=int, default=100, help='한 번에 읽을 행 수')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        counts = {}
+        last_id = 0
+        while True:
+            ids = list(
+                CertificateUpload.objects.filter(
+                    file_status=CertificateUpload.FILE_PENDING, review_status=CertificateUpload.REVIEW_PENDING,
+                    uploaded_at__lt=cutoff, pk__gt=last_id,
+                ).order_by('pk').values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            for certificate_id in ids:
+                result = validate_certificate(certificate_id)
+                counts[result] = counts.get(result, 0) + 1
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f"자격증 검증: 정상 {counts.get(CertificateUpload.FILE_VALID, 0)}건, 잘못된 파일 {counts.get(CertificateUpload.FILE_INVALID, 0)}건"
+        ))
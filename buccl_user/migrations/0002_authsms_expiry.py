@@ -0,0 +1,32 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:41
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_expires_at(apps, schema_editor):
+    # 기존 인증번호는 마지막 발송 시각(modified) + 5분을 만료 시각으로
+    AuthSMS = apps.get_model('buccl_user', 'AuthSMS')
+    AuthSMS.objects.filter(expires_at__isnull=True).update(expires_at=models.F('modified') + timedelta(minutes=5))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authsms',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='틀린 횟수'),
+        ),
+        migrations.AddField(
+            model_name='authsms',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, null=True, verbose_name='만료 시각'),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+    ]
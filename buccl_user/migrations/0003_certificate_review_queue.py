@@ -0,0 +1,52 @@
+# Generated by Django 4.1.5 on 2026-10-19 21:48
+
+import buccl_user.models
+from django.db import migrations, models
+
+
+def backfill_review_status(apps, schema_editor):
+    CertificateUpload = apps.get_model('buccl_user', 'CertificateUpload')
+    # 기존 파일은 검증 대상이 아니다 (validate_certificates 가 이미 심사한 자격증을 반려하지 않도록)
+    CertificateUpload.objects.update(file_status='VALID')
+    CertificateUpload.objects.filter(is_approved=True).update(review_status='APPROVED')
+    CertificateUpload.objects.filter(is_approved=False).exclude(rejection_reason__isnull=True).exclude(rejection_reason='').update(review_status='REJECTED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buccl_user', '0002_authsms_expiry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificateupload',
+            name='content_type',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='파일 형식'),
+        ),
+        migrations.AddField(
+            model_name='certificateupload',
+            name='file_size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='파일 크기(byte)'),
+        ),
+        migrations.AddField(
+            model_name='certificateupload',
+            name='file_status',
+            field=models.CharField(choices=[('PENDING', '검증 대기'), ('VALID', '정상'), ('INVALID', '잘못된 파일')], default='PENDING', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='certificateupload',
+            name='preview',
+            field=models.FileField(blank=True, upload_to=buccl_user.models.certificate_preview_path, verbose_name='미리보기'),
+        ),
+        migrations.AddField(
+            model_name='certificateupload',
+            name='review_status',
+            field=models.CharField(choices=[('PENDING', '대기중'), ('APPROVED', '승인'), ('REJECTED', '반려됨')], default='PENDING', editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_review_status, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='certificateupload',
+            index=models.Index(fields=['review_status', 'uploaded_at', 'id'], name='cert_review_queue_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
-import os, hmac, json, time, base64, random, datetime, hashlib, requests, uuid, logging
+import os, hmac, random, datetime, uuid, logging
 from buccl_back.choices import *
 from buccl_main.models import Sport
 from model_utils.models import TimeStampedModel
+from . import sms
 
 from django.utils import timezone
 from django.db import models
@@ -137,86 +138,74 @@ class User(AbstractBaseUser, PermissionsMixin):
 class AuthSMS(TimeStampedModel):
     '''
     회원가입 문자 인증을 위한 model, 테이블명 AUTH_TB
-    네이버 sens 서비스를 통해 입력한 휴대폰 번호로 인증 번호를 보냅니다.
+    네이버 sens 서비스를 통해 입력한 휴대폰 번호로 인증 번호를 보냅니다. (커밋 후 비동기 발송)
     인증 코드는 6자리 숫자입니다.
+    expires_at 이 지나거나 확인 횟수(attempts)가 AUTH_SMS_MAX_ATTEMPTS 에 도달하면 더 이상 인증되지 않습니다.
+    인증에 성공한 번호는 삭제되어 한 번만 쓸 수 있습니다.
+    만료된 행은 purge_auth_sms 명령어로 삭제합니다.
     '''
+    VERIFIED = 'VERIFIED'
+    MISMATCH = 'MISMATCH'
+    EXPIRED = 'EXPIRED'
+    TOO_MANY_ATTEMPTS = 'TOO_MANY_ATTEMPTS'
+    NOT_FOUND = 'NOT_FOUND'
+
     hp = models.CharField(max_length=11, verbose_name='휴대폰번호', primary_key=True)
     auth = models.IntegerField(verbose_name='인증번호')
+    expires_at = models.DateTimeField(verbose_name='만료 시각', null=True, db_index=True)
+    attempts = models.PositiveSmallIntegerField(verbose_name='틀린 횟수', default=0)
 
     class Meta:
         db_table = 'AUTH_TB'
 
     def save(self, *args, **kwargs):
         self.auth = random.randint(100000, 1000000) # 난수로 6자리 문자 인증 번호 생성
+        # 새 번호를 보낼 때마다 만료 시각과 틀린 횟수를 초기화
+        self.expires_at = timezone.now() + datetime.timedelta(minutes=settings.AUTH_SMS_TTL_MINUTES)
+        self.attempts = 0
         super().save(*args, **kwargs)
         self.send_sms() # 문자 전송용 함수
 
     def send_sms(self):
-        # 중요: 이 부분은 동기적으로 외부 API를 호출합니다.
-        # 운영 환경에서는 Celery와 같은 비동기 작업 큐를 사용하여 SMS 발송을 처리하는 것이 좋습니다.
-        # 이렇게 하면 API 응답 지연이나 오류가 사용자 요청 처리에 직접적인 영향을 미치는 것을 방지할 수 있습니다.
-        ##### 네이버 sens 서비스 이용 위한 json request 형식 #####
-        timestamp = str(int(time.time() * 1000))
-
-        url = "https://sens.apigw.ntruss.com"
-        uri = "/sms/v2/services/ncp:sms:kr:328805329142:nuseum/messages"
-        apiUrl = url + uri
-
-        access_key = settings.NAVER_SENS_ACCESS_KEY
-        secret_key = bytes(settings.NAVER_SENS_SECRET_KEY, 'UTF-8')
-        message = bytes("POST" + " " + uri + "\n" + timestamp + "\n" + access_key, 'UTF-8')
-        
-        try:
-            signingKey = base64.b64encode(hmac.new(secret_key, message, digestmod=hashlib.sha256).digest())
-
-            body = {
-                "type" : "SMS",
-                "contentType" : "COMM",
-                "from" : "01091161927",
-                "subject" : "subject",
-                "content" : "[버킷리스트 클래스] 인증 번호 [{}]를 입력해주세요.".format(self.auth),
-                "messages" : [{"to" : self.hp}]
-            }
-            body2 = json.dumps(body)
-            headers = {
-                "Content-Type": "application/json; charset=utf-8",
-                "x-ncp-apigw-timestamp": timestamp,
-                "x-ncp-iam-access-key": access_key,
-                "x-ncp-apigw-signature-v2": signingKey
-            }
-
-            response = requests.post(apiUrl, headers=headers, data=body2)
-            logger.debug(f"send_sms response: {response.text}")
-        except Exception as e:
-            raise Exception(f"SMS 전송 실패: {e}")
+        # SENS 호출은 커밋 후 발송 큐(buccl_user.sms)의 백그라운드 스레드에서 한다. 요청 처리 시간에 영향 없음
+        sms.send_verification_code(self.hp, self.auth)
+
+    @classmethod
+    def verify(cls, p_num, c_num):
+        '''
+        인증번호 확인. VERIFIED, MISMATCH, EXPIRED, TOO_MANY_ATTEMPTS, NOT_FOUND 중 하나를 돌려준다.
+        비교하기 전에 조건부 UPDATE(만료 전, attempts < AUTH_SMS_MAX_ATTEMPTS)로 시도 1회를 먼저 차지하므로
+        동시에 여러 번호를 보내도 허용 횟수를 넘겨 확인할 수 없다. 맞으면 행을 삭제해 번호를 다시 쓸 수 없게 한다.
+        '''
+        now = timezone.now()
+        reserved = cls.objects.filter(
+            pk=p_num, expires_at__gt=now, attempts__lt=settings.AUTH_SMS_MAX_ATTEMPTS,
+        ).update(attempts=models.F('attempts') + 1)
+        if not reserved:
+            row = cls.objects.filter(pk=p_num).values_list('expires_at', flat=True)
+            if not row:
+                return cls.NOT_FOUND
+            expires_at = row[0]
+            if expires_at is None or expires_at <= now:
+                return cls.EXPIRED
+            return cls.TOO_MANY_ATTEMPTS
+        auth = cls.objects.filter(pk=p_num).values_list('auth', flat=True).first()
+        if auth is None or not hmac.compare_digest(str(auth), str(c_num).strip()):
+            return cls.MISMATCH
+        # 같은 번호로 동시에 확인해도 삭제에 성공한 한 요청만 인증된다 (그 사이 새로 발송된 번호는 지우지 않음)
+        consumed, _ = cls.objects.filter(pk=p_num, auth=auth).delete()
+        return cls.VERIFIED if consumed else cls.NOT_FOUND
 
     @classmethod
     def check_auth_number(cls, p_num, c_num):
-        result = cls.objects.filter(
-            hp = p_num,
-            auth = c_num,
-        )
-        logger.debug(f"check_auth_number result: {result}")
-        if result:
-            return True
-        return False    
-        
+        return cls.verify(p_num, c_num) == cls.VERIFIED
 
     @classmethod
     def check_timer(cls, p_num, c_num)->bool:
         '''
-        문자인증 제한시간을 위한 타이머 설정 함수
+        문자인증 제한시간 확인 (expires_at 기준, verify 와 같음)
         '''
-        time_limit = timezone.now() - datetime.timedelta(minutes=5) # minutes 변수를 통해 문자인증 제한시간 설정
-        result = cls.objects.filter(
-            hp=p_num,
-            auth=c_num,
-            modified__gte=time_limit
-        )
-
-        if result:
-            return True
-        return False
+        return cls.check_auth_number(p_num, c_num)
     
 # User = get_user_model()  # 이 라인이 문제를 일으키고 있어 주석 처리했습니다
 
@@ -227,7 +216,32 @@ def unique_file_path(instance, filename):
     filename = f"{uuid.uuid4().hex[:8]}.{ext}"
     return os.path.join('certificates', filename)
 
+def certificate_preview_path(instance, filename):
+    return os.path.join('certificates', 'previews', filename)
+
 class CertificateUpload(models.Model):
+    '''
+    자격증 업로드. 파일은 트랜잭션 밖에서 저장하고, 형식/크기 검증과 미리보기 생성은 커밋 후 백그라운드에서 한다. (buccl_user.certificates)
+    review_status 는 is_approved/rejection_reason 으로 save() 시 정해지며, 승인 대기 목록 인덱스에 쓰인다.
+    (rejection_reason 은 TEXT 라 MySQL 복합 인덱스에 넣을 수 없다)
+    '''
+    FILE_PENDING = 'PENDING'
+    FILE_VALID = 'VALID'
+    FILE_INVALID = 'INVALID'
+    FILE_STATUS_CHOICES = [
+        (FILE_PENDING, '검증 대기'),
+        (FILE_VALID, '정상'),
+        (FILE_INVALID, '잘못된 파일'),
+    ]
+    REVIEW_PENDING = 'PENDING'
+    REVIEW_APPROVED = 'APPROVED'
+    REVIEW_REJECTED = 'REJECTED'
+    REVIEW_STATUS_CHOICES = [
+        (REVIEW_PENDING, '대기중'),
+        (REVIEW_APPROVED, '승인'),
+        (REVIEW_REJECTED, '반려됨'),
+    ]
+
     user = models.ForeignKey('buccl_user.User', on_delete=models.CASCADE, related_name='certificates', db_index=True)
     certificate_name = models.CharField(max_length=255)
     certificate_file = models.FileField(upload_to=unique_file_path)
@@ -251,10 +265,29 @@ class CertificateUpload(models.Model):
         db_index=True
     )
 
+    review_status = models.CharField(max_length=10, choices=REVIEW_STATUS_CHOICES, default=REVIEW_PENDING, editable=False)
+    file_status = models.CharField(max_length=10, choices=FILE_STATUS_CHOICES, default=FILE_PENDING)
+    content_type = models.CharField(max_length=100, blank=True, default='', verbose_name='파일 형식')
+    file_size = models.PositiveIntegerField(null=True, blank=True, verbose_name='파일 크기(byte)')
+    preview = models.FileField(upload_to=certificate_preview_path, blank=True, verbose_name='미리보기')
+
     class Meta:
         ordering = ['-uploaded_at']
         verbose_name = '자격증 업로드'
         verbose_name_plural = '자격증 업로드 관리'
+        indexes = [
+            # 승인 대기 목록 (review_status=PENDING, uploaded_at, id 순 keyset)
+            models.Index(fields=['review_status', 'uploaded_at', 'id'], name='cert_review_queue_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.is_approved:
+            self.review_status = self.REVIEW_APPROVED
+        elif self.rejection_reason:
+            self.review_status = self.REVIEW_REJECTED
+        else:
+            self.review_status = self.REVIEW_PENDING
+        super().save(*args, **kwargs)
 
     def __str__(self):
         approval_status = '승인' if self.is_approved else ('반려됨' if self.rejection_reason else '대기중') # 상태 세분화
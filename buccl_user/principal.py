@@ -0,0 +1,85 @@
+"""
+인증 사용자(principal) 캐시
+
+인증과 프로필 응답(UserSerializer)에 필요한 User 컬럼만 담은 작은 스냅샷(Principal)을 pk 기준으로 공유 캐시에 둔다.
+- 캐시 값은 PRINCIPAL_FIELDS 순서의 튜플이고, 키는 (pk, 버전)이다.
+- User 저장/삭제, 등급(UserLevel) 삭제로 인한 level 변경 시 버전을 올린다. (buccl_user.signals)
+  QuerySet.update() 로 User 를 바꾼 뒤에는 invalidate_principal(pk) 을 직접 호출한다.
+- as_user() 는 스냅샷 값으로 만든 User 인스턴스를 돌려준다. 나머지 컬럼(password 등)은 deferred 로 남아 접근할 때만 조회되고,
+  save() 는 로드된 컬럼만 UPDATE 한다.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PRINCIPAL_FIELDS = (
+    'id', 'user_id', 'name', 'user_email', 'hp', 'level_id',
+    'is_active', 'is_staff', 'is_admin', 'is_superuser',
+)
+
+
+class Principal:
+    __slots__ = PRINCIPAL_FIELDS
+
+    def __init__(self, *values):
+        for name, value in zip(PRINCIPAL_FIELDS, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(*(getattr(user, name) for name in PRINCIPAL_FIELDS))
+
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in PRINCIPAL_FIELDS)
+
+    def as_user(self):
+        # from_db 는 일부 컬럼만 받을 때 값을 모델 필드 선언 순서로 채우므로 그 순서로 넘긴다
+        model = get_user_model()
+        names = [field.attname for field in model._meta.concrete_fields if field.attname in PRINCIPAL_FIELDS]
+        return model.from_db(DEFAULT_DB_ALIAS, names, [getattr(self, name) for name in names])
+
+
+def principal_version_key(pk):
+    return f"auth:principal-version:{pk}"
+
+
+def principal_cache_key(pk, version):
+    return f"auth:principal:{pk}:{version}"
+
+
+def invalidate_principal(pk):
+    try:
+        cache.incr(principal_version_key(pk))
+    except ValueError:
+        cache.set(principal_version_key(pk), 1, None)
+
+
+def load_principal(**lookup):
+    values = get_user_model().objects.filter(**lookup).values_list(*PRINCIPAL_FIELDS).first()
+    return Principal(*values) if values else None
+
+
+def get_principal(pk):
+    """pk 로 Principal 조회. 캐시에 없으면 DB 에서 읽어 AUTH_USER_CACHE_TTL 동안 캐시한다. 없는 사용자는 None"""
+    # 버전을 먼저 읽어야, 읽는 도중 저장된 변경이 새 버전 키로 가려지지 않는다
+    version = cache.get(principal_version_key(pk), 0)
+    key = principal_cache_key(pk, version)
+    values = cache.get(key)
+    if values is not None:
+        return Principal(*values)
+    principal = load_principal(pk=pk)
+    if principal is not None:
+        cache.set(key, principal.as_tuple(), getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+    return principal
+
+
+def get_principal_by_login(user_id, pk=None):
+    """토큰 클레임으로 조회. pk(uid 클레임)가 없는 이전 토큰은 캐시 없이 로그인 아이디로 조회한다."""
+    if pk is None:
+        return load_principal(user_id=user_id)
+    principal = get_principal(pk)
+    # 로그인 아이디가 바뀐 계정의 예전 토큰은 받지 않는다
+    if principal is None or principal.user_id != user_id:
+        return None
+    return principal
@@ -0,0 +1,156 @@
+"""
+JWT refresh 토큰 회전(rotation)과 폐기 목록
+
+- 로그인 시 발급하는 refresh 토큰에 세션 id(sid 클레임, 첫 refresh 토큰의 jti)를 넣는다. access 토큰도 sid 를 물려받는다.
+- refresh 토큰은 한 번만 쓸 수 있다. 쓰면 그 jti 를 폐기하고 같은 sid 로 새 refresh/access 를 발급한다. (rotate)
+  이미 쓴 refresh 토큰이 다시 오면 탈취로 보고 세션 전체를 폐기한다.
+- 로그아웃은 세션(sid)을, "모든 기기에서 로그아웃" 은 사용자별 기준 시각 이전에 발급된 모든 토큰을 폐기한다.
+  기준 시각과 발급 시각(iat_ms 클레임)은 밀리초 단위로 비교하므로, 같은 초에 다시 로그인한 토큰은 살아 있다.
+
+폐기 목록은 공유 캐시(CACHES['default'])에 토큰의 남은 수명만큼만 둔다. DB 테이블/조회는 없다.
+요청마다 확인하는 비용은 캐시 get_many 1회이고, 이 워커가 알게 된 폐기는 프로세스 내 목록(_recent)에서 바로 걸러진다.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+SESSION_CLAIM = 'sid'
+# 밀리초 단위 발급 시각. iat 는 초 단위라 "모든 기기에서 로그아웃" 직후 같은 초의 재로그인과 구분이 안 된다
+ISSUED_MS_CLAIM = 'iat_ms'
+
+_lock = threading.Lock()
+# 캐시 키 -> (값, 만료 unix 시각). 최근 폐기만 RECENT_SIZE 개까지
+_recent = {}
+RECENT_SIZE = 4096
+
+
+def jti_key(jti):
+    return f"auth:revoked:jti:{jti}"
+
+
+def session_key(sid):
+    return f"auth:revoked:sid:{sid}"
+
+
+def user_key(uid):
+    return f"auth:revoked-before-ms:{uid}"
+
+
+def refresh_lifetime():
+    return int(settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds())
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def issued_ms(token):
+    """토큰 발급 시각(밀리초). iat_ms 가 없는 예전 토큰은 iat(초)로 계산한다."""
+    if ISSUED_MS_CLAIM in token:
+        return token[ISSUED_MS_CLAIM]
+    return token.get('iat', 0) * 1000
+
+
+def remaining(token):
+    return max(1, int(token['exp'] - time.time()))
+
+
+def _remember(key, value, ttl):
+    with _lock:
+        now = time.time()
+        if len(_recent) >= RECENT_SIZE:
+            for old_key in [k for k, (_, expires) in _recent.items() if expires <= now]:
+                del _recent[old_key]
+            while len(_recent) >= RECENT_SIZE:
+                del _recent[next(iter(_recent))]
+        _recent[key] = (value, now + ttl)
+
+
+def _recent_value(key):
+    entry = _recent.get(key)
+    if entry is None:
+        return None
+    if entry[1] <= time.time():
+        _recent.pop(key, None)
+        return None
+    return entry[0]
+
+
+def _revoked(keys, issued_at, values):
+    sid_key, uid_key = keys
+    if sid_key and values.get(sid_key):
+        return True
+    revoked_before = values.get(uid_key) if uid_key else None
+    # 기준 시각과 같은 밀리초에 발급된 토큰도 폐기한다
+    return revoked_before is not None and issued_at <= revoked_before
+
+
+def is_revoked(token):
+    """access/refresh 토큰의 세션 또는 사용자 전체가 폐기되었는지. (refresh 토큰 자체의 재사용은 rotate 에서 확인)"""
+    sid = token.get(SESSION_CLAIM)
+    uid = token.get('uid')
+    keys = (session_key(sid) if sid else None, user_key(uid) if uid is not None else None)
+    issued_at = issued_ms(token)
+    local = {key: _recent_value(key) for key in keys if key}
+    if _revoked(keys, issued_at, local):
+        return True
+    shared = cache.get_many([key for key in keys if key])
+    if _revoked(keys, issued_at, shared):
+        for key, value in shared.items():
+            _remember(key, value, refresh_lifetime())
+        return True
+    return False
+
+
+def revoke_session(token):
+    """토큰이 속한 세션의 모든 access/refresh 토큰 폐기 (로그아웃). sid 가 없는 예전 토큰은 그 토큰의 jti 만"""
+    sid = token.get(SESSION_CLAIM)
+    if not sid:
+        if token.get('token_type') == 'refresh':
+            cache.set(jti_key(token['jti']), 1, remaining(token))
+        return
+    # 회전할 때마다 만료가 늘어나므로 세션은 refresh 토큰 수명 전체 동안 폐기 상태로 둔다
+    cache.set(session_key(sid), 1, refresh_lifetime())
+    _remember(session_key(sid), 1, refresh_lifetime())
+
+
+def revoke_user(uid):
+    """지금까지 발급된 uid 사용자의 모든 토큰 폐기 (모든 기기에서 로그아웃)"""
+    revoked_before = now_ms()
+    cache.set(user_key(uid), revoked_before, refresh_lifetime())
+    _remember(user_key(uid), revoked_before, refresh_lifetime())
+
+
+def issue(user, sid=None):
+    """user 의 새 refresh 토큰 (access 는 .access_token). sid 가 없으면 새 세션"""
+    from .serializers import CustomTokenObtainPairSerializer
+
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
+    refresh[SESSION_CLAIM] = sid or refresh['jti']
+    # access 토큰도 이 클레임을 물려받는다
+    refresh[ISSUED_MS_CLAIM] = now_ms()
+    return refresh
+
+
+def rotate(raw_refresh):
+    """
+    refresh 토큰을 한 번 쓰고 (user, 새 refresh 토큰) 을 돌려준다.
+    만료/손상/폐기된 토큰이거나 사용자가 없으면 TokenError. 이미 쓴 토큰이면 세션 전체를 폐기하고 TokenError.
+    """
+    from .authentication import get_token_user
+
+    refresh = RefreshToken(raw_refresh)
+    if is_revoked(refresh):
+        raise TokenError('Token is revoked')
+    # add 는 원자적이므로 동시에 같은 토큰으로 요청해도 한 번만 성공한다
+    if not cache.add(jti_key(refresh['jti']), 1, remaining(refresh)):
+        revoke_session(refresh)
+        raise TokenError('Token is already used')
+    user = get_token_user(refresh)
+    if user is None:
+        raise TokenError('User not found or inactive')
+    return user, issue(user, sid=refresh.get(SESSION_CLAIM))
@@ -1,4 +1,7 @@
 import logging
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from buccl_back import refcache
 from .models import User, CertificateUpload, UserLevel
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
@@ -20,6 +23,8 @@ class UserSerializer(serializers.ModelSerializer):
             "is_staff",
             "is_admin",
         ]
+        # 비밀번호 해시는 응답에 내보내지 않는다 (principal 캐시에도 없음)
+        extra_kwargs = {"password": {"write_only": True}}
 
     def create(self, validated_data):
         user = User.objects.create_user(
@@ -33,7 +38,23 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class RegistrationConflict(Exception):
+    """이미 사용 중인 아이디/휴대폰번호/이메일로 가입하려 할 때. fields 는 겹친 컬럼 목록"""
+
+    def __init__(self, fields):
+        super().__init__(fields)
+        self.fields = fields
+
+
 class RegisterSerializer(serializers.ModelSerializer):
+    """
+    회원가입. 중복 확인은 INSERT 시 unique 인덱스에 맡기므로 검증 단계에서는 DB 를 조회하지 않는다.
+    (등급은 기준 데이터 캐시로 확인) 비밀번호 해시는 한 번만 만든다.
+    """
+    UNIQUE_FIELDS = ("user_id", "hp", "user_email")
+
+    level = serializers.IntegerField(required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = [
@@ -51,33 +72,41 @@ class RegisterSerializer(serializers.ModelSerializer):
             "privacy_accepted",
             "is_staff",
         ]
+        # 필드별 UniqueValidator 는 컬럼마다 SELECT 를 한 번씩 하므로 끄고, INSERT 의 IntegrityError 로 판단한다
+        extra_kwargs = {
+            "user_id": {"validators": []},
+            "hp": {"validators": []},
+            "user_email": {"validators": []},
+        }
+
+    def validate_level(self, level):
+        # 0 또는 빈 값은 등급 없음
+        if not level:
+            return None
+        if refcache.get("buccl_user.UserLevel", level) is None:
+            raise serializers.ValidationError("존재하지 않는 등급입니다.")
+        return level
 
-    def save(self, **kwargs):
-        logger.debug(
-            "RegisterSerializer save method called with data: %s", self.validated_data
-        )
-        level = self.validated_data.get("level", "0")  # 기본값을 '0'으로 설정
-        level = int(level)
-        is_staff = (
-            1 if self.validated_data.get("is_staff", 0) else 0
-        )  # 기본값을 '0'으로 설정
-        logger.debug("user info: %s", self.validated_data)
-        user = User.objects.create_user(
-            user_id=self.validated_data["user_id"],
-            password=self.validated_data["password"],
-            name=self.validated_data["name"],
-            user_email=self.validated_data["user_email"],
-            user_gender=self.validated_data["user_gender"],
-            user_birthday=self.validated_data["user_birthday"],
-            level=level,
-            hp=self.validated_data["hp"],
-            auth=self.validated_data["auth"],
-            terms_accepted=self.validated_data["terms_accepted"],
-            age_confirmed=self.validated_data["age_confirmed"],
-            privacy_accepted=self.validated_data["privacy_accepted"],
-            is_staff=is_staff,
-        )
-
+    def create(self, validated_data):
+        logger.debug("RegisterSerializer create: user_id=%s", validated_data.get("user_id"))
+        level_id = validated_data.pop("level", None)
+        password = validated_data.pop("password")
+        user = User(level_id=level_id, **validated_data)
+        user.set_password(password)
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            # 어느 값이 겹쳤는지는 충돌했을 때만 조회한다
+            values = {field: validated_data.get(field) for field in self.UNIQUE_FIELDS if validated_data.get(field)}
+            query = Q()
+            for field, value in values.items():
+                query |= Q(**{field: value})
+            fields = []
+            if query:
+                for row in User.objects.filter(query).values(*values):
+                    fields.extend(field for field, value in values.items() if row[field] == value and field not in fields)
+            raise RegistrationConflict(fields)
         return user
 
 
@@ -86,6 +115,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
         token["user_id"] = user.user_id  # 문자열 user_id
+        token["uid"] = user.pk  # principal 캐시 키 (buccl_user.principal)
         return token
 
 
@@ -124,6 +154,27 @@ class CertificateUploadSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class PendingCertificateSerializer(serializers.ModelSerializer):
+    user_id = serializers.CharField(source="user.user_id", read_only=True)
+    user_name = serializers.CharField(source="user.name", read_only=True)
+
+    class Meta:
+        model = CertificateUpload
+        fields = [
+            "id",
+            "user_id",
+            "user_name",
+            "certificate_name",
+            "certificate_file",
+            "preview",
+            "content_type",
+            "file_size",
+            "file_status",
+            "uploaded_at",
+        ]
+        read_only_fields = fields
+
+
 class UserLevelSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserLevel
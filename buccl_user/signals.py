@@ -1,9 +1,39 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
+from . import availability
+from .models import UserLevel
+from .principal import invalidate_principal
+
 @receiver(user_logged_out)
 def delete_token_on_logout(sender, request, user, **kwargs):
     response = request.META.get('HTTP_RESPONSE', None)
     if response:
         response.delete_cookie("access")
-        response.delete_cookie("refresh")
\ No newline at end of file
+        response.delete_cookie("refresh")
+
+# 인증 사용자(principal) 캐시 무효화 (buccl_user.principal)
+def invalidate_principals(pks):
+    # 이 요청에서 바로 반영되도록 지금 한 번, 커밋 전에 다른 워커가 예전 행을 다시 캐시했을 수 있으므로 커밋 후 한 번 더
+    for pk in pks:
+        invalidate_principal(pk)
+    transaction.on_commit(lambda: [invalidate_principal(pk) for pk in pks])
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_principal(sender, instance, **kwargs):
+    invalidate_principals([instance.pk])
+
+@receiver(pre_delete, sender=UserLevel)
+def invalidate_principals_on_level_delete(sender, instance, **kwargs):
+    # 등급 삭제 시 사용자의 level 은 SET_NULL 로 일괄 UPDATE 되어 User 시그널이 발생하지 않는다
+    invalidate_principals(list(instance.user_set.values_list('pk', flat=True)))
+
+# 가입 중복 확인 필터에 새 아이디/휴대폰번호/이메일 반영 (buccl_user.availability)
+@receiver(post_save, sender=get_user_model())
+def record_taken_values(sender, instance, update_fields=None, raw=False, **kwargs):
+    if not raw:
+        availability.record_user(instance, update_fields)
@@ -0,0 +1,190 @@
+"""
+문자 발송 (네이버 SENS)
+
+요청 처리 중에는 SENS 를 호출하지 않는다. send_verification_code() 는 커밋 후 프로세스 내 발송 큐(SMSDispatcher)에 넣기만 하고,
+백그라운드 스레드가 큐에 쌓인 문자를 한 번의 SENS 호출(messages 배열, 최대 SMS_BATCH_SIZE 건)로 묶어 보낸다.
+
+- SensClient 는 requests.Session(keep-alive 커넥션 풀)을 재사용하고, 연결 실패/timeout/429/5xx 는 지수 백오프로 재시도한다.
+- 발송 실패는 로그만 남긴다. (인증번호는 이미 저장되어 있으므로 사용자는 재요청할 수 있다)
+- 큐는 프로세스 메모리에 있으므로 워커가 종료되면 아직 보내지 못한 문자는 사라진다.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger('django')
+
+DEFAULT_BASE_URL = 'https://sens.apigw.ntruss.com'
+VERIFICATION_MESSAGE = "[버킷리스트 클래스] 인증 번호 [{}]를 입력해주세요."
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class SensError(Exception):
+    pass
+
+
+class SensClient:
+    def __init__(self, access_key, secret_key, service_id, sender, base_url=DEFAULT_BASE_URL,
+                 connect_timeout=3, read_timeout=10, pool_maxsize=4, max_retries=3, backoff=0.5, sleep=time.sleep):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.sender = sender
+        self.base_url = base_url.rstrip('/')
+        self.uri = f"/sms/v2/services/{service_id}/messages"
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        # 재시도는 send() 에서 직접 한다 (백오프/로그)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def signature(self, timestamp, method='POST'):
+        message = f"{method} {self.uri}\n{timestamp}\n{self.access_key}".encode('utf-8')
+        return base64.b64encode(hmac.new(self.secret_key.encode('utf-8'), message, digestmod=hashlib.sha256).digest()).decode()
+
+    def send(self, messages):
+        """messages: [(수신번호, 내용), ...] 을 한 번의 요청으로 보낸다. 응답 JSON 반환, 실패 시 SensError"""
+        body = json.dumps({
+            "type": "SMS",
+            "contentType": "COMM",
+            "from": self.sender,
+            # 메시지별 content 가 없을 때 쓰이는 기본 내용 (필수 항목)
+            "content": messages[0][1],
+            "messages": [{"to": to, "content": content} for to, content in messages],
+        })
+        attempt = 0
+        while True:
+            timestamp = str(int(time.time() * 1000))
+            headers = {
+                "Content-Type": "application/json; charset=utf-8",
+                "x-ncp-apigw-timestamp": timestamp,
+                "x-ncp-iam-access-key": self.access_key,
+                "x-ncp-apigw-signature-v2": self.signature(timestamp),
+            }
+            try:
+                response = self.session.post(self.base_url + self.uri, headers=headers, data=body, timeout=self.timeout)
+                retriable = response.status_code in RETRY_STATUS_CODES
+                error = None if response.status_code < 300 else f"HTTP {response.status_code}: {response.text[:200]}"
+            except requests.RequestException as e:
+                retriable, error = True, str(e)
+            if error is None:
+                return response.json()
+            if not retriable or attempt >= self.max_retries:
+                raise SensError(f"SENS 발송 실패 ({len(messages)}건, 시도 {attempt + 1}회): {error}")
+            delay = self.backoff * 2 ** attempt
+            logger.warning(f"SENS 발송 재시도 {attempt + 1}/{self.max_retries}, {delay:.1f}s 후: {error}")
+            self.sleep(delay)
+            attempt += 1
+
+
+class SMSDispatcher:
+    """
+    발송 큐와 백그라운드 스레드. 첫 문자가 들어오면 linger 초 동안 더 기다렸다가 batch_size 건까지 묶어 보낸다.
+    스레드는 처음 enqueue 할 때 (fork 된 워커라면 그 프로세스에서) 시작한다.
+    """
+
+    def __init__(self, client, batch_size=100, linger=0.05):
+        self.client = client
+        self.batch_size = batch_size
+        self.linger = linger
+        self.queue = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, to, content):
+        self._ensure_thread()
+        self.queue.put((to, content))
+
+    def flush(self, timeout=5):
+        """큐에 있는 문자를 모두 처리할 때까지 기다린다. (테스트/종료 시)"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self.queue.unfinished_tasks
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='sms-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.client.send(batch)
+                self.sent += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"SMS 발송 실패: to={[to for to, _ in batch]}, error={e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """settings 기반으로 생성한 프로세스 공용 발송 큐"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                client = SensClient(
+                    access_key=settings.NAVER_SENS_ACCESS_KEY,
+                    secret_key=settings.NAVER_SENS_SECRET_KEY,
+                    service_id=settings.NAVER_SENS_SERVICE_ID,
+                    sender=settings.NAVER_SENS_SENDER,
+                    base_url=getattr(settings, 'NAVER_SENS_BASE_URL', DEFAULT_BASE_URL),
+                    connect_timeout=getattr(settings, 'SMS_CONNECT_TIMEOUT', 3),
+                    read_timeout=getattr(settings, 'SMS_READ_TIMEOUT', 10),
+                    max_retries=getattr(settings, 'SMS_MAX_RETRIES', 3),
+                )
+                _dispatcher = SMSDispatcher(
+                    client,
+                    batch_size=getattr(settings, 'SMS_BATCH_SIZE', 100),
+                    linger=getattr(settings, 'SMS_BATCH_LINGER_SECONDS', 0.05),
+                )
+    return _dispatcher
+
+
+def send_verification_code(hp, code):
+    """인증번호 문자를 트랜잭션 커밋 후 발송 큐에 넣는다. (롤백되면 보내지 않음)"""
+    content = VERIFICATION_MESSAGE.format(code)
+    transaction.on_commit(lambda: get_dispatcher().enqueue(hp, content))
@@ -1,7 +1,33 @@
-from datetime import datetime
+import io
+import json
 import logging
-from django.test import TestCase
-from .models import AuthSMS
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from buccl_back.ratelimit import client_ip, hit
+from . import availability, revocation
+from .authentication import JWTCookieAuthentication
+from .certificates import validate_certificate
+from .fake_sens import FakeSens
+from .models import AuthSMS, CertificateUpload, User, UserLevel
+from .principal import Principal, get_principal
+from .serializers import CustomTokenObtainPairSerializer
+from .sms import SMSDispatcher, SensError
 
 logger = logging.getLogger('django')
 
@@ -16,5 +42,338 @@ class SMSUnitTest(TestCase):
         logger.debug("auth_sms : %s", self.auth_sms.__dict__)
         self.assertEqual(self.auth_sms.hp, self.p_number)
         self.assertTrue(AuthSMS.check_auth_number(self.p_number, self.a_number))
+        # 인증된 번호는 한 번만 쓸 수 있다
+        self.assertEqual(AuthSMS.verify(self.p_number, self.a_number), AuthSMS.NOT_FOUND)
         self.assertFalse(AuthSMS.check_auth_number(self.p_number, self.wrong_a_number))
 
+    @override_settings(AUTH_SMS_MAX_ATTEMPTS=2)
+    def test_expiry_and_attempts(self):
+        self.assertEqual(AuthSMS.verify("01000000000", self.a_number), AuthSMS.NOT_FOUND)
+        for _ in range(2):
+            self.assertEqual(AuthSMS.verify(self.p_number, self.wrong_a_number), AuthSMS.MISMATCH)
+        # 틀린 횟수를 넘으면 맞는 번호도 받지 않는다
+        self.assertEqual(AuthSMS.verify(self.p_number, self.a_number), AuthSMS.TOO_MANY_ATTEMPTS)
+
+        response = self.client.post("/server/buccl_user/api/v1/auth-check/", {"hp": self.p_number, "auth": "1"})
+        self.assertNotIn("auth", response.json())
+
+        AuthSMS.objects.filter(pk=self.p_number).update(expires_at=datetime.now() - timedelta(seconds=1))
+        self.assertEqual(AuthSMS.verify(self.p_number, self.a_number), AuthSMS.EXPIRED)
+        AuthSMS.objects.create(hp="01000000000")
+        call_command("purge_auth_sms", stdout=StringIO())
+        self.assertEqual(list(AuthSMS.objects.values_list("hp", flat=True)), ["01000000000"])
+
+
+class JWTCookieAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(user_id="diver", password="pw", hp="01011112222", auth=None, name="다이버")
+        self.refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+        self.url = reverse("buccl_user:user_info", args=["diver"])
+
+    def test_request_user_matches_row(self):
+        User.objects.filter(pk=self.user.pk).update(user_email="diver@example.com", is_staff=True, is_admin=False)
+        fields = ("user_id", "name", "hp", "user_email", "is_staff", "is_admin", "is_superuser")
+        row = User.objects.filter(pk=self.user.pk).values(*fields).get()
+        request = RequestFactory().get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+        # 첫 요청은 DB 에서, 두 번째 요청은 캐시에서 읽는다
+        for _ in range(2):
+            user, _token = JWTCookieAuthentication().authenticate(request)
+            self.assertEqual({field: getattr(user, field) for field in fields}, row)
+
+    def test_bearer_and_cookie_use_cached_user(self):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.refresh.access_token}"}
+        self.assertEqual(self.client.get(self.url, **headers).json()["name"], "다이버")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, **headers).status_code, 200)
+            self.client.cookies["access"] = str(self.refresh.access_token)
+            self.assertEqual(self.client.get("/server/buccl_user/auth/").json()["user_id"], "diver")
+
+        self.user.name = "프리다이버"
+        self.user.save()
+        self.assertEqual(self.client.get(self.url, **headers).json()["name"], "프리다이버")
+
+    def test_rejected_tokens(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer broken").status_code, 401)
+        # Basic 헤더는 더 이상 인증에 쓰이지 않는다 (요청마다 비밀번호 해시 계산 없음)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Basic ZGl2ZXI6cHc=").status_code, 400)
+
+        expired = self.refresh.access_token
+        expired.set_exp(lifetime=-timedelta(seconds=1))
+        self.client.cookies["access"] = str(expired)
+        self.client.cookies["refresh"] = str(self.refresh)
+        response = self.client.get("/server/buccl_user/auth/")
+        self.assertEqual(response.json()["user_id"], "diver")
+        self.assertNotEqual(response.cookies["access"].value, str(expired))
+
+    def test_principal_snapshot_and_invalidation(self):
+        level = UserLevel.objects.create(level=11, name="프리다이빙 일반")
+        self.user.level = level
+        self.user.save()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.refresh.access_token}"}
+        profile = self.client.get(self.url, **headers).json()
+        self.assertEqual(profile["level"], level.pk)
+        self.assertNotIn("password", profile)
+        self.assertFalse(hasattr(get_principal(self.user.pk), "__dict__"))
+
+        # 등급 삭제(level SET_NULL 일괄 UPDATE)도 캐시를 무효화한다
+        level.delete()
+        self.assertIsNone(self.client.get(self.url, **headers).json()["level"])
+
+        # uid 클레임이 없는 이전 토큰도 받는다
+        legacy = self.refresh.access_token
+        del legacy["uid"]
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {legacy}").status_code, 200)
+        self.assertTrue(Principal.from_user(self.user).as_user().check_password("pw"))
+
+
+class SMSDispatchTest(TestCase):
+    def test_batched_send_with_retry(self):
+        with FakeSens() as fake:
+            fake.fail_next = [503]
+            dispatcher = SMSDispatcher(fake.client(), batch_size=100, linger=0.2)
+            for i in range(3):
+                dispatcher.enqueue(f"0101234000{i}", f"인증 번호 [{i}]")
+            self.assertTrue(dispatcher.flush())
+            # 실패 1회 + 재시도 1회, 세 건이 한 번의 호출로 묶인다
+            self.assertEqual((fake.calls, len(fake.messages), dispatcher.sent), (2, 3, 3))
+
+            fake.fail_next = [400]
+            with self.assertRaises(SensError):
+                fake.client().send([("01000000000", "x")])
+
+    def test_auth_view_does_not_wait_for_sens(self):
+        with FakeSens() as fake:
+            fake.delays[fake.client().uri] = 1  # SENS 응답 1초 지연
+            dispatcher = SMSDispatcher(fake.client(), linger=0)
+            with patch("buccl_user.sms.get_dispatcher", return_value=dispatcher):
+                started = time.perf_counter()
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post("/server/buccl_user/api/v1/auth-message/", {"hp": "01099998888"})
+                self.assertEqual(response.status_code, 200)
+                self.assertLess(time.perf_counter() - started, 0.5)
+                self.assertTrue(dispatcher.flush())
+            code = AuthSMS.objects.get(hp="01099998888").auth
+            self.assertEqual(fake.messages, [{"to": "01099998888", "content": f"[버킷리스트 클래스] 인증 번호 [{code}]를 입력해주세요."}])
+
+
+class TokenRevocationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocation._recent.clear()
+        self.user = User.objects.create_user(user_id="surfer", password="pw", hp=None, auth=None, name="서퍼")
+        self.url = reverse("buccl_user:user_info", args=["surfer"])
+
+    def bearer(self, refresh):
+        return {"HTTP_AUTHORIZATION": f"Bearer {refresh.access_token}"}
+
+    def test_rotation_and_reuse(self):
+        first = revocation.issue(self.user)
+        response = self.client.post(reverse("buccl_user:token_refresh"), {"refresh": str(first)})
+        second = RefreshToken(response.json()["refresh"])
+        self.assertEqual(second["sid"], first["sid"])
+        self.assertEqual(self.client.get(self.url, **self.bearer(second)).status_code, 200)
+
+        # 이미 쓴 refresh 토큰이 다시 오면 세션 전체 폐기
+        self.assertEqual(self.client.post(reverse("buccl_user:token_refresh"), {"refresh": str(first)}).status_code, 401)
+        self.assertEqual(self.client.get(self.url, **self.bearer(second)).status_code, 401)
+
+    def test_logout_and_logout_all(self):
+        phone, laptop = revocation.issue(self.user), revocation.issue(self.user)
+        self.client.cookies["refresh"] = str(phone)
+        self.client.delete("/server/buccl_user/auth/")
+        self.assertEqual(self.client.get(self.url, **self.bearer(phone)).status_code, 401)
+        self.assertEqual(self.client.get(self.url, **self.bearer(laptop)).status_code, 200)
+
+        self.assertEqual(self.client.post(reverse("buccl_user:logout_all"), **self.bearer(laptop)).status_code, 202)
+        self.assertEqual(self.client.get(self.url, **self.bearer(laptop)).status_code, 401)
+        with self.assertRaises(TokenError):
+            revocation.rotate(str(laptop))
+
+    def test_login_in_same_second_as_logout_all_survives(self):
+        # 같은 초(iat 가 같은) 안에서 로그아웃 전 발급, 로그아웃, 재로그인
+        with patch.object(revocation, "now_ms", side_effect=[1700000000200, 1700000000400, 1700000000700]):
+            old = revocation.issue(self.user)
+            revocation.revoke_user(self.user.pk)
+            new = revocation.issue(self.user)
+        self.assertTrue(revocation.is_revoked(old.access_token))
+        self.assertFalse(revocation.is_revoked(new.access_token))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class CertificateUploadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(user_id="coach", password="pw", hp=None, auth=None, name="코치")
+        self.admin = User.objects.create_user(user_id="ops", password="pw", hp=None, auth=None, name="운영자", is_admin=True)
+
+    def bearer(self, user):
+        return {"HTTP_AUTHORIZATION": f"Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}"}
+
+    def upload(self, name, content):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse("buccl_user:certificate-upload"),
+                {"certificate_name": name, "certificate_file": SimpleUploadedFile(f"{name}.png", content)},
+                **self.bearer(self.user),
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(callbacks), 1)  # 검증은 커밋 후 백그라운드로
+        return CertificateUpload.objects.get(certificate_name=name)
+
+    def test_background_validation_and_pending_queue(self):
+        image = io.BytesIO()
+        Image.new("RGB", (800, 600), "blue").save(image, format="PNG")
+        valid = self.upload("freediving", image.getvalue())
+        fake = self.upload("fake", b"not really a png")
+        self.assertEqual(valid.file_status, CertificateUpload.FILE_PENDING)
+
+        self.assertEqual(validate_certificate(valid.pk), CertificateUpload.FILE_VALID)
+        self.assertEqual(validate_certificate(fake.pk), CertificateUpload.FILE_INVALID)
+        valid.refresh_from_db()
+        fake.refresh_from_db()
+        self.assertEqual((valid.content_type, bool(valid.preview)), ("image/png", True))
+        self.assertEqual(fake.review_status, CertificateUpload.REVIEW_REJECTED)
+
+        url = reverse("buccl_user:certificate-pending")
+        self.assertEqual(self.client.get(url, **self.bearer(self.user)).status_code, 403)
+        response = self.client.get(url, **self.bearer(self.admin)).json()
+        self.assertEqual([row["id"] for row in response["results"]], [valid.pk])
+
+
+class UserImportExportTest(TestCase):
+    def test_import_skips_existing_and_export_streams_summaries(self):
+        User.objects.create_user(user_id="existing", password="pw", hp="01077770000", auth=None, name="기존 회원")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("user_id,password,name,hp,terms_accepted\n")
+            f.write("partner1,pw1,제휴 회원1,01077770001,1\n")
+            f.write("partner2,,제휴 회원2,01077770000,1\n")  # 이미 가입된 휴대폰번호
+            f.write("existing,pw3,제휴 회원3,,1\n")
+        call_command("import_users", f.name, "--workers", "1", stdout=StringIO(), stderr=StringIO())
+        os.unlink(f.name)
+        self.assertEqual(sorted(User.objects.values_list("user_id", flat=True)), ["existing", "partner1"])
+        self.assertTrue(User.objects.get(user_id="partner1").check_password("pw1"))
+
+        out = StringIO()
+        call_command("export_users", "--format", "jsonl", "--chunk-size", "1", stdout=out, stderr=StringIO())
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["user_id"] for row in rows], ["existing", "partner1"])
+        self.assertEqual((rows[1]["certificate_count"], rows[1]["ticket_count"]), (0, 0))
+
+    def test_import_falls_back_to_single_rows_on_repeated_conflicts(self):
+        bulk_create = User.objects.bulk_create
+        calls = []
+
+        def conflicting(users, *args, **kwargs):
+            # 재조회로도 못 거른 동시 가입을 흉내: 배치 저장은 두 번 다 실패, 한 건씩은 partner2 만 실패
+            calls.append(len(users))
+            if len(calls) <= 2 or users[0].user_id == "partner2":
+                raise IntegrityError("Duplicate entry")
+            return bulk_create(users, *args, **kwargs)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+            f.write('{"user_id": "partner1", "password": "pw1", "name": "제휴 회원1", "terms_accepted": true}\n')
+            f.write('["not", "an", "object"]\n')
+            f.write('{"user_id": "partner2", "password": "pw2", "name": "제휴 회원2", "terms_accepted": true}\n')
+            f.write('{"user_id": "PARTNER1", "password": "pw3", "name": "제휴 회원3", "terms_accepted": true}\n')
+        report = f.name + ".report.csv"
+        with patch.object(User.objects, "bulk_create", side_effect=conflicting):
+            call_command("import_users", f.name, "--workers", "1", "--report", report, stdout=StringIO(), stderr=StringIO())
+        with open(report, encoding="utf-8") as r:
+            failed_lines = [row.split(",")[0] for row in r.read().splitlines()[1:]]
+        os.unlink(f.name)
+        os.unlink(report)
+        self.assertEqual(calls, [2, 2, 1, 1])
+        self.assertEqual(list(User.objects.values_list("user_id", flat=True)), ["partner1"])
+        self.assertEqual(sorted(failed_lines), ["2", "3", "4"])
+
+
+class RegisterTest(TestCase):
+    def test_single_insert_and_hash(self):
+        data = {"user_id": "newbie", "password": "pw", "name": "새 회원", "hp": "01034343434", "level": "0",
+                "terms_accepted": 1, "age_confirmed": 1, "privacy_accepted": 1}
+        # 비밀번호 해시(PBKDF2) 는 저장 시 한 번만
+        with patch.object(PBKDF2PasswordHasher, "encode", autospec=True, side_effect=PBKDF2PasswordHasher.encode) as hashed:
+            # SAVEPOINT, INSERT, RELEASE
+            with self.assertNumQueries(3):
+                response = self.client.post("/server/buccl_user/register/", data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(hashed.call_count, 1)
+        self.assertIn("access", response.cookies)
+        self.assertTrue(User.objects.get(user_id="newbie").check_password("pw"))
+
+        response = self.client.post("/server/buccl_user/register/", {**data, "user_id": "other"})
+        self.assertEqual((response.status_code, response.json()["code"], response.json()["fields"]), (400, "1005", ["hp"]))
+
+
+class AvailabilityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        availability._state = {}
+        User.objects.create_user(user_id="taken", password="pw", hp="01012121212", auth=None, name="가입자")
+
+    def test_batched_check_skips_db_for_free_values(self):
+        url = reverse("buccl_user:availability")
+        response = self.client.post(url, {"user_id": ["taken", "free"], "hp": "01012121212"}, content_type="application/json")
+        self.assertEqual(response.json()["result"], {"user_id": {"taken": False, "free": True}, "hp": {"01012121212": False}})
+
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {"user_id": [f"free{i}" for i in range(10)]}, content_type="application/json")
+        self.assertTrue(all(response.json()["result"]["user_id"].values()))
+
+        # 새 가입자는 재구축 없이 바로 반영
+        User.objects.create_user(user_id="free3", password="pw", hp=None, auth=None, name="새 가입자")
+        self.assertEqual(self.client.post("/server/buccl_user/api/v1/id-validation/", {"user_id": "free3"}).json()["code"], "0002")
+        self.assertEqual(self.client.post(url, {}, content_type="application/json").status_code, 400)
+
+    def test_non_string_and_case_variants(self):
+        # 숫자로 온 값도 문자열로 확인한다
+        response = self.client.post("/server/buccl_user/api/v1/hp-validation/", {"hp": 1012121212}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        # MySQL collation 처럼 대소문자만 다른 값은 필터에서 걸러지지 않고 DB 로 확인된다
+        self.assertIn(availability.normalize("TAKEN"), availability.filters()["user_id"])
+        with patch.object(User.objects, "filter") as query:
+            query.return_value.values_list.return_value = [("taken",)]  # 운영 DB 는 'Taken' 으로 'taken' 행을 찾는다
+            self.assertTrue(availability.is_taken("user_id", "Taken"))
+
+@override_settings(RATELIMITS={"sms_send": [("data:hp", "2/m")], "sms_check": [("data:hp", "2/m")], "login": [("ip", "3/m")]})
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sliding_window(self):
+        self.assertEqual([hit("t", "ip", "1.1.1.1", 2, 60, now=t)[0] for t in (0, 1, 2)], [True, True, False])
+        # 다음 창 초반에는 이전 창의 횟수가 거의 그대로 반영된다
+        allowed, retry_after = hit("t", "ip", "1.1.1.1", 2, 60, now=61)
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+        self.assertTrue(hit("t", "ip", "1.1.1.1", 2, 60, now=170)[0])
+
+    def test_rejected_before_db_and_hash_work(self):
+        url = "/server/buccl_user/api/v1/auth-message/"
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"hp": "01011110000"}).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {"hp": "01011110000"})
+        self.assertEqual((response.status_code, response.json()["code"]), (429, "1012"))
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(self.client.post(url, {"hp": "01022220000"}).status_code, 200)
+
+        with patch("buccl_user.views.authenticate", return_value=None) as authenticate:
+            codes = [self.client.post("/server/buccl_user/auth/", {"user_id": "x", "password": "y"}).status_code for _ in range(4)]
+        self.assertEqual(codes, [400, 400, 400, 429])
+        self.assertEqual(authenticate.call_count, 3)
+
+    @override_settings(RATELIMIT_IP_HEADER="X-Forwarded-For", RATELIMIT_TRUSTED_PROXY_COUNT=2)
+    def test_client_ip_ignores_spoofed_hops(self):
+        request = RequestFactory().get("/", HTTP_X_FORWARDED_FOR="6.6.6.6, 1.2.3.4, 10.0.0.1", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(client_ip(request), "1.2.3.4")
+        # 프록시 수보다 값이 적으면 헤더를 믿지 않는다
+        self.assertEqual(client_ip(RequestFactory().get("/", HTTP_X_FORWARDED_FOR="1.2.3.4", REMOTE_ADDR="10.0.0.2")), "10.0.0.2")
+
+    def test_query_params_key(self):
+        # GET 인증번호 확인은 본문이 없으므로 쿼리 파라미터의 hp 로 센다
+        url = "/server/buccl_user/api/v1/auth-message/"
+        codes = [self.client.get(url, {"hp": "01011110000", "auth": str(i)}).status_code for i in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+        self.assertEqual(self.client.get(url, {"hp": "01022220000", "auth": "1"}).status_code, 200)
@@ -1,7 +1,6 @@
 from . import views
 
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 
 app_name = "buccl_user"
 
@@ -11,13 +10,17 @@ urlpatterns = [
     path(
         "auth/", views.AuthAPIView.as_view()
     ),  # post - 로그인, delete - 로그아웃, get - 유저정보
-    path("auth/refresh/", TokenRefreshView.as_view()),  # jwt 토큰 재발급
+    path("auth/refresh/", views.TokenRefreshAPIView.as_view(), name="token_refresh"),  # jwt 토큰 재발급 (refresh 토큰 회전)
+    path("auth/logout-all/", views.LogoutAllView.as_view(), name="logout_all"),  # 모든 기기에서 로그아웃
     path(
         "api/v1/id-validation/", views.IdValidation.as_view(), name="id_validataion"
     ),  # id validation
     path(
         "api/v1/hp-validation/", views.HPValidation.as_view(), name="hp_validation"
     ),  # hp validation
+    path(
+        "api/v1/availability/", views.AvailabilityView.as_view(), name="availability"
+    ),  # user_id/hp/user_email 중복 일괄 확인
     path(
         "api/v1/auth-message/", views.AuthView.as_view(), name="auth_message"
     ),  # hp 인증번호 전송 및 저장
@@ -44,5 +47,10 @@ urlpatterns = [
         views.CertificateReUploadView.as_view(),
         name="certificate-reupload",
     ),  # 자격증 재등록 (유저가 반려된 자격증 다시 업로드)
+    path(
+        "api/v1/certificates/pending/",
+        views.PendingCertificateListView.as_view(),
+        name="certificate-pending",
+    ),  # 승인 대기 자격증 목록 (운영자 전용)
     path("api/v1/user_levels/", views.UserLevelsView.as_view(), name="user_level"),  # 유저 레벨 목록
 ]
@@ -1,13 +1,21 @@
 import jwt
 from django.conf import settings
-from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import status
 
+from buccl_user.authentication import ACCESS_COOKIE
+
+
 def get_user_from_token(request):
-    # 헤더가 아니라 쿠키에서 토큰을 가져오도록 수정
-    token = request.COOKIES.get('access')
+    """
+    (user, None) 또는 (None, 오류 Response).
+    토큰 검증과 사용자 조회는 기본 인증 클래스(JWTCookieAuthentication)가 이미 했으므로 request.user 를 사용한다.
+    인증되지 않은 경우에만 토큰을 다시 확인해 만료/손상 여부를 구분한다.
+    """
+    if request.user and request.user.is_authenticated:
+        return request.user, None
+
+    token = request.COOKIES.get(ACCESS_COOKIE)
     if not token:
         return None, Response(
             {"message": "로그인이 필요합니다.", "code": "1001"}, 
@@ -15,24 +23,16 @@ def get_user_from_token(request):
         )
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-        user_id = payload.get('user_id')
-        User = get_user_model()
-        user = get_object_or_404(User, user_id=user_id)
-        return user, None
-
+        jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
     except jwt.ExpiredSignatureError:
         return None, Response(
             {"message": "토큰이 만료되었습니다.", "code": "1002"}, 
             status=status.HTTP_401_UNAUTHORIZED
         )
     except jwt.InvalidTokenError:
-        return None, Response(
-            {"message": "유효하지 않은 토큰입니다.", "code": "1003"}, 
-            status=status.HTTP_401_UNAUTHORIZED
-        )
-    except Exception as e:
-        return None, Response(
-            {"message": str(e), "code": "1007"}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        pass
+    # 서명은 맞지만 사용자가 없거나 비활성화된 경우 포함
+    return None, Response(
+        {"message": "유효하지 않은 토큰입니다.", "code": "1003"}, 
+        status=status.HTTP_401_UNAUTHORIZED
+    )
@@ -0,0 +1,28 @@
+"""
+비밀번호 해시 프로세스 풀 (import_users)
+
+spawn 워커는 이 모듈만 import 하므로 모델을 import 하지 않는다. 워커는 시작할 때 django.setup() 으로 settings 를 읽는다.
+fork 하면 열려 있는 DB 커넥션을 자식이 물려받으므로 spawn 을 사용한다.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def hash_password(raw_password):
+    """비밀번호가 없으면 로그인할 수 없는 값"""
+    return make_password(raw_password or None)
+
+
+def password_pool(workers):
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+    )
@@ -4,7 +4,7 @@ import jwt, logging
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from django.contrib.auth import authenticate, get_user_model
 from django.utils import timezone  # timezone 추가
@@ -13,11 +13,18 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.db import transaction
 
 from buccl_back.settings import SECRET_KEY
+from buccl_back import refcache
 from buccl_back.error_code import ErrorCode
+from buccl_back.ratelimit import ratelimit
+from buccl_back.pagination import KeysetPagination
+from buccl_back.permissions import IsAdministrator
 from .utils.jwt_auth import get_user_from_token
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 from .serializers import *
 from .models import UserLevel, AuthSMS
+from . import availability, certificates, revocation
 
 logger = logging.getLogger("django")
 
@@ -25,42 +32,35 @@ logger = logging.getLogger("django")
 def test_view(request):
     return render(request, 'test.html')
 
+def set_token_cookies(response, refresh):
+    access_token = str(refresh.access_token)
+    response.set_cookie("access", access_token, httponly=True)
+    response.set_cookie("refresh", str(refresh), httponly=True)
+    return response
+
 class AuthAPIView(APIView):
     @UserSchema.user_auth_info
     def get(self, request):
+        # access 토큰 검증/사용자 조회는 기본 인증 클래스(JWTCookieAuthentication)가 처리한다
+        if request.user.is_authenticated:
+            serializer = UserSerializer(instance=request.user)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
         try:
-            logger.debug(f"request.COOKIES: {request.COOKIES}")
-            # access token을 decode 해서 유저 id 추출 => 유저 식별
-            access = request.COOKIES['access']
-            payload = jwt.decode(access, SECRET_KEY, algorithms=['HS256'])
-            pk = payload.get('user_id')
-            user = get_object_or_404(User, pk=pk)
+            if not request.COOKIES.get('access') or not request.COOKIES.get('refresh'):
+                raise jwt.exceptions.InvalidTokenError
+            # access 토큰이 만료되었거나 사용할 수 없으면 refresh 토큰으로 갱신 (refresh 토큰도 새로 발급)
+            logger.debug("AuthAPIView access token not accepted, refreshing")
+            user, refresh = revocation.rotate(request.COOKIES['refresh'])
             serializer = UserSerializer(instance=user)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_token_cookies(Response(serializer.data, status=status.HTTP_200_OK), refresh)
 
-        except(jwt.exceptions.ExpiredSignatureError):
-            # 토큰 만료 시 토큰 갱신
-            logger.debug("AuthAPIView ExpiredSignatureError")
-            data = {'refresh': request.COOKIES.get('refresh', None)}
-            serializer = TokenRefreshSerializer(data=data)
-            if serializer.is_valid(raise_exception=True):
-                access = serializer.data.get('access', None)
-                refresh = serializer.data.get('refresh', None)
-                payload = jwt.decode(access, SECRET_KEY, algorithms=['HS256'])
-                pk = payload.get('user_id')
-                user = get_object_or_404(User, pk=pk)
-                serializer = UserSerializer(instance=user)
-                res = Response(serializer.data, status=status.HTTP_200_OK)
-                res.set_cookie('access', access)
-                res.set_cookie('refresh', refresh)
-                return res
-            raise jwt.exceptions.InvalidTokenError
-
-        except(jwt.exceptions.InvalidTokenError):
+        except(jwt.exceptions.InvalidTokenError, TokenError):
             # 사용 불가능한 토큰일 때
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
     @UserSchema.user_login
+    @ratelimit('login')
     def post(self, request):
     	# 유저 인증 self.request, username=user_id, password=password
         logger.debug(f"request.data: {request.data}, self.request: {self.request}")
@@ -68,8 +68,8 @@ class AuthAPIView(APIView):
         # 이미 회원가입 된 유저일 때
         if user is not None:
             serializer = UserSerializer(user)
-            # jwt 토큰 접근
-            token = CustomTokenObtainPairSerializer.get_token(user)
+            # jwt 토큰 접근 (새 세션)
+            token = revocation.issue(user)
             refresh_token = str(token)
             access_token = str(token.access_token)
             
@@ -108,7 +108,47 @@ class AuthAPIView(APIView):
 
     # 로그아웃
     def delete(self, request):
-        # 쿠키에 저장된 토큰 삭제 => 로그아웃 처리
+        # 이 세션의 토큰을 폐기하고 쿠키 삭제 => 로그아웃 처리
+        for raw_token, token_class in ((request.COOKIES.get('refresh'), RefreshToken), (request.COOKIES.get('access'), AccessToken)):
+            if not raw_token:
+                continue
+            try:
+                revocation.revoke_session(token_class(raw_token))
+            except TokenError:  # 만료/손상된 토큰은 폐기할 필요 없음
+                pass
+        response = Response({
+            "code" : "0000",
+            "message": "Logout success"
+            }, status=status.HTTP_202_ACCEPTED)
+        response.delete_cookie("access")
+        response.delete_cookie("refresh")
+        return response
+
+class TokenRefreshAPIView(APIView):
+    '''
+    refresh 토큰(본문 또는 쿠키)으로 access/refresh 토큰 재발급. 쓴 refresh 토큰은 다시 쓸 수 없다.
+    '''
+    authentication_classes = []
+
+    def post(self, request):
+        raw_refresh = request.data.get('refresh') or request.COOKIES.get('refresh')
+        if not raw_refresh:
+            return Response(ErrorCode.MISSING_REQUIRED_FIELD, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            user, refresh = revocation.rotate(raw_refresh)
+        except TokenError:
+            return Response(ErrorCode.INVALID_TOKEN, status=status.HTTP_401_UNAUTHORIZED)
+        res = Response({"access": str(refresh.access_token), "refresh": str(refresh)}, status=status.HTTP_200_OK)
+        return set_token_cookies(res, refresh)
+
+class LogoutAllView(APIView):
+    '''
+    모든 기기에서 로그아웃. 지금까지 발급된 이 사용자의 access/refresh 토큰을 모두 폐기한다.
+    '''
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return Response(ErrorCode.AUTHORIZATION_HEADER_MISSING, status=status.HTTP_401_UNAUTHORIZED)
+        revocation.revoke_user(request.user.pk)
         response = Response({
             "code" : "0000",
             "message": "Logout success"
@@ -118,52 +158,15 @@ class AuthAPIView(APIView):
         return response
 
 class RegisterAPIView(APIView):
+    '''
+    회원가입 후 바로 로그인 처리(JWT 발급)
+    중복 확인은 INSERT 의 unique 인덱스로 하고, 비밀번호 해시는 한 번만 만든다. (authenticate 로 다시 확인하지 않음)
+    '''
     @UserSchema.user_register
     def post(self, request):
-        logger.debug(f"RegisterAPIView request.data: {request.data}")
-        if User.objects.filter(user_id=request.data['user_id']).exists():   # 중복 아이디 체크
-            return Response(
-                ErrorCode.ALREADY_REGISTERED,
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
+        logger.debug(f"RegisterAPIView user_id: {request.data.get('user_id')}")
         serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():   # 유효성 검증
-            user = serializer.save()
-            logger.debug(f"RegisterAPIView saved user: {user}")
-            
-            
-        user = authenticate(username=request.data.get("user_id"), password=request.data.get("password"))
-        # 유효성 통과 후 저장된 유저일 때
-        if user is not None:
-            serializer = UserSerializer(user)
-            # jwt 토큰 접근
-            token = CustomTokenObtainPairSerializer.get_token(user)
-            refresh_token = str(token)
-            access_token = str(token.access_token)
-
-            # 사용자가 관리자인지 확인하고 level 설정(superuser일 경우 관리자로 설정)
-            if user.is_superuser or user.is_admin:
-                user.is_admin = True
-                user.save()
-
-            res = Response(
-                {
-                    "code": "0000",
-                    "message": "Login success",
-                    "user": serializer.data,
-                    "token": {
-                        "access": access_token,
-                        "refresh": refresh_token,
-                    },
-                },
-                status=status.HTTP_200_OK,
-            )
-            # jwt 토큰 => 쿠키에 저장
-            res.set_cookie("access", access_token, httponly=True)
-            res.set_cookie("refresh", refresh_token, httponly=True)
-            return res
-        else:
+        if not serializer.is_valid():   # 유효성 검증
             return Response(
                 {
                     "message": "회원가입 실패",
@@ -172,6 +175,35 @@ class RegisterAPIView(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        try:
+            user = serializer.save()
+        except RegistrationConflict as e:   # 중복 아이디/휴대폰번호/이메일
+            return Response(
+                {**ErrorCode.ALREADY_REGISTERED, "fields": e.fields},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        logger.debug(f"RegisterAPIView saved user: {user}")
+
+        # 저장한 인스턴스로 바로 jwt 토큰 발급
+        token = revocation.issue(user)
+        refresh_token = str(token)
+        access_token = str(token.access_token)
+        res = Response(
+            {
+                "code": "0000",
+                "message": "Login success",
+                "user": UserSerializer(user).data,
+                "token": {
+                    "access": access_token,
+                    "refresh": refresh_token,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+        # jwt 토큰 => 쿠키에 저장
+        res.set_cookie("access", access_token, httponly=True)
+        res.set_cookie("refresh", refresh_token, httponly=True)
+        return res
 
 class IdValidation(APIView):
     '''
@@ -181,12 +213,8 @@ class IdValidation(APIView):
     def post(self, request):
         try:
             user_id = request.data['user_id']
-            try:
-                user = User.objects.get(user_id=user_id)
-            except Exception as e:
-                user = None
             
-            if user is None:
+            if not availability.is_taken('user_id', user_id):
                 res =  Response(
                     {
                         "code" : "0001",
@@ -221,12 +249,8 @@ class HPValidation(APIView):
     def post(self, request):
         try:
             hp = request.data['hp']
-            try:
-                user = User.objects.get(hp=hp)
-            except Exception as e:
-                user = None
             
-            if user is None:
+            if not availability.is_taken('hp', hp):
                 res =  Response(
                     {
                         "code" : "0003",
@@ -252,12 +276,40 @@ class HPValidation(APIView):
             
         else:
             return res
+
+class AvailabilityView(APIView):
+    '''
+    아이디/휴대폰번호/이메일 중복 일괄 확인 API
+    {"user_id": ["a", "b"], "hp": "010...", "user_email": [...]} 처럼 컬럼별 값(하나 또는 목록)을 받아
+    {"user_id": {"a": true, "b": false}, ...} (true: 사용 가능) 으로 돌려준다.
+    '''
+    @ratelimit('availability')
+    def post(self, request):
+        candidates = {}
+        for field in availability.FIELDS:
+            values = request.data.get(field)
+            if values is None:
+                continue
+            if not isinstance(values, list):
+                values = [values]
+            candidates[field] = [str(value).strip() for value in values if str(value).strip()]
+        count = sum(len(values) for values in candidates.values())
+        if not count or count > settings.AVAILABILITY_MAX_CANDIDATES:
+            return Response(ErrorCode.MISSING_REQUIRED_FIELD, status=status.HTTP_400_BAD_REQUEST)
+
+        taken = availability.taken_values(candidates)
+        result = {
+            field: {value: value not in taken[field] for value in values}
+            for field, values in candidates.items()
+        }
+        return Response({"code": "0000", "message": "OK", "result": result})
         
 class AuthView(APIView):
     '''
     받은 request data로 휴대폰번호를 통해 AuthSMS에 update_or_create
     인증번호 난수 생성및 저장은 모델 안에 존재.
     '''
+    @ratelimit('sms_send')
     def post(self, request):
         try:
             p_num = request.data['hp']
@@ -282,13 +334,12 @@ class AuthView(APIView):
             )
 
     #휴대폰번호를 쿼리로 인증번호가 매치되는지 찾는 함수
-    #hp, auth 매개변수
+    #hp, auth 쿼리 파라미터
+    @ratelimit('sms_check')
     def get(self, request):
-        try:    
-            p_number = request.data['hp']
-            a_number = request.data['auth']
-            logging.debug(f"p_number: {p_number}, a_number: {a_number}")    
-        except KeyError:
+        p_number = request.query_params.get('hp')
+        a_number = request.query_params.get('auth')
+        if not p_number or not a_number:
             return Response(
                 {
                     "message" : "Bad Request",
@@ -296,41 +347,26 @@ class AuthView(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        else:
-            result = AuthSMS.objects.check_auth_number(p_number, a_number)
-            return Response({"message":"ok", "result":result})
+        result = AuthSMS.verify(p_number, a_number) == AuthSMS.VERIFIED
+        return Response({"message":"ok", "result":result})
         
 class Check_auth(APIView):
 
     #휴대폰번호를 쿼리로 인증번호가 매치되는지 찾는 함수
     #hp, auth 매개변수
-
+    # 실패 사유: MISMATCH(틀림), EXPIRED(만료/없음), TOO_MANY_ATTEMPTS(틀린 횟수 초과)
+    FAIL_MESSAGES = {
+        AuthSMS.MISMATCH: "hp Auth fail",
+        AuthSMS.NOT_FOUND: "hp Auth expired",
+        AuthSMS.EXPIRED: "hp Auth expired",
+        AuthSMS.TOO_MANY_ATTEMPTS: "hp Auth too many attempts",
+    }
+
+    @ratelimit('sms_check')
     def post(self, request):
         try:
             user_hp = request.data['hp']
             user_auth = request.data['auth']
-
-            auth = AuthSMS.objects.get(hp=user_hp).auth
-            c_auth = str(auth)
-            logging.debug(f"c_auth: {c_auth}, user_auth: {user_auth}") 
-            if c_auth == user_auth:
-                res =  Response(
-                            {
-                                "code" : "0000",
-                                "message": "hp Auth success",
-                                "user_auth" : user_auth ,
-                                "auth" : auth
-                            }                    
-                ) 
-            elif c_auth != user_auth:
-                res =  Response(
-                            {
-                                "code" : "1005",
-                                "message": "hp Auth fail",
-                                "user_auth" : user_auth ,
-                                "auth" : auth
-                            }                    
-                        )
         except KeyError:
              return Response(
                 {
@@ -339,43 +375,51 @@ class Check_auth(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        else:
-            return res
 
-        return res
+        result = AuthSMS.verify(user_hp, user_auth)
+        logger.debug(f"hp auth: hp={user_hp}, result={result}")
+        if result == AuthSMS.VERIFIED:
+            return Response(
+                {
+                    "code" : "0000",
+                    "message": "hp Auth success",
+                    "user_auth" : user_auth,
+                }
+            )
+        return Response(
+            {
+                "code" : "1005",
+                "message": self.FAIL_MESSAGES[result],
+                "reason": result,
+                "user_auth" : user_auth,
+            }
+        )
 
 class UserInfoView(APIView):
     @UserSchema.user_info
     def get(self, request, user_id):
-        try:
-            # 토큰 검증
-            logger.debug(f"request auth: {request.headers.get('Authorization')}")
-            auth_header = request.headers.get('Authorization')
-            if not auth_header:
-                return Response({"message": "인증 헤더가 누락되었습니다."}, status=status.HTTP_400_BAD_REQUEST)
-            
-            token = auth_header.split(' ')[1]
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            
-            # 토큰의 user_id와 요청된 user_id가 일치는지 확인
-            if str(payload.get('user_id')) != str(user_id):
-                return Response({"message": "권한이 없습니다."}, status=status.HTTP_403_FORBIDDEN)
-            
-            User = get_user_model()
-            user = get_object_or_404(User, user_id=user_id)
-            
-            serializer = UserSerializer(user)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        
-        except jwt.ExpiredSignatureError:
-            return Response({"message": "토큰이 만료되었습니다."}, status=status.HTTP_401_UNAUTHORIZED)
-        except jwt.InvalidTokenError:
-            return Response({"message": "유효하지 않은 토큰입니다."}, status=status.HTTP_401_UNAUTHORIZED)
-        except Exception as e:
-            return Response({"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # 토큰 검증은 기본 인증 클래스가 처리한다 (잘못된 Bearer 토큰은 이미 401)
+        if not request.user.is_authenticated:
+            return Response({"message": "인증 헤더가 누락되었습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 토큰의 user_id와 요청된 user_id가 일치는지 확인
+        if str(request.user.user_id) != str(user_id):
+            return Response({"message": "권한이 없습니다."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = UserSerializer(request.user)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+def certificate_too_large(uploaded_file):
+    max_bytes = settings.CERTIFICATE_MAX_BYTES
+    if uploaded_file.size > max_bytes:
+        return Response({"message": f"파일 크기는 {max_bytes // (1024 * 1024)}MB 이하여야 합니다.", "code": "1006"}, status=status.HTTP_400_BAD_REQUEST)
+    return None
 
 class CertificateUploadView(APIView):
-    @transaction.atomic
+    '''
+    자격증 업로드. 파일은 트랜잭션 밖에서 저장하고 트랜잭션 안에서는 메타데이터만 저장한다.
+    형식 검증과 미리보기 생성은 커밋 후 백그라운드에서 한다. (buccl_user.certificates)
+    '''
     @UserSchema.certificate_upload
     def post(self, request):
         user, error_response = get_user_from_token(request)
@@ -386,10 +430,22 @@ class CertificateUploadView(APIView):
         data['user'] = user.id
 
         serializer = CertificateUploadSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "자격증 업로드 완료", "code": "0000"}, status=status.HTTP_201_CREATED)
-        return Response({"message": serializer.errors, "code": "1000"}, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response({"message": serializer.errors, "code": "1000"}, status=status.HTTP_400_BAD_REQUEST)
+        uploaded_file = serializer.validated_data['certificate_file']
+        error_response = certificate_too_large(uploaded_file)
+        if error_response:
+            return error_response
+
+        file_name = certificates.store_file(uploaded_file)
+        try:
+            with transaction.atomic():
+                certificate = serializer.save(certificate_file=file_name, file_size=uploaded_file.size)
+                certificates.schedule_validation(certificate.id)
+        except Exception:
+            certificates.discard_file(file_name)
+            raise
+        return Response({"message": "자격증 업로드 완료", "code": "0000"}, status=status.HTTP_201_CREATED)
     
 # 자격증 승인/거부 (관리자 전용)
 class CertificateApproveView(APIView):
@@ -427,35 +483,72 @@ class CertificateApproveView(APIView):
     
 # 자격증 재등록 (반려된 경우 다시 등록)
 class CertificateReUploadView(APIView):
-    @transaction.atomic
     def post(self, request, certificate_id):
         user, error_response = get_user_from_token(request)
         if error_response:
             return error_response
 
-        certificate = get_object_or_404(CertificateUpload, id=certificate_id, user=user)
+        certificate = get_object_or_404(CertificateUpload.objects.only('id'), id=certificate_id, user=user)
 
         new_file = request.FILES.get('certificate_file')
 
         if not new_file:
             return Response({"message": "파일이 제공되지 않았습니다.", "code": "1006"}, status=status.HTTP_400_BAD_REQUEST)
+        error_response = certificate_too_large(new_file)
+        if error_response:
+            return error_response
 
-        certificate.certificate_file = new_file
-        certificate.uploaded_at = timezone.now()
-        
-        # 승인 및 반려 정보 초기화
-        certificate.is_approved = False
-        certificate.rejection_reason = ''
-        certificate.approved_by = None
-        certificate.rejected_by = None
-
-        certificate.save()
+        # 파일은 트랜잭션 밖에서 저장
+        file_name = certificates.store_file(new_file)
+        try:
+            with transaction.atomic():
+                # 승인 및 반려 정보 초기화
+                CertificateUpload.objects.filter(pk=certificate.pk).update(
+                    certificate_file=file_name,
+                    uploaded_at=timezone.now(),
+                    is_approved=False,
+                    rejection_reason='',
+                    approved_by=None,
+                    rejected_by=None,
+                    review_status=CertificateUpload.REVIEW_PENDING,
+                    file_status=CertificateUpload.FILE_PENDING,
+                    content_type='',
+                    file_size=new_file.size,
+                    preview='',
+                )
+                certificates.schedule_validation(certificate.pk)
+        except Exception:
+            certificates.discard_file(file_name)
+            raise
 
         return Response({"message": "자격증 재등록 완료, 승인 대기중입니다.", "code": "0002"}, status=status.HTTP_200_OK)
 
+class CertificateReviewPagination(KeysetPagination):
+    # 오래 기다린 순 (cert_review_queue_idx)
+    keyset = ('uploaded_at', 'id')
+
+class PendingCertificateListView(APIView):
+    '''
+    승인 대기 자격증 목록 (운영자 전용). keyset 페이지네이션, 오래된 순
+    file_status 로 백그라운드 검증 결과(검증 대기/정상)를 함께 보여준다. 잘못된 파일은 검증 시 자동 반려되어 목록에 없다.
+    '''
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        queryset = (
+            CertificateUpload.objects.filter(review_status=CertificateUpload.REVIEW_PENDING)
+            .select_related('user')
+            .only('id', 'certificate_name', 'certificate_file', 'preview', 'content_type', 'file_size',
+                  'file_status', 'uploaded_at', 'user__user_id', 'user__name')
+        )
+        paginator = CertificateReviewPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = PendingCertificateSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
 class UserLevelsView(APIView):
     @UserSchema.user_levels
     def get(self, request):
-        user_levels = UserLevel.objects.all()
-        serializer = UserLevelSerializer(user_levels, many=True)
+        # 기준 데이터 캐시에서 읽는다 (요청마다 테이블 전체를 조회하지 않음)
+        serializer = UserLevelSerializer(refcache.rows('buccl_user.UserLevel'), many=True)
         return Response(serializer.data)